@@ -0,0 +1,1115 @@
+import serial
+import asyncio
+import inspect
+import time
+from contextlib import asynccontextmanager
+from prologix import prologix, asyncTags
+from transports import openTransport
+
+class asyncBusLock(object):
+    """Fair, reentrant lock handing the bus to waiting tasks in FIFO order
+
+    asyncio counterpart of `prologix.busLock`. The task holding the bus may
+    acquire it again, tasks it spawns may not. Use with `async with`.
+
+    Attributes
+    ----------
+    transactions : int
+        Number of completed acquisitions, nested ones are not counted
+    waitTotal : float
+        Total seconds spent waiting for the bus
+    waitMax : float
+        Longest wait for the bus in seconds
+    """
+
+    transactions: int = 0
+    waitTotal: float = 0.0
+    waitMax: float = 0.0
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._owner = None
+        self._depth = 0
+        self.transactions = 0
+        self.waitTotal = 0.0
+        self.waitMax = 0.0
+
+    async def acquire(self) -> float:
+        """Wait for the bus
+
+        Returns
+        -------
+        float
+            Seconds spent waiting; 0 if the calling task already held the bus
+        """
+        me = asyncio.current_task()
+        if self._owner is me:
+            self._depth += 1
+            return 0.0
+
+        started = time.monotonic()
+        await self._lock.acquire()
+        waited = time.monotonic() - started
+
+        self._owner = me
+        self._depth = 1
+        self.transactions += 1
+        self.waitTotal += waited
+        if waited > self.waitMax:
+            self.waitMax = waited
+        return waited
+
+    def release(self):
+        """Release the bus, handing it to the next waiting task
+        """
+        if self._owner is not asyncio.current_task():
+            raise RuntimeError("Bus released by a task not holding it")
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            self._lock.release()
+
+    def locked(self) -> bool:
+        """Check whether any task holds the bus
+
+        Returns
+        -------
+        bool
+            True if the bus is held
+        """
+        return self._owner is not None
+
+    def waitMean(self) -> float:
+        """Get the mean time spent waiting for the bus
+
+        Returns
+        -------
+        float
+            Mean wait time in seconds
+        """
+        if self.transactions == 0:
+            return 0.0
+        return self.waitTotal / self.transactions
+
+    def resetStats(self):
+        """Reset wait time statistics
+        """
+        self.transactions = 0
+        self.waitTotal = 0.0
+        self.waitMax = 0.0
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+        return False
+
+class asyncTag(object):
+    """Context manager returned by `aioprologix.tag`
+
+    Holds the bus like `aioprologix.transaction` and records the statistics
+    of all commands sent meanwhile under the tag, see `prologix.tag`.
+    Entering it with a plain `with`, as the `tagged` methods of the drivers
+    do, raises NotImplementedError naming the `*Async` variant if there is
+    one, see `prologix.asyncTags`.
+
+    Attributes
+    ----------
+    gpib : aioprologix
+        Instance holding the bus
+    name : str
+        Tag like `hp3478a.configureAsync`
+    """
+
+    _previous: str = None
+    _start: float = None
+
+    def __init__(self, gpib, name: str):
+        """
+        Parameters
+        ----------
+        gpib : aioprologix
+            Instance holding the bus
+        name : str
+            Tag like `hp3478a.configureAsync`
+        """
+        self.gpib = gpib
+        self.name = name
+
+    def __enter__(self):
+        if self.name + "Async" in asyncTags:
+            raise NotImplementedError(self.name + " blocks and can not be used with aioprologix, use " + self.name + "Async instead")
+        raise NotImplementedError(self.name + " blocks and can not be used with aioprologix, it has no async variant")
+
+    def __exit__(self, *exc):
+        return False
+
+    async def __aenter__(self):
+        await self.gpib.lock.acquire()
+        stats = self.gpib.stats
+        if stats is not None:
+            self._previous = stats.tag
+            stats.tag = self.name
+            self._start = time.monotonic()
+        return self.gpib
+
+    async def __aexit__(self, *exc):
+        stats = self.gpib.stats
+        try:
+            if stats is not None:
+                stats.tag = self._previous
+                stats.recordCall(self.name, time.monotonic() - self._start)
+        finally:
+            self.gpib.lock.release()
+        return False
+
+class aioprologix(prologix):
+    """asyncio variant of the prologix class
+
+    The serial port is used in non-blocking mode and registered with the event
+    loop, incoming data is collected in the background. `cmdWrite`, `cmdPoll`,
+    `cmdPollMany`, `cmdPollBlock`, `cmdClr`, `cmdRead`, `cmdTrigger`,
+    `cmdSpoll`, `cmdSRQ`, `serviceSRQ`, `waitSRQ`, `syncMeasure` and the
+    `read*` methods are coroutines, so a single event loop can drive many
+    adapters and devices without a thread per device. `transaction`, `tag`
+    and `batch` are used with `async with`. Writes are not flushed, waiting
+    for the port to drain would block the event loop.
+
+    Transactions nest within a task like `prologix.transaction`, see
+    `asyncBusLock`. The `*Locked` variants of the commands skip taking the
+    bus again.
+
+    The synchronous driver methods raise NotImplementedError, use their
+    `*Async` variants instead.
+
+    Requires an event loop supporting `add_reader`, which excludes the
+    Proactor loop used by default on Windows, and a transport providing
+    `fileno`, which excludes `loopbackTransport`.
+
+    Example
+    -------
+    gpib = await aioprologix.open("/dev/ttyACM0", timeout=0.25)
+    meter = hp3478a(23, prologixGpib=gpib)
+    value = await meter.getMeasureAsync()
+
+    Attributes
+    ----------
+    loop : asyncio.AbstractEventLoop
+        Event loop the serial port is registered with
+    lock : asyncBusLock
+        Lock arbitrating the adapter between tasks, see `transaction`.
+        Also holds the wait time statistics
+    """
+
+    loop: asyncio.AbstractEventLoop = None
+    lock: asyncBusLock = None
+
+    FLUSH_WRITES: bool = False
+
+    _rxEvent: asyncio.Event = None
+
+    def __init__(self, port: str, baud: int=115200, timeout: float=2.5, debug: bool=False, exclusive: bool=True, trace: int=0, stats: bool=False, adaptive: bool=True, breaker: bool=True):
+        """Open the port without talking to the adapter
+
+        Use `open` to get a connected and configured instance instead.
+
+        Parameters
+        ----------
+        port : str
+            path of the serial device to use. Example: `/dev/ttyACM0`
+            or `tcp://host[:port]` for network adapters
+        baud : int, optional
+            baudrate used for serial communication
+            by default 115200
+        timeout : float, optional
+            number of seconds to wait at maximum for serial data to arrive
+            by default 2.5 seconds
+        debug : bool, optional
+            Whether to print verbose status messages and all communication
+            by default False
+        exclusive : bool, optional
+            Whether this instance is the only one controlling the adapter
+            by default True
+        trace : int, optional
+            Number of entries to keep in the `tracer` ring buffer
+            0 disables tracing unless `debug` is set
+            by default 0
+        stats : bool, optional
+            Whether to collect bus time statistics in `stats`
+            by default False
+        adaptive : bool, optional
+            Whether to learn read timeouts per address and command class
+            by default True
+        breaker : bool, optional
+            Whether to skip devices which stopped responding, see
+            `prologix.deviceBreaker` and `prologix.registerLiveness`
+            by default True
+        """
+        self._initState(timeout, debug, exclusive, trace, stats, adaptive, breaker)
+        self.lock = asyncBusLock()
+        self._rxEvent = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+
+        try:
+            self.serial = openTransport(port, baud=baud, timeout=0)
+        except (serial.SerialException, OSError):
+            print("!! Port " + port + " could not be opened")
+            self.serial = None
+            return None
+
+        self.loop.add_reader(self.serial.fileno(), self._onReadable)
+
+    @classmethod
+    async def open(cls, port: str, baud: int=115200, timeout: float=2.5, debug: bool=False, exclusive: bool=True, fastStart: bool=True, config: str=prologix.CONFIG_WRITE, trace: int=0, stats: bool=False, adaptive: bool=True, breaker: bool=True):
+        """Open a port, check for a Prologix compatible adapter and configure it
+
+        Parameters
+        ----------
+        port : str
+            path of the serial device to use. Example: `/dev/ttyACM0`
+            or `tcp://host[:port]` for network adapters
+        baud : int, optional
+            baudrate used for serial communication
+            by default 115200
+        timeout : float, optional
+            number of seconds to wait at maximum for serial data to arrive
+            by default 2.5 seconds
+        debug : bool, optional
+            Whether to print verbose status messages and all communication
+            by default False
+        exclusive : bool, optional
+            Whether this instance is the only one controlling the adapter
+            by default True
+        fastStart : bool, optional
+            If True poll `++ver` until the adapter answers instead of waiting
+                a fixed 2.5 seconds
+            by default True
+        config : str, optional
+            How to initialize the adapter configuration, see `prologix.configure`
+            by default CONFIG_WRITE
+        trace : int, optional
+            Number of entries to keep in the `tracer` ring buffer
+            by default 0
+        stats : bool, optional
+            Whether to collect bus time statistics in `stats`
+            by default False
+        adaptive : bool, optional
+            Whether to learn read timeouts per address and command class
+            by default True
+        breaker : bool, optional
+            Whether to skip devices which stopped responding
+            by default True
+
+        Returns
+        -------
+        aioprologix|None
+            Connected instance, None if no compatible adapter was found
+        """
+        self = cls(port, baud=baud, timeout=timeout, debug=debug, exclusive=exclusive, trace=trace, stats=stats, adaptive=adaptive, breaker=breaker)
+        if self.serial is None:
+            return None
+
+        if fastStart:
+            check = await self.probe()
+        else:
+            await asyncio.sleep(2.5)
+            check = await self.cmdPoll("++ver", read=False)
+
+        if check is None or len(check) <= 0:
+            print("!! No responding device on port " + port + " found")
+            self.close()
+            return None
+        elif not ("Prologix".casefold() in check.casefold() or "AR488".casefold() in check.casefold()):
+            print("!! Device on Port " + port + " does not seem to be Prologix compatible")
+            print(check)
+            self.close()
+            return None
+        else:
+            self.traceNote("Found Prologix compatible device on port %s", port)
+
+        self.version = check
+
+        await self.configure(config)
+        return self
+
+    def close(self):
+        """Unregister from the event loop and close the port
+        """
+        if self.serial is None:
+            return
+        self.loop.remove_reader(self.serial.fileno())
+        self.serial.close()
+        self.serial = None
+
+    def _onReadable(self):
+        """Event loop callback collecting incoming data
+        """
+        try:
+            data = self.serial.read(self.serial.in_waiting or 1)
+        except serial.SerialException as e:
+            print("!! Reading from port failed: " + str(e))
+            self.close()
+            return
+        if len(data) > 0:
+            self._rxCompact()
+            self._rxBuffer += data
+            self._rxEvent.set()
+
+    async def probe(self, timeout: float=None, attempt: float=None) -> str:
+        """Poll `++ver` until the adapter answers
+
+        Parameters
+        ----------
+        timeout : float, optional
+            number of seconds to wait for the adapter at maximum
+            by default PROBE_TIMEOUT
+        attempt : float, optional
+            number of seconds to wait for a response before asking again
+            by default PROBE_ATTEMPT
+
+        Returns
+        -------
+        str|None
+            Response to `++ver`
+            None if the adapter did not answer in time
+        """
+        if timeout is None:
+            timeout = self.PROBE_TIMEOUT
+        if attempt is None:
+            attempt = self.PROBE_ATTEMPT
+
+        deadline = self.loop.time() + timeout
+        oldTimeout = self.timeout
+        self.timeout = attempt
+        dumpOnError = self.tracer is not None and self.tracer.dumpOnError
+        if dumpOnError:
+            self.tracer.dumpOnError = False
+        try:
+            while True:
+                check = await self.cmdPoll("++ver", read=False)
+                if check is not None and len(check) > 0:
+                    return check
+                if self.loop.time() >= deadline:
+                    return None
+        finally:
+            self.timeout = oldTimeout
+            if dumpOnError:
+                self.tracer.dumpOnError = True
+
+    async def configure(self, config: str=prologix.CONFIG_WRITE):
+        """Initialize the adapter configuration
+
+        Parameters
+        ----------
+        config : str, optional
+            CONFIG_WRITE -> Write the complete configuration
+            CONFIG_QUERY -> Query the configuration, only write differing values
+            CONFIG_SKIP  -> Assume the adapter already holds the configuration
+            by default CONFIG_WRITE
+        """
+        settings = self.INIT_CONFIG + (("++read_tmo_ms", str(self.readTimeoutMs(self.timeout))),)
+
+        for name, value in settings:
+            if config == self.CONFIG_SKIP:
+                self.busState[name] = value
+                continue
+            if config == self.CONFIG_QUERY:
+                current = await self.cmdPoll(name, read=False)
+                if current == value:
+                    self.busState[name] = value
+                    continue
+            await self.cmdWrite(name + " " + value)
+
+        if config != self.CONFIG_SKIP:
+            await self.cmdWrite("++ifc")
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Hold the adapter for an atomic sequence of commands
+
+        Waiting tasks are served in FIFO order. Transactions may be nested
+        within a task, see `asyncBusLock`.
+
+        Yields
+        ------
+        aioprologix
+            This instance
+        """
+        async with self.lock:
+            yield self
+
+    async def cmdWrite(self, cmd: str, addr: int=None):
+        """Write a single, returnless command to a GPIB device
+
+        Parameters
+        ----------
+        cmd : str|bytes
+            The command string to be sent
+        addr : int, optional
+            address of the targeted device. If set an `++addr` will be issued first
+            by default None
+        """
+        async with self.lock:
+            self.cmdWriteLocked(cmd, addr)
+
+    def cmdWriteLocked(self, cmd: str, addr: int=None):
+        """Write a command while already holding the bus, see `cmdWrite`
+
+        Writes are short and complete without waiting for the adapter, so
+        this does not need to be awaited.
+
+        Parameters
+        ----------
+        cmd : str|bytes
+            The command string to be sent
+        addr : int, optional
+            address of the targeted device. If set an `++addr` will be issued first
+            by default None
+        """
+        self._write(cmd, addr)
+
+    async def cmdPoll(self, cmd: str, addr: int=None, binary: bool=False, read: bool=True, size: int=None, eot: bool=False):
+        """Write a single command to a GPIB device and fetch response
+
+        Parameters
+        ----------
+        cmd : str|bytes
+            The command string to be sent
+        addr : int, optional
+            address of the targeted device. If set an `++addr` will be issued first
+            by default None
+        binary : bool, optional
+            If False responses are decoded and returned as String
+            If True resonses are unchanged and returned as bytes
+            by default False
+        read : bool, optional
+            Whether to issue a `++read eoi` before waiting for data
+            by default True
+        size : int, optional
+            If set read exactly this number of bytes instead of a line
+            Implies `binary`
+            by default None
+        eot : bool, optional
+            If True read until the device asserts EOI, see `prologix.cmdPoll`
+            by default False
+
+        Returns
+        -------
+        None|str|bytes
+            None for empty or incomplete responses
+            str or bytes depending on `binary` parameter
+
+        Raises
+        ------
+        ValueError
+            With `eot` if the response contained EOT_CHAR, see `readEOI`
+        """
+        async with self.lock:
+            return await self.cmdPollLocked(cmd, addr, binary=binary, read=read, size=size, eot=eot)
+
+    async def cmdPollLocked(self, cmd: str, addr: int=None, binary: bool=False, read: bool=True, size: int=None, eot: bool=False):
+        """Write a command and fetch the response while already holding the bus
+
+        See `cmdPoll` for parameters and return values
+        """
+        if size is not None:
+            binary = True
+
+        if read and not await self._healthyAsync(addr):
+            return None
+        if eot:
+            eotEnable = self.busState.get("++eot_enable", "0")
+            self._write("++eot_char " + str(self.EOT_CHAR))
+            self._write("++eot_enable 1")
+        try:
+            self._write(cmd, addr)
+            timeout = None
+            if read:
+                timeout = self._readTimeout(cmd)
+                self._write("++read eoi")
+            start = time.monotonic()
+            if size is not None:
+                out = await self.readBytes(size, timeout=timeout)
+            elif eot:
+                out = await self.readEOI(binary=binary, timeout=timeout)
+            else:
+                out = await self.readLine(binary=binary, timeout=timeout)
+            self._recordRead(start, out, cmd, learn=read)
+        finally:
+            if eot:
+                self._write("++eot_enable " + eotEnable)
+        return self._response(out, binary)
+
+    async def cmdPollMany(self, cmds: list, addr: int=None, depth: int=16, progress=None) -> list:
+        """Write several commands to a GPIB device and fetch all responses
+
+        See `prologix.cmdPollMany`. `progress` may be a coroutine function.
+
+        Parameters
+        ----------
+        cmds : list
+            Commands to send, str or bytes, see `cmdWrite`
+        addr : int, optional
+            address of the targeted device. If set an `++addr` will be issued first
+            by default None
+        depth : int, optional
+            number of commands sent at once
+            by default 16
+        progress : callable, optional
+            Called as `progress(done)` with the number of responses
+                received after each group
+            by default None
+
+        Returns
+        -------
+        list
+            bytes response for each command, None for the missing ones
+
+        Raises
+        ------
+        ValueError
+            If a response contained EOT_CHAR, see `readEOI`
+        """
+        async with self.lock:
+            return await self.cmdPollManyLocked(cmds, addr, depth=depth, progress=progress)
+
+    async def cmdPollManyLocked(self, cmds: list, addr: int=None, depth: int=16, progress=None) -> list:
+        """Pipeline several commands while already holding the bus
+
+        See `cmdPollMany` for parameters and return values
+        """
+        out = []
+        if not await self._healthyAsync(addr):
+            return [None] * len(cmds)
+        self._write("++read_tmo_ms " + str(self.readTimeoutMs(self.timeout)), addr)
+        self._write("++eot_char " + str(self.EOT_CHAR))
+        eotEnable = self.busState.get("++eot_enable", "0")
+        self._write("++eot_enable 1")
+        try:
+            for first in range(0, len(cmds), depth):
+                group = cmds[first:first + depth]
+                self._batch = bytearray()
+                try:
+                    for cmd in group:
+                        self._write(cmd, addr)
+                        self._write("++read eoi")
+                    self.flushBatch()
+                finally:
+                    self._batch = None
+                for i, cmd in enumerate(group):
+                    start = time.monotonic()
+                    # Only the last response of a group has to end the data
+                    frame = await self.readEOI(binary=True, more=i < len(group) - 1)
+                    self._recordRead(start, frame, cmd)
+                    if frame is None:
+                        self.traceError("No response to command %d of %d", len(out) + 1, len(cmds))
+                        return out + [None] * (len(cmds) - len(out))
+                    out.append(bytes(frame))
+                if progress is not None:
+                    result = progress(len(out))
+                    if inspect.isawaitable(result):
+                        await result
+        finally:
+            self._write("++eot_enable " + eotEnable)
+        return out
+
+    async def cmdPollBlock(self, cmd: str, addr: int=None):
+        """Write a single command to a GPIB device and fetch an IEEE 488.2 block
+
+        Parameters
+        ----------
+        cmd : str
+            The command string to be sent
+        addr : int, optional
+            address of the targeted device. If set an `++addr` will be issued first
+            by default None
+
+        Returns
+        -------
+        None|bytes
+            Block data without header, see `readBlock`
+            None for empty or incomplete responses
+        """
+        async with self.lock:
+            if not await self._healthyAsync(addr):
+                return None
+            self._write(cmd, addr)
+            timeout = self._readTimeout(cmd)
+            self._write("++read eoi")
+            start = time.monotonic()
+            out = await self.readBlock(timeout=timeout)
+            self._recordRead(start, out, cmd, learn=True)
+            return None if out is None else bytes(out)
+
+    async def _healthyAsync(self, addr: int=None) -> bool:
+        """Check the breaker of a device before reading from it
+
+        Awaitable variant of `prologix._healthy`. Registered liveness checks
+        may be coroutine functions, they run while holding the bus and must
+        use the `*Locked` commands.
+
+        Parameters
+        ----------
+        addr : int, optional
+            address of the device
+            by default None for the currently addressed one
+
+        Returns
+        -------
+        bool
+            False if the device should be skipped
+        """
+        health = self.health
+        if health is None:
+            return True
+        key = self.busState.get("++addr") if addr is None else str(addr)
+        state = health.allow(key)
+        if state == health.STATE_CLOSED or state == health.STATE_PROBING:
+            return True
+        if state == health.STATE_OPEN:
+            return False
+
+        self.traceNote("Checking liveness of %s", key)
+        check = self.liveness.get(key)
+        if check is None:
+            if self.deadlines is not None:
+                self._write("++read_tmo_ms " + str(self.readTimeoutMs(self.timeout)))
+            alive = key is not None and await self.cmdSpollLocked(int(key)) is not None
+        else:
+            result = check()
+            if inspect.isawaitable(result):
+                result = await result
+            alive = result is not None
+        if alive:
+            health.success(key)
+        else:
+            health.failure(key)
+            self.traceError("Device %s still not responding", key)
+        return alive
+
+    async def cmdClr(self, addr: int=None):
+        """Send `SDC` (selected device clear) to device
+
+        Parameters
+        ----------
+        addr : int, optional
+            address of the targeted device. If set an `++addr` will be issued first
+            by default None
+        """
+        await self.cmdWrite("++clr", addr)
+
+    async def readLine(self, binary: bool=False, timeout: float=None):
+        """Wait for a single response frame ending with `terminator`
+
+        Parameters
+        ----------
+        binary : bool, optional
+            If True a zero-copy memoryview into the receive buffer is returned
+            by default False
+        timeout : float, optional
+            number of seconds to wait at maximum
+            by default None for `timeout`
+
+        Returns
+        -------
+        None|bytes|memoryview
+            None if nothing arrived before the timeout
+            Frame including the terminator, see `prologix.readLine`
+        """
+        if self._batch:
+            self.flushBatch()
+        self._rxCompact()
+        term = self.terminator
+        deadline = self.loop.time() + (self.timeout if timeout is None else timeout)
+        start = 0
+
+        while True:
+            buf = self._rxBuffer
+            end = buf.find(term, start)
+            if end >= 0:
+                break
+            start = max(0, len(buf) - len(term) + 1)
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                break
+            self._rxEvent.clear()
+            try:
+                await asyncio.wait_for(self._rxEvent.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        return self._rxTake(end, binary)
+
+    async def readBytes(self, size: int, timeout: float=None):
+        """Wait for an exact number of bytes
+
+        Parameters
+        ----------
+        size : int
+            number of bytes to read
+        timeout : float, optional
+            number of seconds to wait at maximum
+            by default None for `timeout`
+
+        Returns
+        -------
+        None|memoryview
+            Zero-copy view into the receive buffer, see `prologix.readLine`
+            None if not all bytes arrived before the timeout
+        """
+        if self._batch:
+            self.flushBatch()
+        self._rxCompact()
+        deadline = self.loop.time() + (self.timeout if timeout is None else timeout)
+
+        while len(self._rxBuffer) < size:
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                break
+            self._rxEvent.clear()
+            try:
+                await asyncio.wait_for(self._rxEvent.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        if len(self._rxBuffer) < size:
+            self.traceError("Expected %d bytes, got %d", size, len(self._rxBuffer))
+            return None
+
+        self._rxConsumed = size
+        return memoryview(self._rxBuffer)[:size]
+
+    async def readEOI(self, binary: bool=False, timeout: float=None, more: bool=False):
+        """Wait for a response terminated by EOI
+
+        Parameters
+        ----------
+        binary : bool, optional
+            Whether to return a zero-copy memoryview, see `prologix.readLine`
+            by default False
+        timeout : float, optional
+            number of seconds to wait at maximum
+            by default None for `timeout`
+        more : bool, optional
+            Whether further responses may follow this one
+            by default False
+
+        Returns
+        -------
+        None|bytes|memoryview
+            Response without EOT_CHAR, see `prologix.readEOI`
+            None if nothing or an incomplete response arrived before the timeout
+
+        Raises
+        ------
+        ValueError
+            If data followed EOT_CHAR, the response contained EOT_CHAR
+        """
+        terminator = self.terminator
+        self.terminator = bytes((self.EOT_CHAR,))
+        try:
+            out = await self.readLine(binary=binary, timeout=timeout)
+        finally:
+            self.terminator = terminator
+
+        if out is None:
+            return None
+        if len(out) == 0 or out[-1] != self.EOT_CHAR:
+            self.traceError("Incomplete response, got %d bytes without EOI", len(out))
+            return None
+        if not more:
+            pending = len(self._rxBuffer) - self._rxConsumed + self.serial.in_waiting
+            if pending > 0:
+                self.traceError("Response contains EOT, %d bytes follow", pending)
+                raise ValueError("Response contains EOT_CHAR, " + str(pending) + " bytes followed the frame")
+        return out[:-1]
+
+    async def readBlock(self, timeout: float=None):
+        """Wait for an IEEE 488.2 block
+
+        Parameters
+        ----------
+        timeout : float, optional
+            number of seconds to wait at maximum for each part of the block
+            by default None for `timeout`
+
+        Returns
+        -------
+        None|memoryview
+            Zero-copy view of the block data without header, see `prologix.readBlock`
+            None for missing, invalid or incomplete blocks
+        """
+        head = await self.readBytes(2, timeout=timeout)
+        if head is None or head[0] != ord("#") or not chr(head[1]).isdigit():
+            self.traceError("Invalid block header")
+            return None
+        digits = head[1] - ord("0")
+        del head
+
+        if digits == 0:
+            return await self.readLine(binary=True, timeout=timeout)
+
+        length = await self.readBytes(digits, timeout=timeout)
+        if length is None:
+            return None
+        length = int(bytes(length))
+
+        return await self.readBytes(length, timeout=timeout)
+
+    async def cmdRead(self, addr: int=None, binary: bool=False):
+        """Fetch a response from a GPIB device without sending a command first
+
+        Parameters
+        ----------
+        addr : int, optional
+            address of the targeted device. If set an `++addr` will be issued first
+            by default None
+        binary : bool, optional
+            If False responses are decoded and returned as String
+            If True resonses are unchanged and returned as bytes
+            by default False
+
+        Returns
+        -------
+        None|str|bytes
+            None for empty responses
+            str or bytes depending on `binary` parameter
+        """
+        async with self.lock:
+            return await self.cmdReadLocked(addr, binary=binary)
+
+    async def cmdReadLocked(self, addr: int=None, binary: bool=False):
+        """Fetch a response while already holding the bus, see `cmdRead`
+        """
+        if not await self._healthyAsync(addr):
+            return None
+        if addr is not None:
+            self._write("++addr " + str(addr))
+        timeout = self._readTimeout("++read")
+        self._write("++read eoi")
+        start = time.monotonic()
+        out = await self.readLine(binary=binary, timeout=timeout)
+        self._recordRead(start, out, "++read", learn=True)
+        return self._response(out, binary)
+
+    async def cmdTrigger(self, addrs: list=None):
+        """Send `GET` (group execute trigger) to one or more devices
+
+        Parameters
+        ----------
+        addrs : list, optional
+            addresses of the targeted devices, see `prologix.cmdTrigger`
+            by default None
+        """
+        async with self.lock:
+            self.cmdTriggerLocked(addrs)
+
+    def cmdTriggerLocked(self, addrs: list=None):
+        """Trigger devices while already holding the bus, see `cmdTrigger`
+        """
+        if addrs is None or len(addrs) == 0:
+            self._write("++trg")
+            return
+
+        for i in range(0, len(addrs), 15):
+            self._write("++trg " + " ".join(str(addr) for addr in addrs[i:i+15]))
+
+    async def cmdSpoll(self, addr: int) -> int:
+        """Serial poll a device
+
+        Parameters
+        ----------
+        addr : int
+            address of the targeted device
+
+        Returns
+        -------
+        int|None
+            Status byte, None if the device did not respond
+        """
+        async with self.lock:
+            return await self.cmdSpollLocked(addr)
+
+    async def cmdSpollLocked(self, addr: int) -> int:
+        """Serial poll a device while already holding the bus, see `cmdSpoll`
+        """
+        status = await self.cmdPollLocked("++spoll " + str(addr), read=False)
+        if status is None or not status.isdigit():
+            return None
+        return int(status)
+
+    async def cmdSRQ(self) -> bool:
+        """Check whether any device asserts the SRQ line
+
+        Returns
+        -------
+        bool
+            True if SRQ is asserted
+        """
+        return await self.cmdPoll("++srq", read=False) == "1"
+
+    async def serviceSRQ(self) -> int:
+        """Dispatch pending service requests to the registered callbacks
+
+        See `prologix.serviceSRQ`. Callbacks may be coroutine functions,
+        they are awaited one after another without holding the bus.
+
+        Returns
+        -------
+        int
+            Number of devices serviced
+        """
+        if len(self.srqHandlers) == 0:
+            return 0
+
+        pending = []
+        async with self.lock:
+            if await self.cmdPollLocked("++srq", read=False) != "1":
+                return 0
+            for addr in list(self.srqHandlers):
+                status = await self.cmdSpollLocked(addr)
+                if status is not None and status & self.STB_RQS:
+                    pending.append((addr, status))
+
+        if len(pending) == 0:
+            self.srqUnhandled += 1
+            self.traceError("SRQ asserted by an unknown device")
+
+        for addr, status in pending:
+            callback = self.srqHandlers.get(addr)
+            if callback is not None:
+                result = callback(addr, status)
+                if inspect.isawaitable(result):
+                    await result
+        return len(pending)
+
+    async def waitSRQ(self, timeout: float=None, interval: float=0.01) -> int:
+        """Wait for service requests and dispatch them
+
+        Parameters
+        ----------
+        timeout : float, optional
+            number of seconds to wait at maximum
+            If None wait until a request was serviced
+            by default None
+        interval : float, optional
+            number of seconds to sleep between checking the SRQ line
+            by default 0.01
+
+        Returns
+        -------
+        int
+            Number of devices serviced, 0 on timeout
+        """
+        deadline = None
+        if timeout is not None:
+            deadline = self.loop.time() + timeout
+
+        while True:
+            serviced = await self.serviceSRQ()
+            if serviced > 0:
+                return serviced
+            if deadline is not None and self.loop.time() >= deadline:
+                return 0
+            await asyncio.sleep(interval)
+
+    def tag(self, name: str) -> asyncTag:
+        """Attribute bus time to a driver coroutine
+
+        Holds the bus like `transaction` and records the statistics of all
+        commands sent meanwhile under `name` as well, see `prologix.tag`.
+
+        Example
+        -------
+        async with gpib.tag("hp3478a.configureAsync"):
+            gpib.cmdWriteLocked("F1", 23)
+            status = await gpib.cmdPollLocked("B", 23, size=5)
+
+        Parameters
+        ----------
+        name : str
+            Tag like `hp3478a.configureAsync`
+
+        Returns
+        -------
+        asyncTag
+            Context manager for `async with`
+        """
+        return asyncTag(self, name)
+
+    @asynccontextmanager
+    async def batch(self):
+        """Coalesce commands into a single write
+
+        Holds the bus like `transaction`, see `prologix.batch`. Commands
+        written with `cmdWriteLocked` meanwhile are queued and sent when the
+        block ends, reads send them first. Batches may be nested, only the
+        outermost one sends.
+
+        Example
+        -------
+        async with gpib.batch():
+            gpib.cmdWriteLocked("F1", 23)
+            gpib.cmdWriteLocked("R0", 23)
+
+        Yields
+        ------
+        aioprologix
+            This instance
+        """
+        async with self.lock:
+            if self._batch is not None:
+                yield self
+                return
+            self._batch = bytearray()
+            try:
+                yield self
+            except BaseException:
+                self.discardBatch()
+                raise
+            else:
+                self.flushBatch()
+            finally:
+                self._batch = None
+
+    async def syncMeasure(self, devices: list, arm: bool=True) -> tuple:
+        """Trigger several devices at once and collect their readings
+
+        See `prologix.syncMeasure`. Devices must provide `addr`,
+        `armTriggerAsync()` and `parseMeasure(str)`, hp3478a and pm2534
+        implement these.
+
+        Parameters
+        ----------
+        devices : list
+            Driver instances to trigger, all using this adapter
+        arm : bool, optional
+            Whether to await `armTriggerAsync()` on all devices first
+            by default True
+
+        Returns
+        -------
+        tuple
+            Timestamp of the trigger as returned by time.time() and a list of
+            readings in the same order as `devices`, None if the device did
+            not respond
+        """
+        async with self.lock:
+            if arm:
+                for device in devices:
+                    await device.armTriggerAsync()
+
+            timestamp = time.time()
+            self.cmdTriggerLocked([device.addr for device in devices])
+
+            readings = []
+            for device in devices:
+                out = await self.cmdReadLocked(device.addr)
+                if out is None:
+                    readings.append(None)
+                else:
+                    readings.append(device.parseMeasure(out))
+
+        return timestamp, readings
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+# Benchmark suite for the drivers
+#
+# Runs all drivers against the emulator (see emulator.py) or local stand-ins,
+# so results are reproducible without hardware:
+#   python3 benchmark.py -o baseline.json
+#   python3 benchmark.py -o current.json --compare baseline.json
+#
+# CPU time is measured for the whole process and includes the emulator,
+# compare results of the same setup only.
+
+import argparse
+import datetime
+import json
+import platform
+import socket
+import sys
+import threading
+import time
+
+from emulator import prologixEmulator, virtualHp3478a, virtualPm2534
+from transports import loopbackTransport
+from prologix import prologix
+from hp3478a import hp3478a
+from pm2534 import pm2534
+from sdm3065x import SDM3065X
+
+HP3478A_ADDR = 23
+PM2534_ADDR  = 22
+
+# Display frames of a BM869S showing "1.2340 VDC" as received from the meter,
+# digits in bytes 3..8 (leading blank), V flag on the last digit
+BM869S_FRAMES = (
+    bytes((0x00, 0x10, 0x00, 0x00, 0xA0, 0xDB, 0xF8, 0xE4)),
+    bytes((0xBF, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00)),
+    bytes((0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00)),
+)
+
+def percentile(values: list, q: float) -> float:
+    """Get a percentile of sorted values
+
+    Parameters
+    ----------
+    values : list
+        sorted values
+    q : float
+        percentile between 0 and 1
+
+    Returns
+    -------
+    float
+        value at the percentile
+    """
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+def measure(func, count: int, readings: int=1) -> dict:
+    """Call a function repeatedly and collect timing statistics
+
+    Parameters
+    ----------
+    func : callable
+        function to benchmark, called without arguments
+    count : int
+        number of calls
+    readings : int, optional
+        number of readings a single call produces
+        by default 1
+
+    Returns
+    -------
+    dict
+        count, p50, p99 and mean latency in seconds, readingsPerSecond
+        and cpuPerReading in seconds
+    """
+    func()  # Warm up
+
+    latencies = []
+    cpuStart = time.process_time()
+    wallStart = time.perf_counter()
+    for i in range(count):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    wall = time.perf_counter() - wallStart
+    cpu = time.process_time() - cpuStart
+
+    latencies.sort()
+    return {
+        "count": count,
+        "p50": percentile(latencies, 0.5),
+        "p99": percentile(latencies, 0.99),
+        "mean": sum(latencies) / count,
+        "readingsPerSecond": count * readings / wall,
+        "cpuPerReading": cpu / (count * readings),
+    }
+
+def sdmServer() -> int:
+    """Start a local stand-in for a SDM3065X answering `R? 1`
+
+    Returns
+    -------
+    int
+        TCP port the server listens on
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(16)
+
+    def serve():
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                conn.sendall(b"Welcome to the SCPI instrument 'Siglent SDM3065X'\r\n>>")
+                conn.recv(1024)
+                conn.sendall(b"#215+1.00000000E+00\r\n")
+
+    threading.Thread(target=serve, name="sdm3065x stand-in", daemon=True).start()
+    return server.getsockname()[1]
+
+def batchSetup(gpib: prologix):
+    """Configure the HP3478A with a single batched write"""
+    with gpib.batch():
+        for cmd in ("F1", "R0", "N4", "T1", "Z1"):
+            gpib.cmdWrite(cmd, HP3478A_ADDR)
+
+def run(count: int, latency: float=0.0, only: list=None) -> dict:
+    """Run all benchmarks
+
+    Parameters
+    ----------
+    count : int
+        number of calls per benchmark, slow ones use less
+    latency : float, optional
+        emulated adapter turnaround time in seconds
+        by default 0
+    only : list, optional
+        names of benchmarks to run, all if None
+        by default None
+
+    Returns
+    -------
+    dict
+        results indexed by benchmark name
+    """
+    emulator = prologixEmulator([
+        virtualHp3478a(HP3478A_ADDR, speed=0, seed=1, calibration="calibration.data"),
+        virtualPm2534(PM2534_ADDR, speed=0, seed=1),
+    ], latency=latency)
+    gpib = prologix(transport=loopbackTransport(emulator.handle, record=False), timeout=0.25)
+    meter = hp3478a(HP3478A_ADDR, prologixGpib=gpib)
+    meter2 = pm2534(PM2534_ADDR, prologixGpib=gpib)
+
+    cases = [
+        ("prologix.cmdWrite", lambda: gpib.cmdWrite("F1", HP3478A_ADDR), count, 1),
+        ("prologix.cmdPoll", lambda: gpib.cmdPoll(" ", HP3478A_ADDR), count, 1),
+        ("prologix.batch", lambda: batchSetup(gpib), count, 1),
+        ("hp3478a.getMeasure", meter.getMeasure, count, 1),
+        ("hp3478a.getStatus", meter.getStatus, count, 1),
+        ("hp3478a.configure", lambda: meter.configure("vdc"), count, 1),
+        ("hp3478a.getCalibration", meter.getCalibration, 2, 255),
+        ("pm2534.getMeasure", meter2.getMeasure, count, 1),
+    ]
+
+    try:
+        import numpy
+    except ImportError:
+        print(".. Skipping hp3478a.acquire, numpy not available", file=sys.stderr)
+    else:
+        cases.append(("hp3478a.acquire", lambda: meter.acquire(100), max(count // 100, 1), 100))
+
+    sdm = SDM3065X("127.0.0.1")
+    sdm._port = sdmServer()
+    sdm._PrintDebug = False
+    cases.append(("sdm3065x.read", sdm.read, max(count // 10, 1), 1))
+
+    try:
+        from bm869s import BM869S
+    except (ImportError, OSError):
+        print(".. Skipping bm869s, hid module not available", file=sys.stderr)
+    else:
+        bm = BM869S.__new__(BM869S)
+        def decode():
+            for chunk, data in enumerate(BM869S_FRAMES):
+                bm.Store(chunk, data)
+            return bm.Decode()
+        cases.append(("bm869s.Decode", decode, count, 1))
+
+    results = {}
+    for name, func, n, readings in cases:
+        if only is not None and name not in only:
+            continue
+        results[name] = measure(func, n, readings)
+        print(".. " + name + ": p50 " + format(results[name]["p50"] * 1e6, ".1f") + "µs, " + format(results[name]["readingsPerSecond"], ".1f") + " readings/s", file=sys.stderr)
+    return results
+
+def compare(current: dict, previous: dict, threshold: float) -> list:
+    """Find benchmarks which got slower
+
+    Parameters
+    ----------
+    current : dict
+        results of this run
+    previous : dict
+        results of a previous run
+    threshold : float
+        relative slowdown to tolerate, 0.2 for 20%
+
+    Returns
+    -------
+    list
+        descriptions of all regressions
+    """
+    regressions = []
+    for name, result in current.items():
+        if name not in previous:
+            continue
+        old = previous[name]
+        for key in ("p50", "p99", "cpuPerReading"):
+            if old[key] > 0 and result[key] > old[key] * (1 + threshold):
+                regressions.append(name + " " + key + " " + format(old[key] * 1e6, ".1f") + "µs -> " + format(result[key] * 1e6, ".1f") + "µs")
+        if result["readingsPerSecond"] < old["readingsPerSecond"] / (1 + threshold):
+            regressions.append(name + " readingsPerSecond " + format(old["readingsPerSecond"], ".1f") + " -> " + format(result["readingsPerSecond"], ".1f"))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the drivers against the emulator")
+    parser.add_argument("--count", "-n", type=int, default=1000, help="calls per benchmark (def=1000)")
+    parser.add_argument("--latency", type=float, default=0.0, help="emulated adapter turnaround time in seconds (def=0)")
+    parser.add_argument("--only", action="append", metavar="NAME", help="run only this benchmark, may be repeated")
+    parser.add_argument("--out", "-o", help="write results as JSON to this file instead of stdout")
+    parser.add_argument("--compare", "-c", metavar="FILE", help="JSON results of a previous run to compare to")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown reported as regression (def=0.2)")
+    arg = parser.parse_args()
+
+    report = {
+        "created": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency": arg.latency,
+        "results": run(arg.count, latency=arg.latency, only=arg.only),
+    }
+
+    if arg.out is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(arg.out, "w") as fp:
+            json.dump(report, fp, indent=2)
+
+    if arg.compare is not None:
+        with open(arg.compare) as fp:
+            previous = json.load(fp)
+        regressions = compare(report["results"], previous["results"], arg.threshold)
+        for regression in regressions:
+            print("!! Regression: " + regression, file=sys.stderr)
+        if len(regressions) > 0:
+            sys.exit(1)
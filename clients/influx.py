@@ -16,52 +16,62 @@ multimeter2 = hp3478a(24, prologixGpib=multimeter1.gpib, debug=True)
 
 client = InfluxDBClient(host='localhost', port=8086, database='multimeter')
 
-def pollData(sc): 
-    json_body = []
+def readMeter(meter, id):
+    """Read a multimeter, returns a point for InfluxDB or None
 
-    try:
-        multimeter1.getStatus()
-        measurement = float(multimeter1.getMeasure())
+    Meters not responding are skipped by the circuit breaker of the adapter
+    without waiting for a timeout, so the other meters keep their schedule.
+    Function and range come from the cached status, which is only read
+    again after `statusTTL`, so most cycles take a single transaction.
+    """
+    if meter.refreshStatus() is None:
+        return None
+    measurement = meter.getMeasure()
+    if measurement is None:
+        return None
 
-        json_body.append(
-            {
-                "measurement": "measurement",
-                "tags": {
-                    "id": 22,
-                    "type": multimeter1.getFunction()
-                },
-                "fields": {
-                    "measurement": measurement,
-                    "range": multimeter1.getRange(numeric=True),
-                }
-            })
-    except:
-        pass
+    return {
+        "measurement": "measurement",
+        "tags": {
+            "id": id,
+            "type": meter.getFunction()
+        },
+        "fields": {
+            "measurement": float(measurement),
+            "range": meter.getRange(numeric=True),
+        }
+    }
 
-    try:
-        multimeter2.getStatus()
-        measurement2 = float(multimeter2.getMeasure())
+def pollData(sc, due):
+    json_body = []
 
-        json_body.append(
-            {
-                "measurement": "measurement",
-                "tags": {
-                    "id": 21,
-                    "type": multimeter2.getFunction()
-                },
-                "fields": {
-                    "measurement": measurement2,
-                    "range": multimeter2.getRange(numeric=True),
-                }
-            })
-    except:
-        pass
+    try:
+        for meter, id in ((multimeter1, 22), (multimeter2, 21)):
+            # A failing meter must not keep the other one from being logged
+            try:
+                point = readMeter(meter, id)
+            except Exception as e:
+                print("!! Reading multimeter " + str(meter.addr) + " failed: " + repr(e))
+                continue
+            if point is not None:
+                json_body.append(point)
+            else:
+                print("!! Multimeter " + str(meter.addr) + " not responding")
 
-    print(json_body)
-    client.write_points(json_body)
-    s.enter(1, 1, pollData, (sc,))
+        print(json_body)
+        if len(json_body) > 0:
+            client.write_points(json_body)
+    except Exception as e:
+        # Keep polling, e.g. while the database is restarting
+        print("!! Poll cycle failed: " + repr(e))
+    finally:
+        # Schedule on a fixed grid so slow cycles do not shift all later ones
+        due += 1
+        now = time.time()
+        if due < now:
+            due = now
+        s.enterabs(due, 1, pollData, (sc, due))
 
-s.enter(1, 1, pollData, (s,))
+start = time.time() + 1
+s.enterabs(start, 1, pollData, (s, start))
 s.run()
-
-
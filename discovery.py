@@ -0,0 +1,247 @@
+import re
+import serial.tools.list_ports
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from prologix import prologix
+
+SCAN_ADDRESSES = range(0, 31)
+SCAN_TIMEOUT = 0.03
+
+KIND_HP3478A = "hp3478a"
+KIND_PM2534  = "pm2534"
+KIND_SCPI    = "scpi"
+KIND_UNKNOWN = "unknown"
+
+HP3478A_READING = re.compile(r"^[+-]\d\.\d+E[+-]\d$")
+PM2534_READING  = re.compile(r"^[A-Z]+\s*[+-]\d\.\d+E[+-]\d+$")
+
+@dataclass
+class foundInstrument:
+    """Instrument found by `discover`
+
+    Attributes
+    ----------
+    port : str
+        Port of the adapter
+    addr : int
+        GPIB address
+    kind : str
+        KIND_HP3478A, KIND_PM2534, KIND_SCPI or KIND_UNKNOWN
+    ident : str
+        Response used for identification, `*IDN?` for SCPI devices
+    gpib : prologix
+        Connected adapter the instrument is attached to
+    """
+    port: str = None
+    addr: int = None
+    kind: str = KIND_UNKNOWN
+    ident: str = None
+    gpib: prologix = None
+
+    def driver(self):
+        """Create a driver instance for the instrument
+
+        Returns
+        -------
+        hp3478a|pm2534|None
+            Driver sharing `gpib`, None if there is no driver for the kind
+        """
+        if self.kind == KIND_HP3478A:
+            from hp3478a import hp3478a
+            return hp3478a(self.addr, prologixGpib=self.gpib)
+        if self.kind == KIND_PM2534:
+            from pm2534 import pm2534
+            return pm2534(self.addr, prologixGpib=self.gpib)
+        return None
+
+def candidatePorts() -> list:
+    """List serial ports which may have an adapter attached
+
+    Returns
+    -------
+    list
+        Device names like `/dev/ttyACM0` or `COM3`
+    """
+    return [port.device for port in serial.tools.list_ports.comports()]
+
+def findAdapters(ports: list=None, baud: int=115200, timeout: float=0.25) -> dict:
+    """Probe ports concurrently for Prologix compatible adapters
+
+    Each port is checked for a `++ver` banner like `prologix.__init__` does,
+    so all adapters boot at the same time instead of one after another.
+
+    Parameters
+    ----------
+    ports : list, optional
+        Ports to probe, see `transports.openTransport` for supported formats
+        by default None for all `candidatePorts`
+    baud : int, optional
+        baudrate used for serial communication
+        by default 115200
+    timeout : float, optional
+        timeout of the returned adapters
+        by default 0.25 seconds
+
+    Returns
+    -------
+    dict
+        Connected prologix instances indexed by port
+    """
+    if ports is None:
+        ports = candidatePorts()
+    if len(ports) == 0:
+        return {}
+
+    def connect(port):
+        gpib = prologix(port, baud=baud, timeout=timeout)
+        if gpib.serial is None:
+            return None
+        return gpib
+
+    with ThreadPoolExecutor(max_workers=len(ports)) as pool:
+        adapters = dict(zip(ports, pool.map(connect, ports)))
+    return {port: gpib for port, gpib in adapters.items() if gpib is not None}
+
+def scanBus(gpib: prologix, addrs=SCAN_ADDRESSES, timeout: float=SCAN_TIMEOUT) -> list:
+    """Find devices attached to an adapter
+
+    AR488 adapters are asked using `++findlstn`, others by serial polling
+    each address with a short `++read_tmo_ms`.
+
+    Parameters
+    ----------
+    gpib : prologix
+        Connected adapter
+    addrs : iterable, optional
+        addresses to scan
+        by default 0 to 30
+    timeout : float, optional
+        number of seconds to wait for each device
+        by default SCAN_TIMEOUT
+
+    Returns
+    -------
+    list
+        addresses of responding devices
+    """
+    addrs = list(addrs)
+    oldTimeout = gpib.timeout
+
+    with gpib.transaction():
+        gpib.timeout = timeout + gpib.READ_MARGIN
+        try:
+            gpib.cmdWrite("++read_tmo_ms " + str(gpib.readTimeoutMs(timeout)))
+            if gpib.version is not None and "AR488".casefold() in gpib.version.casefold():
+                listeners = gpib.cmdPoll("++findlstn", read=False)
+                if listeners is not None:
+                    found = [int(a) for a in re.findall(r"\d+", listeners.rpartition(":")[2])]
+                    return [addr for addr in addrs if addr in found]
+
+            found = []
+            for addr in addrs:
+                if gpib.cmdSpoll(addr) is not None:
+                    found.append(addr)
+            return found
+        finally:
+            gpib.timeout = oldTimeout
+            gpib.cmdWrite("++read_tmo_ms " + str(gpib.readTimeoutMs(oldTimeout)))
+
+def identify(gpib: prologix, addr: int, timeout: float=0.25) -> tuple:
+    """Identify a device
+
+    Devices continuously measuring are recognized by the format of their
+    readings, others are asked for `*IDN?`. Instruments not knowing `*IDN?`
+    may flag a syntax error.
+
+    Parameters
+    ----------
+    gpib : prologix
+        Connected adapter
+    addr : int
+        address of the device
+    timeout : float, optional
+        number of seconds to wait for responses
+        by default 0.25 seconds
+
+    Returns
+    -------
+    tuple
+        kind (KIND_HP3478A, KIND_PM2534, KIND_SCPI or KIND_UNKNOWN) and the
+        response used for identification
+    """
+    oldTimeout = gpib.timeout
+    with gpib.transaction():
+        gpib.timeout = timeout
+        try:
+            reading = gpib.cmdRead(addr)
+            if reading is not None:
+                if HP3478A_READING.match(reading):
+                    return KIND_HP3478A, reading
+                if PM2534_READING.match(reading):
+                    return KIND_PM2534, reading
+
+            ident = gpib.cmdPoll("*IDN?", addr)
+            if ident is not None and len(ident) > 0:
+                return KIND_SCPI, ident
+            return KIND_UNKNOWN, reading
+        finally:
+            gpib.timeout = oldTimeout
+
+def discover(ports: list=None, addrs=SCAN_ADDRESSES, baud: int=115200, timeout: float=0.25) -> list:
+    """Find all adapters and the instruments attached to them
+
+    Adapters are probed and scanned concurrently.
+
+    Example
+    -------
+    for found in discover():
+        print(found.port, found.addr, found.kind)
+        meter = found.driver()
+
+    Parameters
+    ----------
+    ports : list, optional
+        Ports to probe
+        by default None for all `candidatePorts`
+    addrs : iterable, optional
+        GPIB addresses to scan
+        by default 0 to 30
+    baud : int, optional
+        baudrate used for serial communication
+        by default 115200
+    timeout : float, optional
+        timeout of the adapters and for identification
+        by default 0.25 seconds
+
+    Returns
+    -------
+    list
+        foundInstrument for each device, ordered by port and address
+    """
+    adapters = findAdapters(ports, baud=baud, timeout=timeout)
+
+    def scan(port):
+        gpib = adapters[port]
+        found = []
+        for addr in scanBus(gpib, addrs):
+            kind, ident = identify(gpib, addr, timeout=timeout)
+            found.append(foundInstrument(port=port, addr=addr, kind=kind, ident=ident, gpib=gpib))
+        return found
+
+    if len(adapters) == 0:
+        return []
+    with ThreadPoolExecutor(max_workers=len(adapters)) as pool:
+        results = pool.map(scan, sorted(adapters))
+    return [found for result in results for found in result]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find Prologix compatible adapters and attached instruments")
+    parser.add_argument("ports", nargs="*", help="ports to probe (def=all serial ports)")
+    parser.add_argument("--baud", type=int, default=115200, help="baudrate (def=115200)")
+    arg = parser.parse_args()
+
+    for found in discover(arg.ports or None, baud=arg.baud):
+        print(found.port + "\t" + str(found.addr) + "\t" + found.kind + "\t" + str(found.ident))
@@ -0,0 +1,711 @@
+#!/usr/bin/env python3
+
+# Emulated Prologix/AR488 adapter with virtual HP3478A and PM2534 multimeters
+#
+# Run this file to get a pseudo terminal the real classes can connect to:
+#   python3 emulator.py --hp3478a 23 --pm2534 22
+#   meter = hp3478a(23, "/dev/pts/5")
+# or use it in-process with a loopback transport:
+#   emu = prologixEmulator([virtualHp3478a(23)])
+#   gpib = prologix(transport=loopbackTransport(emu.handle))
+
+import argparse
+import os
+import random
+import threading
+import time
+import tty
+
+ESC = 27
+LF  = 10
+CR  = 13
+
+class virtualInstrument(object):
+    """Base class for instruments attached to the emulated bus
+
+    Attributes
+    ----------
+    addr : int
+        GPIB address of the instrument
+    noise : float
+        Standard deviation of the reading noise relative to the range
+    speed : float
+        Factor applied to all conversion times. 0 for instant readings
+    spr : int
+        Serial poll register
+    """
+
+    addr: int = None
+    noise: float = 0.0
+    speed: float = 1.0
+    spr: int = 0
+
+    def __init__(self, addr: int, noise: float=0.0, speed: float=1.0, seed: int=None):
+        """
+
+        Parameters
+        ----------
+        addr : int
+            GPIB address of the instrument
+        noise : float, optional
+            Standard deviation of the reading noise relative to the range
+            by default 0
+        speed : float, optional
+            Factor applied to all conversion times. 0 for instant readings
+            by default 1
+        seed : int, optional
+            Seed of the noise generator for reproducible readings
+            by default None
+        """
+        self.addr = addr
+        self.noise = noise
+        self.speed = speed
+        self.spr = 0
+        self.random = random.Random(seed)
+        self._output = []
+
+    def write(self, data: bytes):
+        """Receive a device command
+
+        Parameters
+        ----------
+        data : bytes
+            Unescaped command without terminator
+        """
+        pass
+
+    def read(self, timeout: float=None) -> bytes:
+        """Send the pending response, waiting for a conversion if needed
+
+        Parameters
+        ----------
+        timeout : float, optional
+            number of seconds to wait for a conversion at maximum,
+            see `++read_tmo_ms`
+            by default None to wait until it finished
+
+        Returns
+        -------
+        bytes|None
+            Response without terminator, None if the instrument has nothing
+            to send and would let the read time out
+        """
+        if len(self._output) > 0:
+            return self._output.pop(0)
+        return None
+
+    def trigger(self):
+        """Handle GPIB GET"""
+        pass
+
+    def clear(self):
+        """Handle GPIB SDC"""
+        self._output.clear()
+
+    def spoll(self) -> int:
+        """Handle a serial poll
+
+        Returns
+        -------
+        int
+            Status byte, RQS is cleared afterwards
+        """
+        status = self.spr
+        self.spr &= ~0x40
+        return status
+
+    def srq(self) -> bool:
+        """Whether the instrument asserts SRQ"""
+        return self.spr & 0x40 != 0
+
+    def _wait(self, seconds: float):
+        """Sleep for a scaled conversion time"""
+        seconds = seconds * self.speed
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class virtualHp3478a(virtualInstrument):
+    """Virtual HP3478A multimeter
+
+    Understands the program codes F, R, N, T, Z, D, M, K, B, S, E and W and
+    any concatenation of them like `F1R0N5T1Z1`.
+
+    Attributes
+    ----------
+    values : dict
+        Simulated input values indexed by function number
+    calibration : bytes
+        Calibration RAM as returned by `W`, one nibble per byte
+    """
+
+    # Lowest range code per function, status range 1 corresponds to this
+    RANGE_BASE = {1: -2, 2: -1, 3: 1, 4: 1, 5: -1, 6: -1, 7: 7}
+    RANGE_MAX  = {1: 2, 2: 2, 3: 7, 4: 7, 5: 0, 6: 0, 7: 7}
+
+    # Seconds per reading indexed by digits code at 50Hz
+    CONVERSION = {1: 0.2, 2: 0.02, 3: 0.014}
+
+    def __init__(self, addr: int, noise: float=0.0, speed: float=1.0, seed: int=None, calibration: str=None):
+        """
+
+        Parameters
+        ----------
+        addr : int
+            GPIB address of the instrument
+        noise : float, optional
+            Standard deviation of the reading noise relative to the range
+            by default 0
+        speed : float, optional
+            Factor applied to all conversion times. 0 for instant readings
+            by default 1
+        seed : int, optional
+            Seed of the noise generator for reproducible readings
+            by default None
+        calibration : str, optional
+            File with calibration RAM contents as written by
+            `hp3478a.getCalibration`
+            by default empty calibration RAM
+        """
+        super().__init__(addr, noise=noise, speed=speed, seed=seed)
+        self.values = {1: 1.0, 2: 0.5, 3: 100.0, 4: 100.0, 5: 0.01, 6: 0.01, 7: 1e6}
+        self.function = 1
+        self.rangeCode = 0
+        self.autoRange = True
+        self.digits = 1
+        self.triggerMode = 1
+        self.autoZero = True
+        self.srqMask = 0
+        self.errors = 0
+        self.display = None
+        self.frontPorts = True
+        self.freq50Hz = True
+        self._triggered = False
+        self._lastReading = time.monotonic()
+
+        self.calibration = bytes([0x40]) * 256
+        if calibration is not None:
+            with open(calibration, "rb") as fp:
+                data = fp.read()
+            self.calibration = data + self.calibration[len(data):]
+
+    def write(self, data: bytes):
+        i = 0
+        while i < len(data):
+            code = chr(data[i]).upper()
+            i += 1
+            if code in " \r\n,;":
+                continue
+            if code == "W":
+                if i < len(data):
+                    self._queue(bytes([self.calibration[data[i]]]))
+                    i += 1
+                continue
+            if code == "D":
+                mode = chr(data[i]) if i < len(data) else "1"
+                text = data[i+1:].decode(errors="replace")
+                self.display = None if mode == "1" else text
+                return
+
+            arg = ""
+            while i < len(data) and (chr(data[i]).isdigit() or chr(data[i]) in "-Aa"):
+                arg += chr(data[i])
+                i += 1
+            if not self._execute(code, arg):
+                self._assert(4)
+
+    def _execute(self, code: str, arg: str) -> bool:
+        """Execute a single program code
+
+        Returns
+        -------
+        bool
+            False on syntax errors
+        """
+        try:
+            if code == "F":
+                self.function = int(arg)
+                self.rangeCode = min(max(self.rangeCode, self.RANGE_BASE[self.function]), self.RANGE_MAX[self.function])
+            elif code == "R":
+                if arg.upper() == "A":
+                    self.autoRange = True
+                else:
+                    self.autoRange = False
+                    self.rangeCode = min(max(int(arg), self.RANGE_BASE[self.function]), self.RANGE_MAX[self.function])
+            elif code == "N":
+                self.digits = {3: 3, 4: 2, 5: 1}[int(arg)]
+            elif code == "T":
+                self.triggerMode = int(arg)
+                self._triggered = False
+            elif code == "Z":
+                self.autoZero = int(arg) != 0
+            elif code == "M":
+                self.srqMask = int(arg, 8) & 0b111111
+            elif code == "K":
+                self.spr = 0
+            elif code == "B":
+                self._queue(self.statusBytes())
+            elif code == "S":
+                self._queue(b"1" if self.frontPorts else b"0")
+            elif code == "E":
+                self._queue(format(self.errors, "02o").encode())
+                self.errors = 0
+            elif code == "H":
+                self.function = int(arg) if arg else self.function
+                self.trigger()
+            else:
+                return False
+        except (ValueError, KeyError):
+            return False
+        return True
+
+    def _queue(self, data: bytes):
+        """Put a response into the output buffer, replacing unread ones"""
+        self._output = [data]
+
+    def _assert(self, bit: int):
+        """Set a serial poll bit and request service if it is unmasked"""
+        self.spr |= bit
+        if self.srqMask & bit:
+            self.spr |= 0x40
+
+    def statusBytes(self) -> bytes:
+        """Build the 5 status bytes returned by `B`"""
+        rangeStatus = self.rangeCode - self.RANGE_BASE[self.function] + 1
+        sb1 = (self.function << 5) | (rangeStatus << 2) | self.digits
+        sb2 = 0
+        if self.triggerMode == 1:
+            sb2 |= 1 << 0
+        if self.autoRange:
+            sb2 |= 1 << 1
+        if self.autoZero:
+            sb2 |= 1 << 2
+        if self.freq50Hz:
+            sb2 |= 1 << 3
+        if self.frontPorts:
+            sb2 |= 1 << 4
+        if self.triggerMode == 2:
+            sb2 |= 1 << 6
+        return bytes((sb1, sb2, self.srqMask, self.errors, 0))
+
+    def fullScale(self) -> float:
+        """Full scale value of the current range"""
+        if self.function in (3, 4, 7):
+            return 30.0 * 10 ** (self.rangeCode - 1)
+        return 3.0 * 10 ** self.rangeCode
+
+    def reading(self) -> bytes:
+        """Take a reading and format it like the instrument"""
+        value = self.values[self.function]
+        if self.autoRange:
+            self.rangeCode = self.RANGE_BASE[self.function]
+            while abs(value) > self.fullScale() and self.rangeCode < self.RANGE_MAX[self.function]:
+                self.rangeCode += 1
+        if self.noise > 0:
+            value += self.random.gauss(0, self.noise) * self.fullScale()
+        if abs(value) > self.fullScale() * 1.0000001:
+            return b"+9.99999E+9"
+
+        decimals = {1: 5, 2: 4, 3: 3}[self.digits]
+        exponent = 0
+        if value != 0:
+            while abs(value) >= 10:
+                value /= 10
+                exponent += 1
+            while abs(value) < 1:
+                value *= 10
+                exponent -= 1
+        return ("{:+.{}f}E{:+d}".format(value, decimals, exponent)).encode()
+
+    def read(self, timeout: float=None) -> bytes:
+        if len(self._output) > 0:
+            return self._output.pop(0)
+
+        conversion = self.CONVERSION[self.digits]
+        if self.triggerMode == 1:
+            remaining = self._lastReading + conversion * self.speed - time.monotonic()
+            if timeout is not None and remaining > timeout:
+                time.sleep(timeout)
+                return None
+            if remaining > 0:
+                time.sleep(remaining)
+        elif self._triggered:
+            self._wait(conversion)
+            self._triggered = False
+        else:
+            return None
+
+        self._lastReading = time.monotonic()
+        self.spr &= ~1
+        return self.reading()
+
+    def trigger(self):
+        self._triggered = True
+        self._assert(1)
+
+    def clear(self):
+        super().clear()
+        self.display = None
+        self.triggerMode = 1
+
+    def spoll(self) -> int:
+        if self.triggerMode == 1 and time.monotonic() >= self._lastReading + self.CONVERSION[self.digits] * self.speed:
+            self._assert(1)
+        return super().spoll()
+
+    def srq(self) -> bool:
+        if self.triggerMode == 1 and self.srqMask & 1 and time.monotonic() >= self._lastReading + self.CONVERSION[self.digits] * self.speed:
+            self._assert(1)
+        return super().srq()
+
+
+class virtualPm2534(virtualInstrument):
+    """Virtual Philips PM2534 multimeter
+
+    Understands FNC, RNG, DIG, TRG and MSP, separated by `;`, and their
+    queries like `FNC ?`.
+
+    Attributes
+    ----------
+    values : dict
+        Simulated input values indexed by function name
+    """
+
+    FUNCTIONS = ("VDC", "VAC", "RTW", "RFW", "IDC", "IAC", "TDC")
+
+    # Seconds per reading indexed by measurement speed
+    CONVERSION = {1: 0.5, 2: 0.1, 3: 0.02, 4: 0.005}
+
+    def __init__(self, addr: int, noise: float=0.0, speed: float=1.0, seed: int=None):
+        """
+
+        Parameters
+        ----------
+        addr : int
+            GPIB address of the instrument
+        noise : float, optional
+            Standard deviation of the reading noise relative to the range
+            by default 0
+        speed : float, optional
+            Factor applied to all conversion times. 0 for instant readings
+            by default 1
+        seed : int, optional
+            Seed of the noise generator for reproducible readings
+            by default None
+        """
+        super().__init__(addr, noise=noise, speed=speed, seed=seed)
+        self.values = {"VDC": 1.0, "VAC": 0.5, "RTW": 1000.0, "RFW": 1000.0, "IDC": 0.01, "IAC": 0.01, "TDC": 25.0}
+        self.function = "VDC"
+        self.range = None
+        self.digits = 5
+        self.triggerMode = "I"
+        self.measSpeed = 2
+        self._triggered = False
+        self._lastReading = time.monotonic()
+
+    def write(self, data: bytes):
+        for command in data.decode(errors="replace").split(";"):
+            parts = command.strip().upper().split(None, 1)
+            if len(parts) == 0:
+                continue
+            name = parts[0]
+            arg = parts[1].strip() if len(parts) > 1 else ""
+
+            if arg == "?":
+                value = {"FNC": self.function, "RNG": "AUTO" if self.range is None else "{:1.3E}".format(self.range), "DIG": str(self.digits), "TRG": self.triggerMode, "MSP": str(self.measSpeed)}.get(name)
+                if value is not None:
+                    self._output.append((name + " " + value).encode())
+                continue
+
+            try:
+                if name == "FNC" and arg in self.FUNCTIONS:
+                    self.function = arg
+                elif name == "RNG":
+                    self.range = None if arg == "AUTO" else float(arg)
+                elif name == "DIG":
+                    self.digits = int(arg)
+                elif name == "TRG":
+                    self.triggerMode = arg
+                    self._triggered = False
+                elif name == "MSP":
+                    self.measSpeed = int(arg)
+                elif name == "X":
+                    self.trigger()
+                else:
+                    self._assert(4)
+            except ValueError:
+                self._assert(4)
+
+    def _assert(self, bit: int):
+        """Set a serial poll bit and request service"""
+        self.spr |= bit | 0x40
+
+    def reading(self) -> bytes:
+        """Take a reading and format it like the instrument"""
+        value = self.values[self.function]
+        if self.noise > 0:
+            scale = self.range if self.range is not None else max(abs(value), 1e-3)
+            value += self.random.gauss(0, self.noise) * scale
+        return (self.function.ljust(6) + "{:+.{}E}".format(value, max(self.digits - 1, 0))).encode()
+
+    def read(self, timeout: float=None) -> bytes:
+        if len(self._output) > 0:
+            return self._output.pop(0)
+
+        conversion = self.CONVERSION.get(self.measSpeed, 0.1)
+        if self.triggerMode == "I":
+            remaining = self._lastReading + conversion * self.speed - time.monotonic()
+            if timeout is not None and remaining > timeout:
+                time.sleep(timeout)
+                return None
+            if remaining > 0:
+                time.sleep(remaining)
+        elif self._triggered:
+            self._wait(conversion)
+            self._triggered = False
+        else:
+            return None
+
+        self._lastReading = time.monotonic()
+        return self.reading()
+
+    def trigger(self):
+        self._triggered = True
+
+    def clear(self):
+        super().clear()
+        self.triggerMode = "I"
+
+
+class prologixEmulator(object):
+    """Emulated Prologix/AR488 adapter in controller mode
+
+    Implements the `++` commands used by the prologix class: ver, addr, auto,
+    eoi, eos, eot_enable, eot_char, read_tmo_ms, mode, ifc, rst, savecfg,
+    read, clr, trg, spoll, srq and loc.
+
+    Attributes
+    ----------
+    instruments : dict
+        Attached virtual instruments indexed by address
+    latency : float
+        Seconds the adapter takes to turn around a response
+    version : str
+        Response to `++ver`
+    config : dict
+        Adapter settings indexed by command name
+    """
+
+    instruments: dict = None
+    latency: float = 0.0
+    version: str = "Prologix GPIB-USB Controller version 6.107 (emulated)"
+    config: dict = None
+
+    def __init__(self, instruments: list=(), latency: float=0.0, version: str=None):
+        """
+
+        Parameters
+        ----------
+        instruments : list, optional
+            Virtual instruments to attach
+            by default none
+        latency : float, optional
+            Seconds the adapter takes to turn around a response
+            by default 0
+        version : str, optional
+            Response to `++ver`
+            by default a Prologix GPIB-USB version string
+        """
+        self.instruments = {}
+        for instrument in instruments:
+            self.attach(instrument)
+        self.latency = latency
+        if version is not None:
+            self.version = version
+        self.config = {}
+        self.reset()
+        self._rx = bytearray()
+        self._escaped = False
+        self._lock = threading.Lock()
+        self._master = None
+        self._slave = None
+
+    def attach(self, instrument: virtualInstrument):
+        """Attach a virtual instrument to the bus
+
+        Parameters
+        ----------
+        instrument : virtualInstrument
+            Instrument to attach at its address
+        """
+        self.instruments[instrument.addr] = instrument
+
+    def reset(self):
+        """Restore power-on adapter settings"""
+        self.config = {"++mode": "1", "++addr": "0", "++auto": "0", "++eoi": "1", "++eos": "0", "++eot_enable": "0", "++eot_char": "0", "++read_tmo_ms": "500"}
+
+    def handle(self, data: bytes) -> bytes:
+        """Process data received from the host
+
+        May be passed as handler to `transports.loopbackTransport`.
+
+        Parameters
+        ----------
+        data : bytes
+            Raw data as sent by the host, may contain partial commands
+
+        Returns
+        -------
+        bytes
+            Data to send back to the host
+        """
+        out = bytearray()
+        with self._lock:
+            for b in data:
+                if self._escaped:
+                    self._rx.append(b)
+                    self._escaped = False
+                elif b == ESC:
+                    self._escaped = True
+                elif b == LF or b == CR:
+                    if len(self._rx) > 0:
+                        out += self._command(bytes(self._rx))
+                        self._rx.clear()
+                else:
+                    self._rx.append(b)
+
+        if len(out) > 0 and self.latency > 0:
+            time.sleep(self.latency)
+        return bytes(out)
+
+    def _respond(self, data: bytes) -> bytes:
+        """Terminate a response like the adapter does"""
+        if data is None:
+            return b""
+        data = data + b"\r\n"
+        if self.config["++eot_enable"] == "1":
+            data += bytes((int(self.config["++eot_char"]),))
+        return data
+
+    def _instrument(self, addr: int=None) -> virtualInstrument:
+        """Get the instrument at an address, default the current one"""
+        if addr is None:
+            addr = int(self.config["++addr"].split()[0])
+        return self.instruments.get(addr)
+
+    def _command(self, line: bytes) -> bytes:
+        """Execute a single line"""
+        if not line.startswith(b"++"):
+            instrument = self._instrument()
+            if instrument is None:
+                return b""
+            instrument.write(line)
+            if self.config["++auto"] == "1":
+                return self._respond(instrument.read())
+            return b""
+
+        parts = line.decode(errors="replace").split(None, 1)
+        name = parts[0]
+        arg = parts[1].strip() if len(parts) > 1 else None
+
+        if name in self.config:
+            if arg is None:
+                return (self.config[name] + "\r\n").encode()
+            self.config[name] = " ".join(arg.split())
+            return b""
+        if name == "++ver":
+            return (self.version + "\r\n").encode()
+        if name == "++rst":
+            self.reset()
+            return b""
+        if name == "++read":
+            instrument = self._instrument()
+            if instrument is None:
+                return b""
+            return self._respond(instrument.read(timeout=float(self.config["++read_tmo_ms"]) / 1000))
+        if name == "++clr":
+            instrument = self._instrument()
+            if instrument is not None:
+                instrument.clear()
+            return b""
+        if name == "++trg":
+            addrs = [int(a) for a in arg.split()] if arg else [None]
+            for addr in addrs:
+                instrument = self._instrument(addr)
+                if instrument is not None:
+                    instrument.trigger()
+            return b""
+        if name == "++spoll":
+            instrument = self._instrument(int(arg.split()[0]) if arg else None)
+            if instrument is None:
+                return b""
+            return (str(instrument.spoll()) + "\r\n").encode()
+        if name == "++srq":
+            asserted = any(instrument.srq() for instrument in self.instruments.values())
+            return b"1\r\n" if asserted else b"0\r\n"
+        # ++ifc, ++loc, ++savecfg, ++llo and unknown commands are accepted silently
+        return b""
+
+    def openPty(self) -> str:
+        """Serve the emulator on a pseudo terminal
+
+        A background thread answers everything written to the terminal.
+
+        Returns
+        -------
+        str
+            Path of the terminal to open, like `/dev/pts/5`
+        """
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        path = os.ttyname(self._slave)
+        thread = threading.Thread(target=self._serve, name="prologixEmulator " + path, daemon=True)
+        thread.start()
+        return path
+
+    def _serve(self):
+        """Answer data written to the pseudo terminal"""
+        while True:
+            try:
+                data = os.read(self._master, 4096)
+            except OSError:
+                return
+            if len(data) == 0:
+                return
+            response = self.handle(data)
+            if len(response) > 0:
+                os.write(self._master, response)
+
+    def close(self):
+        """Close the pseudo terminal"""
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = None
+        self._slave = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Emulated Prologix adapter on a pseudo terminal")
+    parser.add_argument("--hp3478a", type=int, action="append", default=[], metavar="ADDR", help="attach a virtual HP3478A at ADDR")
+    parser.add_argument("--pm2534", type=int, action="append", default=[], metavar="ADDR", help="attach a virtual PM2534 at ADDR")
+    parser.add_argument("--latency", type=float, default=0.0, help="adapter turnaround time in seconds (def=0)")
+    parser.add_argument("--noise", type=float, default=0.0, help="reading noise relative to range (def=0)")
+    parser.add_argument("--speed", type=float, default=1.0, help="factor for conversion times, 0 for instant readings (def=1)")
+    parser.add_argument("--calibration", help="calibration RAM file for the HP3478A")
+    parser.add_argument("--seed", type=int, help="seed for reproducible noise")
+    arg = parser.parse_args()
+
+    instruments = []
+    for addr in arg.hp3478a:
+        instruments.append(virtualHp3478a(addr, noise=arg.noise, speed=arg.speed, seed=arg.seed, calibration=arg.calibration))
+    for addr in arg.pm2534:
+        instruments.append(virtualPm2534(addr, noise=arg.noise, speed=arg.speed, seed=arg.seed))
+
+    emulator = prologixEmulator(instruments, latency=arg.latency)
+    print(emulator.openPty(), flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        emulator.close()
@@ -1,7 +1,59 @@
-from prologix import prologix
+from prologix import prologix, tagged
+from array import array
 from dataclasses import dataclass
-from time import sleep
 import datetime
+import inspect
+import time
+
+def _statusField(index: int, shift: int, mask: int) -> property:
+    """Build a status property decoding a bit field by table lookup
+
+    Parameters
+    ----------
+    index : int
+        status byte holding the field
+    shift : int
+        position of the lowest bit
+    mask : int
+        mask applied after shifting
+
+    Returns
+    -------
+    property
+        Decoded value, None if no status was read yet
+    """
+    table = tuple((byte >> shift) & mask for byte in range(256))
+
+    def get(self):
+        raw = self.raw
+        if raw is None:
+            return None
+        return table[raw[index]]
+    return property(get)
+
+def _statusFlag(index: int, bit: int) -> property:
+    """Build a status property decoding a single bit by table lookup
+
+    Parameters
+    ----------
+    index : int
+        status byte holding the bit
+    bit : int
+        bit position
+
+    Returns
+    -------
+    property
+        Decoded value, None if no status was read yet
+    """
+    table = tuple(byte & (1 << bit) != 0 for byte in range(256))
+
+    def get(self):
+        raw = self.raw
+        if raw is None:
+            return None
+        return table[raw[index]]
+    return property(get)
 
 class hp3478a(object):
     """Control HP3478A multimeters using a Prologix compatible dongle
@@ -15,10 +67,18 @@ class hp3478a(object):
         Prologix object used to communicate with the prologix dongle
     status : hp3478aStatus
         Current device status
+    history : hp3478aHistory
+        Every status read, None if disabled, see `history` parameter
+    statusTTL : float
+        Seconds `refreshStatus` uses the cached status before reading it
+        again, None to keep it until invalidated
+    srqCallbacks : dict
+        Service request callbacks indexed by SRQ_* bit, see `onSRQ`
     """
 
     addr: int = None
     gpib: prologix = None
+    srqCallbacks: dict = None
 
     VDC  = 1
     VAC  = 2
@@ -34,12 +94,33 @@ class hp3478a(object):
     TRIG_HLD = 4
     TRIG_FST = 5
 
-    @dataclass
+    # Lowest and highest `R` argument per function, status range 1
+    # corresponds to the lowest one
+    RANGE_BASE = {VDC: -2, VAC: -1, Ω2W: 1, Ω4W: 1, ADC: -1, AAC: -1, TEM: 7}
+    RANGE_MAX  = {VDC: 2, VAC: 2, Ω2W: 7, Ω4W: 7, ADC: 0, AAC: 0, TEM: 7}
+
+    SRQ_READING = 1
+    SRQ_SYNTAX  = 4
+    SRQ_HWERR   = 8
+    SRQ_KBD     = 16
+    SRQ_CAL     = 32
+    SRQ_RQS     = 64
+    SRQ_PON     = 128
+
     class hp3478aStatus:
         """Current device status
 
+        Only the raw status bytes are stored, all other attributes are
+        decoded from them on access using precomputed tables. Instances
+        belong to a single device, see `hp3478a.status`.
+
         Attributes
         ----------
+        raw : bytes
+            5 status bytes as returned by the `B` command
+            None if no status was read yet
+        updated : float
+            time.time() of the last status reading
         function : int
             numeric representation of currently used measurement function:
             1: DC Voltage
@@ -116,35 +197,224 @@ class hp3478a(object):
             Raw DAC value
 
         fetched: datetime
-            Date and time this status was updated
+            Date and time this status was updated, see `updated`
+        """
+        __slots__ = ("raw", "updated")
+
+        def __init__(self, raw: bytes=None, updated: float=None):
+            self.raw = raw
+            self.updated = updated
+
+        def update(self, raw) -> bool:
+            """Store new status bytes
+
+            Fields are decoded on access, so unchanged bytes only update
+            the time.
+
+            Parameters
+            ----------
+            raw : bytes|memoryview
+                5 status bytes as returned by the `B` command
+
+            Returns
+            -------
+            bool
+                Whether the status changed
+            """
+            self.updated = time.time()
+            if raw == self.raw:
+                return False
+            self.raw = bytes(raw)
+            return True
+
+        @property
+        def fetched(self) -> datetime.datetime:
+            if self.updated is None:
+                return None
+            return datetime.datetime.fromtimestamp(self.updated)
+
+        #Byte 1: Function/Range/Digits
+        digits          = _statusField(0, 0, 0b11)
+        range           = _statusField(0, 2, 0b111)
+        function        = _statusField(0, 5, 0b111)
+
+        #Byte 2: Status Bits
+        triggerInternal = _statusFlag(1, 0)
+        autoRange       = _statusFlag(1, 1)
+        autoZero        = _statusFlag(1, 2)
+        freq50Hz        = _statusFlag(1, 3)
+        frontPorts      = _statusFlag(1, 4)
+        calRAM          = _statusFlag(1, 5)
+        triggerExternal = _statusFlag(1, 6)
+
+        #Byte 3: Serial Poll Mask
+        srqReading      = _statusFlag(2, 0)
+            #Bit 1 not used
+        srqSyntaxErr    = _statusFlag(2, 2)
+        srqHWErr        = _statusFlag(2, 3)
+        srqKbd          = _statusFlag(2, 4)
+        srqCalFailed    = _statusFlag(2, 5)
+            #Bit 6 always zero
+        srqPon          = _statusFlag(2, 7)
+
+        #Byte 4: Error Information
+        errChecksum     = _statusFlag(3, 0)
+        errRAM          = _statusFlag(3, 1)
+        errROM          = _statusFlag(3, 2)
+        errADSlope      = _statusFlag(3, 3)
+        errADSelfTest   = _statusFlag(3, 4)
+        errADLink       = _statusFlag(3, 5)
+
+        #Byte 5: RAW DAC value
+        dac             = _statusField(4, 0, 0xFF)
+
+    class hp3478aHistory:
+        """Ring buffer of status readings
+
+        Each entry takes 16 bytes, the time as float and the 5 status bytes
+        packed into one integer, so every reading can be logged.
+
+        Attributes
+        ----------
+        size : int
+            Maximum number of entries kept
+        """
+
+        def __init__(self, size: int):
+            self.size = size
+            self._times = array("d", bytes(8 * size))
+            self._packed = array("Q", bytes(8 * size))
+            self._count = 0
+
+        def __len__(self) -> int:
+            return min(self._count, self.size)
+
+        def append(self, status):
+            """Record a status
+
+            Parameters
+            ----------
+            status : hp3478aStatus
+                Status to record
+            """
+            i = self._count % self.size
+            self._times[i] = status.updated
+            self._packed[i] = int.from_bytes(status.raw, "little")
+            self._count += 1
+
+        def entries(self) -> list:
+            """Get the recorded statuses
+
+            Returns
+            -------
+            list
+                hp3478aStatus for each entry, oldest first
+            """
+            first = self._count - len(self)
+            out = []
+            for n in range(first, self._count):
+                i = n % self.size
+                out.append(hp3478a.hp3478aStatus(self._packed[i].to_bytes(5, "little"), self._times[i]))
+            return out
+
+        def clear(self):
+            """Remove all entries
+            """
+            self._count = 0
+
+    @dataclass
+    class hp3478aProfile:
+        """Measurement configuration applied by `configure`
+
+        Settings left at None are not changed.
+
+        Attributes
+        ----------
+        function : int
+            measurement function, see `setFunction`
+        range : str|float
+            measurement range, see `setRange`
+        digits : float
+            measurement resolution, see `setDigits`
+        trigger : int
+            trigger mode, see `setTrigger`
+        autoZero : bool
+            Auto-Zero setting, see `setAutoZero`
+        display : str
+            Text to show, see `setDisplay`. Empty for the standard display
         """
         function: int = None
-        range: int = None
-        digits: int = None
-        triggerExternal: bool = None
-        calRAM: bool = None
-        frontPorts: bool = None
-        freq50Hz: bool = None
+        range: object = None
+        digits: float = None
+        trigger: int = None
         autoZero: bool = None
-        autoRange: bool = None
-        triggerInternal: bool = None
-        srqPon: bool = None
-        srqCalFailed: bool = None
-        srqKbd: bool = None
-        srqHWErr: bool = None
-        srqSyntaxErr: bool = None
-        srqReading: bool = None
-        errADLink: bool = None
-        errADSelfTest: bool = None
-        errADSlope: bool = None
-        errROM: bool = None
-        errRAM: bool = None
-        errChecksum: bool = None
-        dac: int = None
-        fetched: datetime = None
-    status = hp3478aStatus()
+        display: str = None
+
+    PRESETS = {
+        "vdc":     hp3478aProfile(function=VDC, range="A", digits=5.5, trigger=TRIG_INT, autoZero=True),
+        "vdcFast": hp3478aProfile(function=VDC, range="A", digits=3.5, trigger=TRIG_INT, autoZero=False),
+        "vac":     hp3478aProfile(function=VAC, range="A", digits=5.5, trigger=TRIG_INT, autoZero=True),
+        "ohm2w":   hp3478aProfile(function=Ω2W, range="A", digits=5.5, trigger=TRIG_INT, autoZero=True),
+        "ohm4w":   hp3478aProfile(function=Ω4W, range="A", digits=5.5, trigger=TRIG_INT, autoZero=True),
+        "adc":     hp3478aProfile(function=ADC, range="A", digits=5.5, trigger=TRIG_INT, autoZero=True),
+        "aac":     hp3478aProfile(function=AAC, range="A", digits=5.5, trigger=TRIG_INT, autoZero=True),
+    }
+
+    @dataclass
+    class hp3478aCalEntry:
+        """Calibration constants of a function and range
 
-    def __init__(self, addr: int, port: str=None, baud: int=115200, timeout: float=0.25, prologixGpib: prologix=None, debug: bool=False):
+        Attributes
+        ----------
+        index : int
+            Position in the calibration data
+        function : int
+            measurement function, None for unused entries
+            Resistance entries apply to Ω2W and Ω4W
+        range : str
+            measurement range like `getRange`, None for all ranges
+        used : bool
+            Whether the device uses this entry
+        offset : int
+            Offset in ADC counts
+        gain : float
+            Gain factor
+        checksum : int
+            Stored checksum
+        valid : bool
+            Whether the checksum matches
+        """
+        index: int = None
+        function: int = None
+        range: str = None
+        used: bool = False
+        offset: int = None
+        gain: float = None
+        checksum: int = None
+        valid: bool = False
+
+    CAL_SIZE = 255
+    CAL_DEPTH = 16
+    CAL_PROGRESS = 1.0
+    CAL_ENTRIES = (
+        (VDC, "30mV"), (VDC, "300mV"), (VDC, "3V"), (VDC, "30V"), (VDC, "300V"),
+        (None, None),
+        (VAC, None),
+        (Ω2W, "30Ω"), (Ω2W, "300Ω"), (Ω2W, "3kΩ"), (Ω2W, "30kΩ"), (Ω2W, "300kΩ"), (Ω2W, "3MΩ"), (Ω2W, "30MΩ"),
+        (ADC, "300mA"), (ADC, "3A"),
+        (None, None),
+        (AAC, None),
+        (None, None),
+    )
+    CAL_GAIN_WEIGHTS = (0.01, 0.001, 0.0001, 0.00001, 0.000001)
+
+    status: hp3478aStatus = None
+    history: hp3478aHistory = None
+    statusTTL: float = 10.0
+    _statusStale: bool = True
+    _statusDiscards: int = 0
+
+    def __init__(self, addr: int, port: str=None, baud: int=115200, timeout: float=0.25, prologixGpib: prologix=None, debug: bool=False, history: int=0, statusTTL: float=10.0):
         """
 
         Parameters
@@ -153,6 +423,7 @@ class hp3478a(object):
             Address of the targeted device
         port : str, optional
             path of the serial device to use. Example: `/dev/ttyACM0` or `COM3`
+            or `tcp://host[:port]` for network adapters
             If set a new prologix instance will be created
             Either port or prologixGpib must be given
             by default None
@@ -174,17 +445,32 @@ class hp3478a(object):
         debug : bool, optional
             Whether to print verbose status messages and all communication
             by default False
+        history : int, optional
+            Number of status readings to keep in `history`, 0 to disable
+            by default 0
+        statusTTL : float, optional
+            Seconds the cached status is used by `refreshStatus`
+            None to read it only when invalidated
+            by default 10 seconds
         """
         if port == None and prologixGpib == None:
             print("!! You must supply either a serial port or a prologix object")
 
         self.addr = addr
+        self.status = self.hp3478aStatus()
+        self.statusTTL = statusTTL
+        if history > 0:
+            self.history = self.hp3478aHistory(history)
 
         if prologixGpib is None:
             self.gpib = prologix(port=port, baud=baud, timeout=timeout, debug=debug)
         else:
             self.gpib = prologixGpib
 
+        # Reading the Front/Rear switch is the cheapest command with a response
+        self.gpib.registerLiveness(self.addr, self.getFrontRear)
+
+    @tagged
     def getMeasure(self) -> float:
         """Get last measurement as float
 
@@ -198,8 +484,66 @@ class hp3478a(object):
         if measurement is None:
             return None
 
+        return self.parseMeasure(measurement)
+
+    def parseMeasure(self, measurement: str) -> float:
+        """Convert a measurement response to float
+
+        Parameters
+        ----------
+        measurement : str
+            Response as sent by the device
+
+        Returns
+        -------
+        float
+            measurement
+        """
         return float(measurement)
 
+    def armTrigger(self) -> bool:
+        """Prepare device for a synchronized measurement
+
+        The device will take a single measurement on GPIB GET,
+        see `prologix.syncMeasure`
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not
+        """
+        return self.setTrigger(self.TRIG_HLD, noUpdate=True)
+
+    async def armTriggerAsync(self) -> bool:
+        """Prepare device for a synchronized measurement
+
+        Awaitable variant of `armTrigger`, see `aioprologix.syncMeasure`
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not
+        """
+        return await self.setTriggerAsync(self.TRIG_HLD, noUpdate=True)
+
+    @tagged
+    async def getMeasureAsync(self) -> float:
+        """Get last measurement as float
+
+        Awaitable variant of `getMeasure`, requires an aioprologix instance
+
+        Returns
+        -------
+        float
+            last measurement
+        """
+        measurement = await self.gpib.cmdPoll(" ", self.addr)
+
+        if measurement is None:
+            return None
+
+        return self.parseMeasure(measurement)
+
     def getDigits(self, digits: int=None) -> float:
         """Get a human readable representation of currently used resolution
 
@@ -409,59 +753,186 @@ class hp3478a(object):
             else:
                 return None
 
+    @tagged
     def getStatus(self) -> hp3478aStatus:
         """Read current device status and populate status object
 
         Returns
         -------
-        hp3478aStatus
+        hp3478aStatus|None
             Updated status object
+            None if the device did not send all status bytes
         """
-        status = self.gpib.cmdPoll("B", self.addr, binary=True)
-        
-        #Update last readout time
-        self.status.fetched = datetime.datetime.now()
+        status = self.gpib.cmdPoll("B", self.addr, size=5)
+        return self._parseStatus(status)
 
-        #Byte 5: RAW DAC value
-        self.status.dac = status[4]
+    @tagged
+    async def getStatusAsync(self) -> hp3478aStatus:
+        """Read current device status and populate status object
 
-        #Byte 4: Error Information
-        self.status.errChecksum     = (status[3]&(1<<0) != 0)
-        self.status.errRAM          = (status[3]&(1<<1) != 0)
-        self.status.errROM          = (status[3]&(1<<2) != 0)
-        self.status.errADSlope      = (status[3]&(1<<3) != 0)
-        self.status.errADSelfTest   = (status[3]&(1<<4) != 0)
-        self.status.errADLink       = (status[3]&(1<<5) != 0)
+        Awaitable variant of `getStatus`, requires an aioprologix instance
 
-        #Byte 3: Serial Poll Mask
-        self.status.srqReading      = (status[2]&(1<<0) != 0)
-            #Bit 1 not used
-        self.status.srqSyntaxErr    = (status[2]&(1<<2) != 0)
-        self.status.srqHWErr        = (status[2]&(1<<3) != 0)
-        self.status.srqKbd          = (status[2]&(1<<4) != 0)
-        self.status.srqCalFailed    = (status[2]&(1<<5) != 0)
-            #Bit 6 always zero
-        self.status.srqPon          = (status[2]&(1<<7) != 0)
+        Returns
+        -------
+        hp3478aStatus|None
+            Updated status object
+            None if the device did not send all status bytes
+        """
+        status = await self.gpib.cmdPoll("B", self.addr, size=5)
+        return self._parseStatus(status)
 
-        #Byte 2: Status Bits
-        self.status.triggerInternal = (status[1]&(1<<0) != 0)
-        self.status.autoRange       = (status[1]&(1<<1) != 0)
-        self.status.autoZero        = (status[1]&(1<<2) != 0)
-        self.status.freq50Hz        = (status[1]&(1<<3) != 0)
-        self.status.frontPorts      = (status[1]&(1<<4) != 0)
-        self.status.calRAM          = (status[1]&(1<<5) != 0)
-        self.status.triggerExternal = (status[1]&(1<<6) != 0)
+    def refreshStatus(self, force: bool=False) -> hp3478aStatus:
+        """Get the status, reading it from the device only if the cache expired
+
+        The cached status is kept up to date by all `set*` methods and
+        `configure`, even with `noUpdate`. It is read again after
+        `statusTTL`, after service requests for errors or the SRQ key,
+        after a reset, after a `batch` was discarded or if `force` is
+        set. Only changes made on the front panel remain unnoticed
+        meanwhile, as well as ranges selected by Auto-Range.
+
+        Parameters
+        ----------
+        force : bool, optional
+            Whether to read the status in any case
+            by default False
+
+        Returns
+        -------
+        hp3478aStatus|None
+            Status object
+            None if the device did not send all status bytes
+        """
+        if self._statusExpired(force):
+            return self.getStatus()
+        return self.status
+
+    async def refreshStatusAsync(self, force: bool=False) -> hp3478aStatus:
+        """Get the status, reading it from the device only if the cache expired
+
+        Awaitable variant of `refreshStatus`, requires an aioprologix instance
+
+        Parameters
+        ----------
+        force : bool, optional
+            Whether to read the status in any case
+            by default False
+
+        Returns
+        -------
+        hp3478aStatus|None
+            Status object
+            None if the device did not send all status bytes
+        """
+        if self._statusExpired(force):
+            return await self.getStatusAsync()
+        return self.status
+
+    def _statusExpired(self, force: bool=False) -> bool:
+        """Check whether `refreshStatus` has to read the status
+
+        Parameters
+        ----------
+        force : bool, optional
+            Whether to read the status in any case
+            by default False
+
+        Returns
+        -------
+        bool
+            True if the cached status can not be used
+        """
+        status = self.status
+        if force or self._statusStale or status.raw is None:
+            return True
+        if self._statusDiscards != self.gpib.batchDiscards:
+            # Settings presumed in a dropped batch were never sent
+            return True
+        return self.statusTTL is not None and time.time() - status.updated > self.statusTTL
+
+    def invalidateStatus(self):
+        """Read the status on the next `refreshStatus`
+
+        Call this if the configuration was changed by other means than
+        this instance.
+        """
+        self._statusStale = True
+
+    def _presumeStatus(self, function: int=None, range=None, digits: str=None, trigger: int=None, autoZero: bool=None):
+        """Update the cached status for settings sent without verification
+
+        Parameters
+        ----------
+        function : int, optional
+            function sent with `F`
+        range : int|str, optional
+            argument sent with `R`
+        digits : str, optional
+            argument sent with `N`
+        trigger : int, optional
+            argument sent with `T`
+        autoZero : bool, optional
+            setting sent with `Z`
+        """
+        raw = self.status.raw
+        if raw is None:
+            return
 
         #Byte 1: Function/Range/Digits
-        sb1 = status[0]
-        self.status.digits = (sb1 & 0b00000011)
-        sb1 = sb1 >> 2
-        self.status.range = (sb1 & 0b00000111)
-        sb1 = sb1 >> 3
-        self.status.function = (sb1 & 0b00000111)
+        sb1 = raw[0]
+        newFunction = oldFunction = (sb1 >> 5) & 0b111
+        if oldFunction not in self.RANGE_BASE:
+            self.invalidateStatus()
+            return
+        rangeCode = ((sb1 >> 2) & 0b111) - 1 + self.RANGE_BASE[oldFunction]
+        newDigits = sb1 & 0b11
+        if function is not None:
+            newFunction = function
+        if range is not None and range != "A":
+            rangeCode = range
+        rangeCode = min(max(rangeCode, self.RANGE_BASE[newFunction]), self.RANGE_MAX[newFunction])
+        if digits is not None:
+            newDigits = 6 - int(digits)
+        sb1 = (newFunction << 5) | ((rangeCode - self.RANGE_BASE[newFunction] + 1) << 2) | newDigits
+
+        #Byte 2: Status Bits
+        sb2 = raw[1]
+        if range is not None:
+            sb2 = sb2 & ~(1<<1) | ((range == "A") << 1)
+        if autoZero is not None:
+            sb2 = sb2 & ~(1<<2) | (bool(autoZero) << 2)
+        if trigger is not None:
+            sb2 = sb2 & ~((1<<0) | (1<<6)) | (trigger == self.TRIG_INT) | ((trigger == self.TRIG_EXT) << 6)
+
+        self.status.raw = bytes((sb1, sb2)) + raw[2:]
+
+    def _parseStatus(self, status) -> hp3478aStatus:
+        """Populate status object from raw status bytes
+
+        Parameters
+        ----------
+        status : bytes|memoryview|None
+            5 status bytes as returned by the `B` command
+
+        Returns
+        -------
+        hp3478aStatus|None
+            Updated status object
+            None if the device did not send all status bytes
+        """
+        if status is None:
+            print("!! Device did not send status")
+            return None
+
+        self.status.update(status)
+        self._statusStale = False
+        self._statusDiscards = self.gpib.batchDiscards
+        if self.history is not None:
+            self.history.append(self.status)
 
         return self.status
 
+    @tagged
     def getFrontRear(self) -> bool:
         """Get position of Front/Rear switch
 
@@ -474,7 +945,28 @@ class hp3478a(object):
             False -> Rear-Port
             None  -> Device did not respond
         """
-        check = self.gpib.cmdPoll("S")
+        check = self.gpib.cmdPoll("S", self.addr)
+        if check == "1":
+            return True
+        elif check == "0":
+            return False
+        else:
+            return None
+
+    @tagged
+    async def getFrontRearAsync(self) -> bool:
+        """Get position of Front/Rear switch
+
+        Awaitable variant of `getFrontRear`, requires an aioprologix instance
+
+        Returns
+        -------
+        bool
+            True  -> Front-Port
+            False -> Rear-Port
+            None  -> Device did not respond
+        """
+        check = await self.gpib.cmdPoll("S", self.addr)
         if check == "1":
             return True
         elif check == "0":
@@ -482,7 +974,8 @@ class hp3478a(object):
         else:
             return None
 
-    def getCalibration(self, filename : str=None) -> bytearray:
+    @tagged
+    def getCalibration(self, filename : str=None, depth: int=CAL_DEPTH) -> bytes:
         """Read device calibration data
 
         Code based on work by
@@ -490,57 +983,187 @@ class hp3478a(object):
             fenugrec (EEVblog)
             Luke Mester (https://mesterhome.com/)
 
+        The `W` requests are pipelined, see `prologix.cmdPollMany`. The
+        progress shown on the display is updated every CAL_PROGRESS
+        seconds at most.
+
         Parameters
         ----------
         filename : str, optional
             filename to save calibration to
             file will be overwritten if it exists
             by default None
+        depth : int, optional
+            number of requests sent at once, see `prologix.cmdPollMany`
+            by default CAL_DEPTH
 
         Returns
         -------
-        bytearray
-            Raw calibration data
+        bytes
+            Raw calibration data, one nibble per byte, see `parseCalibration`
         """
         
-        self.callReset()
-        self.setTrigger(self.TRIG_HLD)
+        # Keep other threads off the bus while the dump is running
+        with self.gpib.transaction():
+            self.callReset()
+            self.setTrigger(self.TRIG_HLD)
+
+            # Restore display and trigger however the dump ends
+            try:
+                check = self.getFrontRear()
+                if check is None:
+                    print("Can not connect to instrument")
+                    return None
+
+                self.setDisplay("CAL READ 00%")
+
+                cmds = [self.gpib.escapeCmd(b"W" + bytes((dbyte,))) for dbyte in range(0, self.CAL_SIZE)]
+                shown = [time.monotonic()]
+
+                def progress(done):
+                    now = time.monotonic()
+                    if now - shown[0] >= self.CAL_PROGRESS and done < len(cmds):
+                        self.setDisplay("CAL READ " + str(done * 10 // len(cmds)) + "0%")
+                        shown[0] = now
+
+                frames = self.gpib.cmdPollMany(cmds, self.addr, depth=depth, progress=progress)
+
+                for dbyte, frame in enumerate(frames):
+                    if frame is None or len(frame) == 0:
+                        print("!! No calibration data received for address " + str(dbyte))
+                        return None
+            finally:
+                self.setDisplay(None)
+                self.callReset()
+
+        # Adapters may pass on a terminator following the data byte
+        cdata = bytes(frame[0] for frame in frames)
 
-        check = self.getFrontRear()
-        if check is None:
-            print("Can not connect to instrument")
-            return None
+        if filename is not None:
+            with open(filename, "wb") as fp:
+                fp.write(cdata)
 
-        self.setDisplay("CAL READ 00%")
+        return cdata
 
-        p  = 0
-        lp = 0
-        cdata = b""
+    @tagged
+    async def getCalibrationAsync(self, filename : str=None, depth: int=CAL_DEPTH) -> bytes:
+        """Read device calibration data
 
-        for dbyte in range(0, 255):
-            din = self.gpib.cmdPoll(self.gpib.escapeCmd("W"+chr(dbyte)), binary=True)
-            cdata += din
-            p = (int)(dbyte/25.5)
-            if p != lp:
-                self.setDisplay("CAL READ " + str(p) + "0%")
-                lp = p
+        Awaitable variant of `getCalibration`, requires an aioprologix instance
 
-        self.setDisplay("CAL READ OK")
+        Parameters
+        ----------
+        filename : str, optional
+            filename to save calibration to
+            file will be overwritten if it exists
+            by default None
+        depth : int, optional
+            number of requests sent at once, see `prologix.cmdPollMany`
+            by default CAL_DEPTH
 
-        if filename is not None:
-            fp = open("calibration.data", "wb")
-            for byte in cdata:
-                fp.write(byte.to_bytes(1, byteorder='big'))
-            fp.close()
+        Returns
+        -------
+        bytes
+            Raw calibration data, one nibble per byte, see `parseCalibration`
+        """
+        await self.callResetAsync()
+        await self.setTriggerAsync(self.TRIG_HLD)
+
+        # Restore display and trigger however the dump ends
+        try:
+            check = await self.getFrontRearAsync()
+            if check is None:
+                print("Can not connect to instrument")
+                return None
+
+            await self.setDisplayAsync("CAL READ 00%")
+
+            cmds = [self.gpib.escapeCmd(b"W" + bytes((dbyte,))) for dbyte in range(0, self.CAL_SIZE)]
+            shown = [time.monotonic()]
+
+            async def progress(done):
+                now = time.monotonic()
+                if now - shown[0] >= self.CAL_PROGRESS and done < len(cmds):
+                    await self.setDisplayAsync("CAL READ " + str(done * 10 // len(cmds)) + "0%")
+                    shown[0] = now
+
+            frames = await self.gpib.cmdPollMany(cmds, self.addr, depth=depth, progress=progress)
 
-        sleep(1)
-        self.setDisplay(None)
+            for dbyte, frame in enumerate(frames):
+                if frame is None or len(frame) == 0:
+                    print("!! No calibration data received for address " + str(dbyte))
+                    return None
+        finally:
+            await self.setDisplayAsync(None)
+            await self.callResetAsync()
 
-        self.callReset()
+        cdata = bytes(frame[0] for frame in frames)
+
+        if filename is not None:
+            with open(filename, "wb") as fp:
+                fp.write(cdata)
 
         return cdata
 
+    @staticmethod
+    def parseCalibration(data: bytes) -> list:
+        """Decode calibration data as read by `getCalibration`
+
+        Each of the 19 entries following the first nibble takes 13 nibbles:
+        a 6 digit offset in ten's complement, 5 signed gain digits and a
+        checksum making the sum of all nibbles and the checksum byte 0xFF.
+        All entries are decoded at once using numpy.
+
+        Example
+        -------
+        for entry in hp3478a.parseCalibration(open("calibration.data", "rb").read()):
+            if entry.used and not entry.valid:
+                print("Invalid entry", entry.function, entry.range)
+
+        Parameters
+        ----------
+        data : bytes
+            Raw calibration data, one nibble per byte
+
+        Returns
+        -------
+        list
+            hp3478aCalEntry for each entry
+            None if the data is too short
+        """
+        import numpy
+
+        size = 1 + len(hp3478a.CAL_ENTRIES) * 13
+        if len(data) < size:
+            print("!! Calibration data too short, got " + str(len(data)) + " of " + str(size) + " nibbles")
+            return None
 
+        nibbles = numpy.frombuffer(bytes(data[:size]), dtype=numpy.uint8) & 0x0F
+        entries = nibbles[1:].astype(numpy.int64).reshape(len(hp3478a.CAL_ENTRIES), 13)
+
+        offsets = entries[:, 0:6] @ (10 ** numpy.arange(5, -1, -1))
+        offsets = numpy.where(offsets >= 500000, offsets - 1000000, offsets)
+        gainDigits = entries[:, 6:11]
+        gainDigits = numpy.where(gainDigits >= 8, gainDigits - 16, gainDigits)
+        gains = 1.0 + gainDigits @ hp3478a.CAL_GAIN_WEIGHTS
+        checksums = entries[:, 11] * 16 + entries[:, 12]
+        valid = entries[:, 0:11].sum(axis=1) + checksums == 0xFF
+
+        out = []
+        for i, (function, range) in enumerate(hp3478a.CAL_ENTRIES):
+            out.append(hp3478a.hp3478aCalEntry(
+                index=i,
+                function=function,
+                range=range,
+                used=function is not None,
+                offset=int(offsets[i]),
+                gain=float(gains[i]),
+                checksum=int(checksums[i]),
+                valid=bool(valid[i]),
+            ))
+        return out
+
+    @tagged
     def setAutoZero(self, autoZero: bool, noUpdate: bool=False) -> bool:
         """change Auto-Zero setting
 
@@ -560,20 +1183,46 @@ class hp3478a(object):
         setVal = 0
         if autoZero: setVal = 1
 
-        self.gpib.cmdWrite("Z"+str(autoZero), self.addr)
+        self.gpib.cmdWrite("Z"+str(setVal), self.addr)
+        self.gpib.resetTimeouts(self.addr)
 
         if noUpdate:
-            if self.gpib.debug:
-                print(".. AutoZero changed to " + setVal + " without verification.")
+            self._presumeStatus(autoZero=autoZero)
+            self.gpib.traceNote("AutoZero changed to %d without verification.", setVal)
             return setVal
         else:
             self.getStatus()
             if autoZero != self.status.autoZero:
                 print("!! Error while changing AutoZero - tried to set " + str(autoZero) + " but verification was " + str(self.status.autoZero))
-            elif self.gpib.debug:
-                print(".. AutoZero successfully changed to " + str(self.status.autoZero))
+            else:
+                self.gpib.traceNote("AutoZero successfully changed to %s", self.status.autoZero)
             return self.status.autoZero
 
+    @tagged
+    async def setAutoZeroAsync(self, autoZero: bool, noUpdate: bool=False) -> bool:
+        """change Auto-Zero setting
+
+        Awaitable variant of `setAutoZero`, requires an aioprologix instance
+
+        Parameters
+        ----------
+        autoZero : bool
+            Whether to enable or disable Auto-Zero
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            new status of autoZero; presumed status if `noUpdate` was True
+        """
+        await self.configureAsync(self.hp3478aProfile(autoZero=autoZero), noUpdate=noUpdate)
+        if noUpdate:
+            return int(autoZero)
+        return self.status.autoZero
+
+    @tagged
     def setDisplay(self, text: str=None, online: bool=True) -> bool:
         """Change device display
 
@@ -605,22 +1254,12 @@ class hp3478a(object):
         if text is None or text == "":
             # Reset display
             self.gpib.cmdWrite("D1", self.addr)
-            if self.gpib.debug:
-                print("Display reset to standard mode")
+            self.gpib.traceNote("Display reset to standard mode")
             return True
         
-        len = 0
-        for c in text:
-            if ord(c) < 32 or ord(c) > 95:
-                print("!! Character '" + c + "' is not supported")
-                return False
-            if c != "," and c != ".":
-                len = len+1
-            
-            if len > 12:
-                print("!! Text too long; max 12 characters")
-                return False
-            
+        if not self._checkDisplay(text):
+            return False
+
         cmd = "D2"
         dt = ""
         if not online:
@@ -629,68 +1268,81 @@ class hp3478a(object):
 
         self.gpib.cmdWrite(cmd + text, self.addr)
         
-        if self.gpib.debug:
-            print(".. Display changed to '" + text + "'" + dt)
+        self.gpib.traceNote("Display changed to '%s'%s", text, dt)
 
         #@TODO we could check status/errors to catch syntax errors here
         return True
 
-    def setFunction(self, function : int, noUpdate: bool=False) -> bool:
-        """Change current measurement function
+    @tagged
+    async def setDisplayAsync(self, text: str=None, online: bool=True) -> bool:
+        """Change device display
+
+        Awaitable variant of `setDisplay`, requires an aioprologix instance
 
         Parameters
         ----------
-        function : int
-            numeric function representation
-            you may also use the following class constants:
-                VDC,VAC,Ω2W,Ω4W,ADC,AAC,EXTΩ
-        noUpdate : bool, optional
-            If True do not update status object to verify change was successful
-            by default False
+        text : str, optional
+            Text to show, None or empty for the standard display mode
+            by default None
+        online : bool, optional
+            Whether the device keeps updating the display, see `setDisplay`
+            by default True
 
         Returns
         -------
         bool
-            Whether update succeeded or not; not verified if `noUpdate` was True
+            Wheather setting the text worked as expected
         """
-        if function <= 0 or function > 7:
-            print("!! Invalid function")
+        if text is None or text == "":
+            await self.gpib.cmdWrite("D1", self.addr)
+            return True
+
+        if not self._checkDisplay(text):
             return False
-        
-        self.gpib.cmdWrite("F" + str(function), self.addr)
 
-        if not noUpdate:
-            self.getStatus()
-            if self.status.function != function:
-                print("!! Set failed. Tried to set " + self.getFunction(function) + " but device returned " + self.getFunction(self.status.function))
+        await self.gpib.cmdWrite(("D2" if online else "D3") + text, self.addr)
+        return True
+
+    def _checkDisplay(self, text: str) -> bool:
+        """Check whether a text can be shown on the display
+
+        Parameters
+        ----------
+        text : str
+            Text as accepted by `setDisplay`
+
+        Returns
+        -------
+        bool
+            True if the text is valid, reasons are printed otherwise
+        """
+        len = 0
+        for c in text:
+            if ord(c) < 32 or ord(c) > 95:
+                print("!! Character '" + c + "' is not supported")
+                return False
+            if c != "," and c != ".":
+                len = len+1
+            
+            if len > 12:
+                print("!! Text too long; max 12 characters")
                 return False
-            elif self.gpib.debug:
-                print(".. Changed to function " + self.getFunction(function))
-        elif self.gpib.debug:
-            print(".. Probably changed to function " + self.getFunction(function))
-        
         return True
 
-    def setRange(self, range : str, noUpdate : bool=False) -> bool:
-        """Change current measurement range
+    def _rangeCode(self, range) -> tuple:
+        """Convert a range to the argument of the `R` command
 
         Parameters
         ----------
         range : str|float
-            Range as SI-Value or float
-            Valid values:
-            A or AUTO to enable Auto-Range
-            30m,300m,3,30,300,3k,30k,300k,3M,30M
-            0.03,0.3,3,30,300,3000,30000,300000,3000000,30000000
-            Not all ranges can be used in all measurement functions
-        noUpdate : bool, optional
-            If True do not update status object to verify change was successful
-            by default False
+            Range as accepted by `setRange`
 
         Returns
         -------
-        bool
-            Whether update succeeded or not; not verified if `noUpdate` was True
+        tuple
+            argument (-2 to 7 or "A") and maximum value as float
+            None for both if the range is invalid, None as maximum value
+            for Auto-Range
         """
         newRange = None
         newRangeF = None
@@ -724,14 +1376,504 @@ class hp3478a(object):
         elif range == "30M"     or range == 30000000:
             newRange  = 7
             newRangeF = 30000000
-        elif range.lower() == "a" or range.lower() == "auto":
+        elif isinstance(range, str) and (range.lower() == "a" or range.lower() == "auto"):
             newRange = "A"
+
+        return newRange, newRangeF
+
+    def _digitsCode(self, digits: float) -> str:
+        """Convert a resolution to the argument of the `N` command
+
+        Parameters
+        ----------
+        digits : float
+            Resolution as accepted by `setDigits`
+
+        Returns
+        -------
+        str|None
+            "3", "4" or "5", None for invalid resolutions
+        """
+        if digits == 3 or digits == 3.5:
+            return "3"
+        elif digits == 4 or digits == 4.5:
+            return "4"
+        elif digits == 5 or digits == 5.5:
+            return "5"
+        return None
+
+    @tagged
+    def configure(self, profile, noUpdate: bool=False) -> bool:
+        """Apply a complete measurement configuration at once
+
+        All settings are sent as a single command like `F1RAN5T1Z1` and
+        verified with a single status read, while `setFunction`,
+        `setRange` and so on need a write and a status read each.
+
+        Example
+        -------
+        meter.configure("vdcFast")
+        meter.configure(meter.hp3478aProfile(function=meter.Ω2W, range="30k", digits=4.5))
+        meter.configure({"trigger": meter.TRIG_HLD, "display": "HOLD"})
+
+        Parameters
+        ----------
+        profile : hp3478aProfile|dict|str
+            Configuration to apply, a dict of hp3478aProfile attributes or
+            the name of a preset in PRESETS
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        command = self._profileCommand(profile)
+        if command is None:
+            return False
+        profile, cmd, newRange, rangeF, newDigits = command
+
+        if cmd == "":
+            return True
+
+        with self.gpib.transaction():
+            self.gpib.cmdWrite(cmd, self.addr)
+            # The conversion time changed, relearn the read timeouts
+            self.gpib.resetTimeouts(self.addr)
+            if noUpdate:
+                self._presumeStatus(profile.function, newRange, newDigits, profile.trigger, profile.autoZero)
+                self.gpib.traceNote("Probably applied %s", cmd)
+                return True
+            if self.getStatus() is None:
+                return False
+
+        return self._checkProfile(profile, cmd, rangeF)
+
+    @tagged
+    async def configureAsync(self, profile, noUpdate: bool=False) -> bool:
+        """Apply a complete measurement configuration at once
+
+        Awaitable variant of `configure`, requires an aioprologix instance
+
+        Parameters
+        ----------
+        profile : hp3478aProfile|dict|str
+            Configuration to apply, a dict of hp3478aProfile attributes or
+            the name of a preset in PRESETS
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        command = self._profileCommand(profile)
+        if command is None:
+            return False
+        profile, cmd, newRange, rangeF, newDigits = command
+
+        if cmd == "":
+            return True
+
+        async with self.gpib.transaction():
+            self.gpib.cmdWriteLocked(cmd, self.addr)
+            # The conversion time changed, relearn the read timeouts
+            self.gpib.resetTimeouts(self.addr)
+            if noUpdate:
+                self._presumeStatus(profile.function, newRange, newDigits, profile.trigger, profile.autoZero)
+                self.gpib.traceNote("Probably applied %s", cmd)
+                return True
+            status = await self.gpib.cmdPollLocked("B", self.addr, size=5)
+            if self._parseStatus(status) is None:
+                return False
+
+        return self._checkProfile(profile, cmd, rangeF)
+
+    def _profileCommand(self, profile) -> tuple:
+        """Build the command applying a configuration, see `configure`
+
+        Parameters
+        ----------
+        profile : hp3478aProfile|dict|str
+            Configuration to apply
+
+        Returns
+        -------
+        tuple|None
+            profile as hp3478aProfile, command, range and digits as sent,
+                numeric range or None for Auto-Range
+            None if the configuration is invalid
+        """
+        if isinstance(profile, str):
+            if profile not in self.PRESETS:
+                print("!! Unknown preset " + profile)
+                return None
+            profile = self.PRESETS[profile]
+        elif isinstance(profile, dict):
+            profile = self.hp3478aProfile(**profile)
+
+        cmd = ""
+        newRange = None
+        newDigits = None
+        if profile.function is not None:
+            if profile.function <= 0 or profile.function > 7:
+                print("!! Invalid function")
+                return None
+            cmd += "F" + str(profile.function)
+        rangeF = None
+        if profile.range is not None:
+            newRange, rangeF = self._rangeCode(profile.range)
+            if newRange is None:
+                print("!! Invalid range")
+                return None
+            cmd += "R" + str(newRange)
+        if profile.digits is not None:
+            newDigits = self._digitsCode(profile.digits)
+            if newDigits is None:
+                print("!! Invalid digits")
+                return None
+            cmd += "N" + newDigits
+        if profile.trigger is not None:
+            if profile.trigger <= 0 or profile.trigger > 5:
+                print("!! Invalid trigger")
+                return None
+            cmd += "T" + str(profile.trigger)
+        if profile.autoZero is not None:
+            cmd += "Z" + str(int(profile.autoZero))
+        if profile.display is not None:
+            # Display text runs until the end of the command
+            if profile.display == "":
+                cmd += "D1"
+            else:
+                if not self._checkDisplay(profile.display):
+                    return None
+                cmd += "D2" + profile.display
+
+        return profile, cmd, newRange, rangeF, newDigits
+
+    def _checkProfile(self, profile: hp3478aProfile, cmd: str, rangeF) -> bool:
+        """Verify an applied configuration against the status just read
+
+        Parameters
+        ----------
+        profile : hp3478aProfile
+            Configuration applied
+        cmd : str
+            Command sent, for messages
+        rangeF : float|None
+            numeric range sent, None for Auto-Range
+
+        Returns
+        -------
+        bool
+            Whether the device reports all settings of the configuration
+        """
+        problems = []
+        if profile.function is not None and self.status.function != profile.function:
+            problems.append("function " + str(self.getFunction()))
+        if profile.range is not None:
+            if rangeF is None and not self.status.autoRange:
+                problems.append("Auto-Range disabled")
+            elif rangeF is not None and self.getRange(numeric=True) != rangeF:
+                problems.append("range " + str(self.getRange()))
+        if profile.digits is not None and int(self.getDigits()) != int(profile.digits):
+            problems.append("digits " + str(self.getDigits()))
+        if profile.trigger == self.TRIG_EXT and not self.status.triggerExternal:
+            problems.append("external trigger disabled")
+        elif profile.trigger == self.TRIG_INT and not self.status.triggerInternal:
+            problems.append("internal trigger disabled")
+        elif (profile.trigger == self.TRIG_SIN or profile.trigger == self.TRIG_HLD) and self.status.triggerInternal:
+            problems.append("internal trigger still enabled")
+        if profile.autoZero is not None and self.status.autoZero != profile.autoZero:
+            problems.append("AutoZero " + str(self.status.autoZero))
+
+        if len(problems) > 0:
+            print("!! Tried to apply " + cmd + " but device reported " + ", ".join(problems))
+            return False
+        self.gpib.traceNote("Applied %s", cmd)
+        return True
+
+    def getProfile(self) -> hp3478aProfile:
+        """Get the current configuration as profile for `configure`
+
+        Uses the cached status, see `refreshStatus`. Single, hold and fast
+        trigger can not be told apart, they are returned as TRIG_SIN.
+
+        Returns
+        -------
+        hp3478aProfile|None
+            Current configuration without display text
+            None if the device did not send its status
+        """
+        if self.refreshStatus() is None:
+            return None
+        return self._statusProfile()
+
+    async def getProfileAsync(self) -> hp3478aProfile:
+        """Get the current configuration as profile for `configureAsync`
+
+        Awaitable variant of `getProfile`, requires an aioprologix instance
+
+        Returns
+        -------
+        hp3478aProfile|None
+            Current configuration without display text
+            None if the device did not send its status
+        """
+        if await self.refreshStatusAsync() is None:
+            return None
+        return self._statusProfile()
+
+    def _statusProfile(self) -> hp3478aProfile:
+        """Build a profile from the cached status, see `getProfile`
+
+        Returns
+        -------
+        hp3478aProfile
+            Current configuration without display text
+        """
+        trigger = self.TRIG_SIN
+        if self.status.triggerInternal:
+            trigger = self.TRIG_INT
+        elif self.status.triggerExternal:
+            trigger = self.TRIG_EXT
+
+        return self.hp3478aProfile(
+            function=self.status.function,
+            range="A" if self.status.autoRange else self.getRange(numeric=True),
+            digits=self.getDigits(),
+            trigger=trigger,
+            autoZero=self.status.autoZero,
+        )
+
+    @tagged
+    def acquire(self, n: int, digits: float=3.5, displayOff: bool=True) -> tuple:
+        """Take a burst of readings as fast as possible
+
+        The device is set to internal trigger with Auto-Zero disabled and
+        the display optionally frozen. Readings are then fetched with a
+        bare `++read` each and parsed straight into preallocated arrays.
+        The previous configuration is restored afterwards. Requires numpy.
+
+        Example
+        -------
+        values, times = meter.acquire(500)
+        rate = (len(times) - 1) / (times[-1] - times[0])
+
+        Parameters
+        ----------
+        n : int
+            number of readings
+        digits : float, optional
+            measurement resolution, see `setDigits`. 3.5 is the fastest
+            by default 3.5
+        displayOff : bool, optional
+            Whether to stop updating the display during the burst, which
+            allows for more readings per second
+            by default True
+
+        Returns
+        -------
+        tuple
+            numpy float64 arrays of readings and their time.monotonic()
+            timestamps. Shorter than `n` if the device stopped responding
+            None if `n` is negative or the device could not be configured
+        """
+        import numpy
+
+        if n < 0:
+            print("!! Invalid number of readings " + str(n))
+            return None
+
+        values = numpy.empty(n, dtype=numpy.float64)
+        times = numpy.empty(n, dtype=numpy.float64)
+        count = 0
+
+        with self.gpib.transaction():
+            previous = self.getProfile()
+            if previous is None:
+                return None
+            if not self.configure(self.hp3478aProfile(digits=digits, trigger=self.TRIG_INT, autoZero=False)):
+                self.configure(previous)
+                return None
+            if displayOff:
+                self.setDisplay("BURST", online=False)
+
+            try:
+                read = self.gpib.cmdRead
+                clock = time.monotonic
+                addr = self.addr
+                for i in range(n):
+                    reading = read(addr, binary=True)
+                    if reading is None:
+                        print("!! Burst aborted after " + str(i) + " readings")
+                        break
+                    times[i] = clock()
+                    values[i] = float(reading)
+                    count += 1
+            finally:
+                if displayOff:
+                    self.setDisplay(None)
+                self.configure(previous)
+
+        return values[:count], times[:count]
+
+    @tagged
+    async def acquireAsync(self, n: int, digits: float=3.5, displayOff: bool=True) -> tuple:
+        """Take a burst of readings as fast as possible
+
+        Awaitable variant of `acquire`, requires an aioprologix instance
+
+        Parameters
+        ----------
+        n : int
+            number of readings
+        digits : float, optional
+            measurement resolution, see `setDigits`
+            by default 3.5
+        displayOff : bool, optional
+            Whether to stop updating the display during the burst
+            by default True
+
+        Returns
+        -------
+        tuple
+            numpy float64 arrays of readings and their time.monotonic()
+            timestamps, see `acquire`
+            None if `n` is negative or the device could not be configured
+        """
+        import numpy
+
+        if n < 0:
+            print("!! Invalid number of readings " + str(n))
+            return None
+
+        values = numpy.empty(n, dtype=numpy.float64)
+        times = numpy.empty(n, dtype=numpy.float64)
+        count = 0
+
+        previous = await self.getProfileAsync()
+        if previous is None:
+            return None
+        if not await self.configureAsync(self.hp3478aProfile(digits=digits, trigger=self.TRIG_INT, autoZero=False)):
+            await self.configureAsync(previous)
+            return None
+        if displayOff:
+            await self.setDisplayAsync("BURST", online=False)
+
+        try:
+            read = self.gpib.cmdReadLocked
+            clock = time.monotonic
+            addr = self.addr
+            for i in range(n):
+                reading = await read(addr, binary=True)
+                if reading is None:
+                    print("!! Burst aborted after " + str(i) + " readings")
+                    break
+                times[i] = clock()
+                values[i] = float(reading)
+                count += 1
+        finally:
+            if displayOff:
+                await self.setDisplayAsync(None)
+            await self.configureAsync(previous)
+
+        return values[:count], times[:count]
+
+    @tagged
+    def setFunction(self, function : int, noUpdate: bool=False) -> bool:
+        """Change current measurement function
+
+        Parameters
+        ----------
+        function : int
+            numeric function representation
+            you may also use the following class constants:
+                VDC,VAC,Ω2W,Ω4W,ADC,AAC,EXTΩ
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        if function <= 0 or function > 7:
+            print("!! Invalid function")
+            return False
         
+        self.gpib.cmdWrite("F" + str(function), self.addr)
+        self.gpib.resetTimeouts(self.addr)
+
+        if not noUpdate:
+            self.getStatus()
+            if self.status.function != function:
+                print("!! Set failed. Tried to set " + self.getFunction(function) + " but device returned " + self.getFunction(self.status.function))
+                return False
+            else:
+                self.gpib.traceNote("Changed to function %s", self.getFunction(function))
+        else:
+            self._presumeStatus(function=function)
+            self.gpib.traceNote("Probably changed to function %s", self.getFunction(function))
+        
+        return True
+
+    @tagged
+    async def setFunctionAsync(self, function: int, noUpdate: bool=False) -> bool:
+        """Change current measurement function
+
+        Awaitable variant of `setFunction`, requires an aioprologix instance.
+        Applied and verified like `configure`
+
+        Parameters
+        ----------
+        function : int
+            see `setFunction`
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        return await self.configureAsync(self.hp3478aProfile(function=function), noUpdate=noUpdate)
+
+    @tagged
+    def setRange(self, range : str, noUpdate : bool=False) -> bool:
+        """Change current measurement range
+
+        Parameters
+        ----------
+        range : str|float
+            Range as SI-Value or float
+            Valid values:
+            A or AUTO to enable Auto-Range
+            30m,300m,3,30,300,3k,30k,300k,3M,30M
+            0.03,0.3,3,30,300,3000,30000,300000,3000000,30000000
+            Not all ranges can be used in all measurement functions
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        newRange, newRangeF = self._rangeCode(range)
         if newRange is None:
             print("!! Invalid range")
             return False
         
         self.gpib.cmdWrite("R" + str(newRange), self.addr)
+        self.gpib.resetTimeouts(self.addr)
 
         if not noUpdate:
             self.getStatus()
@@ -739,20 +1881,44 @@ class hp3478a(object):
                 if not self.status.autoRange:
                     print("!! Tried to enable Auto-Range but device refused")
                     return False
-                elif self.gpib.debug:
-                    print(".. Enabled Auto-Range")
+                else:
+                    self.gpib.traceNote("Enabled Auto-Range")
             else:
                 newRangeC = self.getRange(numeric=True)
                 if newRangeF != newRangeC:
                     print("!! Tried to set range to " + str(range) + " but device reported " + self.getRange())
                     return False
-                elif self.gpib.debug:
-                    print(".. Set range to " + self.getRange())
-        elif self.gpib.debug:
-            print(".. Probably changed to range " + str(range))
+                else:
+                    self.gpib.traceNote("Set range to %s", self.getRange())
+        else:
+            self._presumeStatus(range=newRange)
+            self.gpib.traceNote("Probably changed to range %s", range)
         
         return True
 
+    @tagged
+    async def setRangeAsync(self, range: str, noUpdate: bool=False) -> bool:
+        """Change current measurement range
+
+        Awaitable variant of `setRange`, requires an aioprologix instance.
+        Applied and verified like `configure`
+
+        Parameters
+        ----------
+        range : str|float
+            see `setRange`
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        return await self.configureAsync(self.hp3478aProfile(range=range), noUpdate=noUpdate)
+
+    @tagged
     def setDigits(self, digits : float, noUpdate : bool=False) -> bool:
         """Change current measurement resolution
 
@@ -770,31 +1936,50 @@ class hp3478a(object):
         bool
             Whether update succeeded or not; not verified if `noUpdate` was True
         """
-        newDigits = None
-        if digits == 3 or digits == 3.5:
-            newDigits = "3"
-        elif digits == 4 or digits == 4.5:
-            newDigits = "4"
-        elif digits == 5 or digits == 5.5:
-            newDigits = "5"
-        else:
+        newDigits = self._digitsCode(digits)
+        if newDigits is None:
             print("!! Invalid digits")
             return False
 
         self.gpib.cmdWrite("N"+newDigits, self.addr)
+        self.gpib.resetTimeouts(self.addr)
 
         if not noUpdate:
             self.getStatus()
             if int(self.getDigits()) != int(newDigits):
                 print("!! Tried to set digits to " + str(int(newDigits)) + "½ but device reported " + str(int(self.getDigits())) + "½")
                 return False
-            elif self.gpib.debug:
-                print(".. Set digits to " + str(int(self.getDigits())) + "½")
-        elif self.gpib.debug:
-            print(".. Probably changed digits to " + str(int(self.getDigits())) + "½")
+            else:
+                self.gpib.traceNote("Set digits to %d½", self.getDigits())
+        else:
+            self._presumeStatus(digits=newDigits)
+            self.gpib.traceNote("Probably changed digits to %s½", newDigits)
         
         return True
 
+    @tagged
+    async def setDigitsAsync(self, digits: float, noUpdate: bool=False) -> bool:
+        """Change current measurement resolution
+
+        Awaitable variant of `setDigits`, requires an aioprologix instance.
+        Applied and verified like `configure`
+
+        Parameters
+        ----------
+        digits : float
+            see `setDigits`
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        return await self.configureAsync(self.hp3478aProfile(digits=digits), noUpdate=noUpdate)
+
+    @tagged
     def setTrigger(self, trigger : int, noUpdate : bool=False) -> bool:
         """Change current measurement trigger
 
@@ -822,6 +2007,7 @@ class hp3478a(object):
             return False
 
         self.gpib.cmdWrite("T" + str(trigger), self.addr)
+        self.gpib.resetTimeouts(self.addr)
 
         if not noUpdate:
             self.getStatus()
@@ -837,41 +2023,287 @@ class hp3478a(object):
             elif trigger == self.TRIG_HLD and self.status.triggerInternal:
                 print("!! Tried to enable trigger hold but auto trigger flag is still active")
                 return False
+        else:
+            self._presumeStatus(trigger=trigger)
         
-        if self.gpib.debug:
-            print(".. Probably changed trigger to " + str(trigger))
+        self.gpib.traceNote("Probably changed trigger to %d", trigger)
         
         return True
 
-    def setSRQ(self, srq:int):
+    @tagged
+    async def setTriggerAsync(self, trigger: int, noUpdate: bool=False) -> bool:
+        """Change current measurement trigger
+
+        Awaitable variant of `setTrigger`, requires an aioprologix instance.
+        Applied and verified like `configure`
+
+        Parameters
+        ----------
+        trigger : int
+            see `setTrigger`
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        return await self.configureAsync(self.hp3478aProfile(trigger=trigger), noUpdate=noUpdate)
+
+    @tagged
+    def setSRQ(self, srq:int) -> bool:
         """Set Serial Poll Register Mask
 
-        @TODO Not tested and no validations
+        Parameters
+        ----------
+        srq : int
+            Bits 0-5 are used to set the mask, combine SRQ_* constants:
+            SRQ_READING -> New reading available
+            SRQ_SYNTAX  -> Syntax error
+            SRQ_HWERR   -> Hardware error
+            SRQ_KBD     -> Front panel SRQ key pressed
+            SRQ_CAL     -> CAL procedure failed
+
+        Returns
+        -------
+        bool
+            Whether the mask was valid and sent
+        """
+        if srq < 0 or srq > 0b111111:
+            print("!! Invalid SRQ mask")
+            return False
+
+        self.gpib.cmdWrite("M" + format(srq, "02o"), self.addr)
+        return True
+
+    @tagged
+    async def setSRQAsync(self, srq: int) -> bool:
+        """Set Serial Poll Register Mask
+
+        Awaitable variant of `setSRQ`, requires an aioprologix instance
 
         Parameters
         ----------
         srq : int
-            Parameter must be two digits exactly. Bits 0-5 of the binary representation
-            are used to set the mask
+            Bits 0-5 are used to set the mask, combine SRQ_* constants
+
+        Returns
+        -------
+        bool
+            Whether the mask was valid and sent
+        """
+        if srq < 0 or srq > 0b111111:
+            print("!! Invalid SRQ mask")
+            return False
+
+        await self.gpib.cmdWrite("M" + format(srq, "02o"), self.addr)
+        return True
+
+    def onSRQ(self, reading=None, syntaxError=None, hardwareError=None, keyboard=None, calFailed=None):
+        """Dispatch service requests of this device to callbacks
+
+        Sets the serial poll mask so the device asserts SRQ for the events a
+        callback is given for and registers the device with the adapter.
+        Callbacks are run by `prologix.serviceSRQ`/`prologix.waitSRQ`.
+        Calling without any callback disables service requests.
+
+        Example
+        -------
+        meter.setTrigger(meter.TRIG_INT)
+        meter.onSRQ(reading=lambda dev, value: print(value))
+        while True:
+            meter.gpib.waitSRQ()
+
+        Parameters
+        ----------
+        reading : callable, optional
+            Called as `reading(device, value)` with the new measurement
+            whenever a reading is available
+        syntaxError : callable, optional
+            Called as `syntaxError(device, status)` with the status byte
+        hardwareError : callable, optional
+            Called as `hardwareError(device, status)` with the status byte
+        keyboard : callable, optional
+            Called as `keyboard(device, status)` if the SRQ key was pressed
+        calFailed : callable, optional
+            Called as `calFailed(device, status)` if the CAL procedure failed
+
+        Returns
+        -------
+        bool
+            Whether setting the mask worked
         """
-        self.gpib.cmdWrite(srq, self.addr)
+        mask = self._srqCallbacks(reading, syntaxError, hardwareError, keyboard, calFailed)
+        if mask == 0:
+            self.gpib.unregisterSRQ(self.addr)
+        else:
+            self.gpib.registerSRQ(self.addr, self._handleSRQ)
+        return self.setSRQ(mask)
+
+    async def onSRQAsync(self, reading=None, syntaxError=None, hardwareError=None, keyboard=None, calFailed=None):
+        """Dispatch service requests of this device to callbacks
 
+        Awaitable variant of `onSRQ`, requires an aioprologix instance.
+        Callbacks are run by `aioprologix.serviceSRQ`/`aioprologix.waitSRQ`
+        and may be coroutine functions.
+
+        Parameters
+        ----------
+        reading : callable, optional
+            Called as `reading(device, value)` with the new measurement
+        syntaxError : callable, optional
+            Called as `syntaxError(device, status)` with the status byte
+        hardwareError : callable, optional
+            Called as `hardwareError(device, status)` with the status byte
+        keyboard : callable, optional
+            Called as `keyboard(device, status)` if the SRQ key was pressed
+        calFailed : callable, optional
+            Called as `calFailed(device, status)` if the CAL procedure failed
+
+        Returns
+        -------
+        bool
+            Whether setting the mask worked
+        """
+        mask = self._srqCallbacks(reading, syntaxError, hardwareError, keyboard, calFailed)
+        if mask == 0:
+            self.gpib.unregisterSRQ(self.addr)
+        else:
+            self.gpib.registerSRQ(self.addr, self._handleSRQAsync)
+        return await self.setSRQAsync(mask)
+
+    def _srqCallbacks(self, reading, syntaxError, hardwareError, keyboard, calFailed) -> int:
+        """Store the callbacks of `onSRQ`
+
+        Returns
+        -------
+        int
+            Serial poll mask for the events with a callback
+        """
+        self.srqCallbacks = {}
+        for bit, callback in ((self.SRQ_READING, reading), (self.SRQ_SYNTAX, syntaxError), (self.SRQ_HWERR, hardwareError), (self.SRQ_KBD, keyboard), (self.SRQ_CAL, calFailed)):
+            if callback is not None:
+                self.srqCallbacks[bit] = callback
+
+        mask = 0
+        for bit in self.srqCallbacks:
+            mask |= bit
+        return mask
+
+    def _handleSRQ(self, addr: int, status: int):
+        """Dispatch a serial poll status byte to the callbacks set by `onSRQ`
+
+        Parameters
+        ----------
+        addr : int
+            address of the device
+        status : int
+            serial poll status byte
+        """
+        callbacks = self.srqCallbacks or {}
+
+        if status & self.SRQ_READING:
+            measurement = self.gpib.cmdRead(self.addr)
+            callback = callbacks.get(self.SRQ_READING)
+            if measurement is not None and callback is not None:
+                callback(self, self.parseMeasure(measurement))
+
+        events = status & (self.SRQ_SYNTAX | self.SRQ_HWERR | self.SRQ_KBD | self.SRQ_CAL)
+        if events:
+            # Errors and the SRQ key may come with changes on the front panel
+            self.invalidateStatus()
+            # Error bits stay set until cleared
+            self.clearSPR()
+            for bit in (self.SRQ_SYNTAX, self.SRQ_HWERR, self.SRQ_KBD, self.SRQ_CAL):
+                callback = callbacks.get(bit)
+                if status & bit and callback is not None:
+                    callback(self, status)
+
+    async def _handleSRQAsync(self, addr: int, status: int):
+        """Dispatch a serial poll status byte to the callbacks set by `onSRQAsync`
+
+        Parameters
+        ----------
+        addr : int
+            address of the device
+        status : int
+            serial poll status byte
+        """
+        callbacks = self.srqCallbacks or {}
+
+        if status & self.SRQ_READING:
+            measurement = await self.gpib.cmdRead(self.addr)
+            callback = callbacks.get(self.SRQ_READING)
+            if measurement is not None and callback is not None:
+                result = callback(self, self.parseMeasure(measurement))
+                if inspect.isawaitable(result):
+                    await result
+
+        events = status & (self.SRQ_SYNTAX | self.SRQ_HWERR | self.SRQ_KBD | self.SRQ_CAL)
+        if events:
+            self.invalidateStatus()
+            await self.gpib.cmdWrite("K", self.addr)
+            for bit in (self.SRQ_SYNTAX, self.SRQ_HWERR, self.SRQ_KBD, self.SRQ_CAL):
+                callback = callbacks.get(bit)
+                if status & bit and callback is not None:
+                    result = callback(self, status)
+                    if inspect.isawaitable(result):
+                        await result
+
+    @tagged
     def clearSPR(self):
         """Clear Serial Poll Register (SPR)
         """
         self.gpib.cmdWrite("K", self.addr)
 
-    def clearERR(self) -> bytearray:
+    @tagged
+    def clearERR(self) -> bytes:
         """Clear Error Registers
 
         Returns
         -------
-        bytearray
+        bytes
             Error register as octal digits
         """
         return self.gpib.cmdPoll("E", self.addr, binary=True)
 
+    @tagged
+    async def clearSPRAsync(self):
+        """Clear Serial Poll Register (SPR)
+
+        Awaitable variant of `clearSPR`, requires an aioprologix instance
+        """
+        await self.gpib.cmdWrite("K", self.addr)
+
+    @tagged
+    async def clearERRAsync(self) -> bytes:
+        """Clear Error Registers
+
+        Awaitable variant of `clearERR`, requires an aioprologix instance
+
+        Returns
+        -------
+        bytes
+            Error register as octal digits
+        """
+        return await self.gpib.cmdPoll("E", self.addr, binary=True)
+
+    @tagged
     def callReset(self):
         """Reset the device
         """
         self.gpib.cmdClr(self.addr)
+        self.gpib.resetTimeouts(self.addr)
+        self.invalidateStatus()
+
+    @tagged
+    async def callResetAsync(self):
+        """Reset the device
+
+        Awaitable variant of `callReset`, requires an aioprologix instance
+        """
+        await self.gpib.cmdClr(self.addr)
+        self.gpib.resetTimeouts(self.addr)
+        self.invalidateStatus()
@@ -1,7 +1,7 @@
 from numpy.core.numeric import True_
 from numpy.f2py.auxfuncs import throw_error
 
-from prologix import prologix
+from prologix import prologix, tagged
 from dataclasses import dataclass
 from time import sleep
 from enum import Enum
@@ -160,7 +160,7 @@ class pm2534(object):
         fetched: datetime = None
 
 
-    status = pm2534Status()
+    status: pm2534Status = None
 
     def __init__(self, addr: int, port: str = None, baud: int = 115200, timeout: float = 0.5,
                  prologixGpib: prologix = None, debug: bool = False):
@@ -172,6 +172,7 @@ class pm2534(object):
             Address of the targeted device
         port : str, optional
             path of the serial device to use. Example: `/dev/ttyACM0` or `COM3`
+            or `tcp://host[:port]` for network adapters
             If set a new prologix instance will be created
             Either port or prologixGpib must be given
             by default None
@@ -198,12 +199,14 @@ class pm2534(object):
             print("!! You must supply either a serial port or a prologix object")
 
         self.addr = addr
+        self.status = self.pm2534Status()
 
         if prologixGpib is None:
             self.gpib = prologix(port=port, baud=baud, timeout=timeout, debug=debug)
         else:
             self.gpib = prologixGpib
 
+    @tagged
     def getMeasure(self) -> float:
         """Get last measurement as float
 
@@ -218,8 +221,67 @@ class pm2534(object):
             #self.gpib.cmdClr()
             return None
 
+        return self.parseMeasure(measurement)
+
+    def parseMeasure(self, measurement: str) -> float:
+        """Convert a measurement response to float
+
+        Parameters
+        ----------
+        measurement : str
+            Response as sent by the device, including the function prefix
+
+        Returns
+        -------
+        float
+            measurement
+        """
         return float(measurement[6:])
 
+    def armTrigger(self) -> bool:
+        """Prepare device for a synchronized measurement
+
+        The device will take a single measurement on GPIB GET,
+        see `prologix.syncMeasure`
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not
+        """
+        return self.setTrigger(self.Triggers.B)
+
+    async def armTriggerAsync(self) -> bool:
+        """Prepare device for a synchronized measurement
+
+        Awaitable variant of `armTrigger`, see `aioprologix.syncMeasure`
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not
+        """
+        return await self.setTriggerAsync(self.Triggers.B)
+
+    @tagged
+    async def getMeasureAsync(self) -> float:
+        """Get last measurement as float
+
+        Awaitable variant of `getMeasure`, requires an aioprologix instance
+
+        Returns
+        -------
+        float
+            last measurement
+        """
+        measurement = await self.gpib.cmdPoll(" ", self.addr)
+
+        if measurement is None:
+            return None
+
+        return self.parseMeasure(measurement)
+
+    @tagged
     def getDigits(self, digits: int = None) -> float:
         """Get a human readable representation of currently used resolution
 
@@ -237,6 +299,26 @@ class pm2534(object):
 
         return None
 
+    @tagged
+    async def getDigitsAsync(self, digits: int = None) -> float:
+        """Get a human readable representation of currently used resolution
+
+        Awaitable variant of `getDigits`, requires an aioprologix instance
+
+        Parameters
+        ----------
+        digits : int, optional
+            numeric representation to interpret
+            If None is given the last status reading is used
+            by default None
+
+        Returns
+        -------
+        """
+        status = await self.gpib.cmdPoll("DIG ?", self.addr, binary=True)
+
+        return None
+
     def getFunction(self, function: int = None) -> str:
         """Get a human readable representation of currently used measurement function
 
@@ -296,6 +378,7 @@ class pm2534(object):
         """
         raise Exception("Function not implemented yet!")
 
+    @tagged
     def getStatus(self) -> pm2534Status:
         """Read current device status and populate status object
 
@@ -305,6 +388,37 @@ class pm2534(object):
             Updated status object
         """
         status = self.gpib.cmdPoll("B", self.addr, binary=True)
+        return self._parseStatus(status)
+
+    @tagged
+    async def getStatusAsync(self) -> pm2534Status:
+        """Read current device status and populate status object
+
+        Awaitable variant of `getStatus`, requires an aioprologix instance
+
+        Returns
+        -------
+        pm2534Status
+            Updated status object
+        """
+        status = await self.gpib.cmdPoll("B", self.addr, binary=True)
+        return self._parseStatus(status)
+
+    def _parseStatus(self, status: bytes) -> pm2534Status:
+        """Populate the status object from a status response
+
+        Parameters
+        ----------
+        status : bytes
+            Response to `B`
+
+        Returns
+        -------
+        pm2534Status|None
+            Updated status object, None if the device did not respond
+        """
+        if status is None:
+            return None
 
         # Update last readout time
         self.status.fetched = datetime.datetime.now()
@@ -349,6 +463,7 @@ class pm2534(object):
 
         return self.status
 
+    @tagged
     def getFrontRear(self) -> bool:
         """Get position of Front/Rear switch
 
@@ -369,6 +484,28 @@ class pm2534(object):
         else:
             return None
 
+    @tagged
+    async def getFrontRearAsync(self) -> bool:
+        """Get position of Front/Rear switch
+
+        Awaitable variant of `getFrontRear`, requires an aioprologix instance
+
+        Returns
+        -------
+        bool
+            True  -> Front-Port
+            False -> Rear-Port
+            None  -> Device did not respond
+        """
+        check = await self.gpib.cmdPoll("S", self.addr)
+        if check == "1":
+            return True
+        elif check == "0":
+            return False
+        else:
+            return None
+
+    @tagged
     def getCalibration(self, filename: str = None) -> bytearray:
         """Read device calibration data
 
@@ -405,7 +542,7 @@ class pm2534(object):
         cdata = b""
 
         for dbyte in range(0, 255):
-            din = self.gpib.cmdPoll(self.gpib.escapeCmd("W" + chr(dbyte)), binary=True)
+            din = self.gpib.cmdPoll(self.gpib.escapeCmd(b"W" + bytes((dbyte,))), binary=True)
             cdata += din
             p = (int)(dbyte / 25.5)
             if p != lp:
@@ -475,6 +612,7 @@ class pm2534(object):
         """
         raise Exception("Function not implemented yet!")
 
+    @tagged
     def setFunction(self, function: Functions, noUpdate: bool = False) -> bool:
         """Change current measurement function
 
@@ -495,6 +633,7 @@ class pm2534(object):
         """
         if function in self.Functions:
             self.gpib.cmdWrite("FNC " + str(function.name), self.addr)
+            self.gpib.resetTimeouts(self.addr)
             """
                 if not noUpdate:
                     self.getStatus()
@@ -512,6 +651,34 @@ class pm2534(object):
         print("!! Invalid function")
         return False
 
+    @tagged
+    async def setFunctionAsync(self, function: Functions, noUpdate: bool = False) -> bool:
+        """Change current measurement function
+
+        Awaitable variant of `setFunction`, requires an aioprologix instance
+
+        Parameters
+        ----------
+        function : Functions
+            measurement function
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        if function in self.Functions:
+            await self.gpib.cmdWrite("FNC " + str(function.name), self.addr)
+            self.gpib.resetTimeouts(self.addr)
+            return True
+
+        print("!! Invalid function")
+        return False
+
+    @tagged
     def setRange(self, range, noUpdate: bool = False) -> bool:
         """Change current measurement range
         range : str|float
@@ -537,12 +704,41 @@ class pm2534(object):
         """
         if range=='AUTO':
             self.gpib.cmdWrite("RNG " + range, self.addr)
+            self.gpib.resetTimeouts(self.addr)
             return True
         else:
             self.gpib.cmdWrite('RNG {:1.3E}'.format(range))
+            self.gpib.resetTimeouts(self.addr)
             return True
         return False
 
+    @tagged
+    async def setRangeAsync(self, range, noUpdate: bool = False) -> bool:
+        """Change current measurement range
+
+        Awaitable variant of `setRange`, requires an aioprologix instance
+
+        Parameters
+        ----------
+        range : str|float
+            Range as float or AUTO to enable Auto-Range, see `setRange`
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        if range == 'AUTO':
+            await self.gpib.cmdWrite("RNG " + range, self.addr)
+        else:
+            await self.gpib.cmdWrite('RNG {:1.3E}'.format(range), self.addr)
+        self.gpib.resetTimeouts(self.addr)
+        return True
+
+    @tagged
     def setDigits(self, digits: int, noUpdate: bool = False) -> bool:
         """Change current measurement resolution
         Parameters
@@ -561,9 +757,36 @@ class pm2534(object):
         """
         if digits in range(1,7):
             self.gpib.cmdWrite("DIG " + str(digits), self.addr)
+            self.gpib.resetTimeouts(self.addr)
             return True
         return False
 
+    @tagged
+    async def setDigitsAsync(self, digits: int, noUpdate: bool = False) -> bool:
+        """Change current measurement resolution
+
+        Awaitable variant of `setDigits`, requires an aioprologix instance
+
+        Parameters
+        ----------
+        digits : int
+            desired measurement resolution, see `setDigits`
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        if digits in range(1,7):
+            await self.gpib.cmdWrite("DIG " + str(digits), self.addr)
+            self.gpib.resetTimeouts(self.addr)
+            return True
+        return False
+
+    @tagged
     def setTrigger(self, trigger: Triggers, noUpdate: bool = False) -> bool:
         """Change current measurement trigger
 
@@ -583,12 +806,65 @@ class pm2534(object):
         """
         if trigger in self.Triggers:
             self.gpib.cmdWrite("TRG " + str(trigger.name), self.addr)
+            self.gpib.resetTimeouts(self.addr)
             return True
         return False
 
+    @tagged
+    async def setTriggerAsync(self, trigger: Triggers, noUpdate: bool = False) -> bool:
+        """Change current measurement trigger
+
+        Awaitable variant of `setTrigger`, requires an aioprologix instance
+
+        Parameters
+        ----------
+        trigger : Triggers
+            different kinds of Trigger
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not; not verified if `noUpdate` was True
+        """
+        if trigger in self.Triggers:
+            await self.gpib.cmdWrite("TRG " + str(trigger.name), self.addr)
+            self.gpib.resetTimeouts(self.addr)
+            return True
+        return False
+
+    @tagged
     def setSpeed(self, speed:Speeds, noUpdate: bool = False) -> bool:
         if speed in self.Speeds:
             self.gpib.cmdWrite("MSP " + str(speed.value), self.addr)
+            self.gpib.resetTimeouts(self.addr)
+            return True
+        return False
+
+    @tagged
+    async def setSpeedAsync(self, speed: Speeds, noUpdate: bool = False) -> bool:
+        """Change measurement speed
+
+        Awaitable variant of `setSpeed`, requires an aioprologix instance
+
+        Parameters
+        ----------
+        speed : Speeds
+            measurement speed
+        noUpdate : bool, optional
+            If True do not update status object to verify change was successful
+            by default False
+
+        Returns
+        -------
+        bool
+            Whether update succeeded or not
+        """
+        if speed in self.Speeds:
+            await self.gpib.cmdWrite("MSP " + str(speed.value), self.addr)
+            self.gpib.resetTimeouts(self.addr)
             return True
         return False
 
@@ -620,7 +896,18 @@ class pm2534(object):
         """
         raise Exception("Function not implemented yet!")
 
+    @tagged
     def callReset(self):
         """Reset the device
         """
         self.gpib.cmdClr(self.addr)
+        self.gpib.resetTimeouts(self.addr)
+
+    @tagged
+    async def callResetAsync(self):
+        """Reset the device
+
+        Awaitable variant of `callReset`, requires an aioprologix instance
+        """
+        await self.gpib.cmdClr(self.addr)
+        self.gpib.resetTimeouts(self.addr)
@@ -1,185 +1,2508 @@
 import serial
 import datetime
+import functools
+import inspect
 import os
+import sys
 import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from transports import openTransport, recordingTransport
+
+class busLock(object):
+    """Fair, reentrant lock handing the bus to waiting threads in FIFO order
+
+    Attributes
+    ----------
+    transactions : int
+        Number of completed acquisitions, nested ones are not counted
+    waitTotal : float
+        Total seconds spent waiting for the bus
+    waitMax : float
+        Longest wait for the bus in seconds
+    """
+
+    transactions: int = 0
+    waitTotal: float = 0.0
+    waitMax: float = 0.0
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._owner = None
+        self._depth = 0
+        self._nextTicket = 0
+        self._serving = 0
+        self.transactions = 0
+        self.waitTotal = 0.0
+        self.waitMax = 0.0
+
+    def acquire(self) -> float:
+        """Wait for the bus
+
+        Returns
+        -------
+        float
+            Seconds spent waiting; 0 if the calling thread already held the bus
+        """
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner == me:
+                self._depth += 1
+                return 0.0
+
+            ticket = self._nextTicket
+            self._nextTicket += 1
+            started = time.monotonic()
+            while ticket != self._serving:
+                self._cond.wait()
+            waited = time.monotonic() - started
+
+            self._owner = me
+            self._depth = 1
+            self.transactions += 1
+            self.waitTotal += waited
+            if waited > self.waitMax:
+                self.waitMax = waited
+            return waited
+
+    def release(self):
+        """Release the bus, handing it to the next waiting thread
+        """
+        with self._cond:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("Bus released by a thread not holding it")
+            self._depth -= 1
+            if self._depth == 0:
+                self._owner = None
+                self._serving += 1
+                self._cond.notify_all()
+
+    def waitMean(self) -> float:
+        """Get the mean time spent waiting for the bus
+
+        Returns
+        -------
+        float
+            Mean wait time in seconds
+        """
+        if self.transactions == 0:
+            return 0.0
+        return self.waitTotal / self.transactions
+
+    def resetStats(self):
+        """Reset wait time statistics
+        """
+        with self._cond:
+            self.transactions = 0
+            self.waitTotal = 0.0
+            self.waitMax = 0.0
+
+class traceBuffer(object):
+    """Fixed-size ring buffer recording bus traffic and status messages
+
+    Recording only stores a tuple, entries are formatted when dumped.
+    Each entry holds the kind, the addressed device, the payload and the
+    monotonic start and end time of the transfer.
+
+    Kinds
+    -----
+    TRACE_WRITE -> `>>` bytes sent to the adapter
+    TRACE_READ  -> `<<` bytes received from the adapter
+    TRACE_NOTE  -> `..` status message
+    TRACE_ERROR -> `!!` error message or read timeout
+
+    Attributes
+    ----------
+    size : int
+        Maximum number of entries kept, older ones are overwritten
+    echo : bool
+        Whether to print every entry as it is recorded
+    dumpOnError : bool
+        Whether to print all entries not printed so far when an error
+        is recorded
+    file : object
+        File entries are printed to, sys.stderr if None
+    """
+
+    TRACE_WRITE = ">>"
+    TRACE_READ  = "<<"
+    TRACE_NOTE  = ".."
+    TRACE_ERROR = "!!"
+
+    size: int = 1024
+    echo: bool = False
+    dumpOnError: bool = True
+    file: object = None
+
+    def __init__(self, size: int=1024, echo: bool=False, dumpOnError: bool=True, file: object=None):
+        """
+
+        Parameters
+        ----------
+        size : int, optional
+            Maximum number of entries kept
+            by default 1024
+        echo : bool, optional
+            Whether to print every entry as it is recorded
+            by default False
+        dumpOnError : bool, optional
+            Whether to print the recent entries when an error is recorded
+            by default True
+        file : object, optional
+            File entries are printed to
+            by default None for sys.stderr
+        """
+        self.size = size
+        self.echo = echo
+        self.dumpOnError = dumpOnError
+        self.file = file
+        self._entries = [None] * size
+        self._next = 0
+        self._dumped = 0
+
+    def record(self, kind: str, addr, data, start: float, end: float=None, args: tuple=()):
+        """Add an entry
+
+        Parameters
+        ----------
+        kind : str
+            One of TRACE_WRITE, TRACE_READ, TRACE_NOTE or TRACE_ERROR
+        addr : int|str|None
+            address of the device the adapter talked to
+        data : bytes|str|None
+            Transferred bytes or message. Messages are formatted with
+            `args` using the % operator when dumped
+        start : float
+            time.monotonic() when the transfer started
+        end : float, optional
+            time.monotonic() when the transfer ended
+            by default the same as start
+        args : tuple, optional
+            Arguments for the message
+            by default ()
+        """
+        self._entries[self._next % self.size] = (kind, addr, data, args, start, start if end is None else end)
+        self._next += 1
+
+        if self.echo:
+            self._print(self._next - 1, self._next)
+            self._dumped = self._next
+        elif kind == self.TRACE_ERROR and self.dumpOnError:
+            self._print(self._dumped, self._next)
+            self._dumped = self._next
+
+    def entries(self) -> list:
+        """Get all entries, oldest first
+
+        Returns
+        -------
+        list
+            Tuples of kind, address, data, message arguments, start and end time
+        """
+        first = max(0, self._next - self.size)
+        return [self._entries[i % self.size] for i in range(first, self._next)]
+
+    def format(self, entry: tuple) -> str:
+        """Format an entry as a line of text
+
+        Parameters
+        ----------
+        entry : tuple
+            Entry as returned by `entries`
+
+        Returns
+        -------
+        str
+            Start time, duration, kind, address and payload
+        """
+        kind, addr, data, args, start, end = entry
+        if data is None:
+            text = "timeout"
+        elif isinstance(data, str):
+            text = data % args if args else data
+        else:
+            text = repr(bytes(data))
+        return format(start, ".6f") + " " + format((end - start) * 1e6, "8.1f") + "µs " + kind + " " + ("--" if addr is None else str(addr)) + " " + text
+
+    def dump(self, last: int=None, file: object=None):
+        """Print the recorded entries
+
+        Parameters
+        ----------
+        last : int, optional
+            Number of most recent entries to print, all if None
+            by default None
+        file : object, optional
+            File to print to instead of `file`
+            by default None
+        """
+        first = max(0, self._next - self.size)
+        if last is not None:
+            first = max(first, self._next - last)
+        self._print(first, self._next, file)
+        self._dumped = self._next
+
+    def clear(self):
+        """Remove all entries
+        """
+        self._entries = [None] * self.size
+        self._next = 0
+        self._dumped = 0
+
+    def _print(self, first: int, last: int, file: object=None):
+        """Print entries by sequence number
+
+        Parameters
+        ----------
+        first : int
+            Sequence number of the first entry to print
+        last : int
+            Sequence number after the last entry to print
+        file : object, optional
+            File to print to instead of `file`
+            by default None
+        """
+        if file is None:
+            file = self.file if self.file is not None else sys.stderr
+        for i in range(max(first, self._next - self.size), last):
+            print(self.format(self._entries[i % self.size]), file=file)
+
+class latencyHistogram(object):
+    """Histogram of durations with logarithmic buckets
+
+    Bucket 0 counts durations below 1µs, bucket i durations from 2^(i-1)
+    up to 2^i µs. The last bucket also counts all longer durations.
+
+    Attributes
+    ----------
+    count : int
+        Number of recorded durations
+    total : float
+        Sum of all durations in seconds
+    max : float
+        Longest duration in seconds
+    buckets : list
+        Number of durations per bucket
+    """
+
+    BUCKETS = 25
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    buckets: list = None
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * self.BUCKETS
+
+    def add(self, seconds: float):
+        """Record a duration
+
+        Parameters
+        ----------
+        seconds : float
+            duration to record
+        """
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[min(int(seconds * 1e6).bit_length(), self.BUCKETS - 1)] += 1
+
+    def percentile(self, q: float) -> float:
+        """Estimate a percentile
+
+        Parameters
+        ----------
+        q : float
+            percentile between 0 and 1
+
+        Returns
+        -------
+        float
+            Upper bound of the bucket holding the percentile in seconds,
+            limited to `max`
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n > 0:
+                return min((1 << i) * 1e-6, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        """Get the current values
+
+        Returns
+        -------
+        dict
+            count, total, mean, p50, p99 and max in seconds and a copy of
+            the buckets
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count > 0 else 0.0,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+            "buckets": list(self.buckets),
+        }
+
+class busStats(object):
+    """Bus time statistics of a prologix instance
+
+    Durations are recorded per phase of a transfer, each phase separately
+    per address, per command class and per driver method tag.
+
+    Phases
+    ------
+    PHASE_DRAIN -> discarding stale input before a write
+    PHASE_WRITE -> writing and flushing a command
+    PHASE_READ  -> waiting for and receiving a response, including the
+        `++read` turnaround and the conversion time of the instrument
+    PHASE_CALL  -> a complete tagged driver method call, see `tagged`
+
+    Command classes are adapter commands like `++addr` and the leading
+    letters of device commands like `F` for `F1` or `FNC` for `FNC VDC`.
+    Commands sent together by `prologix.batch` are recorded as CLASS_BATCH.
+
+    Attributes
+    ----------
+    since : float
+        time.monotonic() of the last reset
+    busy : float
+        Seconds spent draining, writing and reading since the last reset
+    bytesOut : int
+        Number of bytes written
+    bytesIn : int
+        Number of bytes received
+    timeouts : int
+        Number of reads which timed out or were incomplete
+    tag : str
+        Tag of the driver method currently using the bus, None if untagged
+    """
+
+    PHASE_DRAIN = "drain"
+    PHASE_WRITE = "write"
+    PHASE_READ  = "read"
+    PHASE_CALL  = "call"
+
+    CLASS_BATCH = "batch"
+
+    since: float = None
+    busy: float = 0.0
+    bytesOut: int = 0
+    bytesIn: int = 0
+    timeouts: int = 0
+    tag: str = None
+
+    def __init__(self):
+        self.tag = None
+        self.reset()
+
+    def reset(self):
+        """Clear all statistics
+        """
+        self.since = time.monotonic()
+        self.busy = 0.0
+        self.bytesOut = 0
+        self.bytesIn = 0
+        self.timeouts = 0
+        self._timeoutsByAddress = {}
+        self._phases = {}
+        self._addresses = {}
+        self._commands = {}
+        self._tags = {}
+
+    @staticmethod
+    def commandClass(cmd: str) -> str:
+        """Get the class of a command
+
+        Parameters
+        ----------
+        cmd : str|bytes
+            command as sent
+
+        Returns
+        -------
+        str
+            Adapter command name or leading letters of a device command
+        """
+        if isinstance(cmd, (bytes, bytearray)):
+            cmd = cmd[:16].decode("latin-1")
+        if cmd.startswith("++"):
+            return cmd.split(None, 1)[0]
+        i = 0
+        while i < len(cmd) and cmd[i].isalpha():
+            i += 1
+        if i == 0:
+            return cmd[:1]
+        return cmd[:i]
+
+    def record(self, phase: str, addr, cls: str, seconds: float, bytesOut: int=0, bytesIn: int=0):
+        """Record the duration of a phase
+
+        Parameters
+        ----------
+        phase : str
+            PHASE_DRAIN, PHASE_WRITE or PHASE_READ
+        addr : int|str|None
+            currently addressed device
+        cls : str
+            command class, see `commandClass`
+        seconds : float
+            duration of the phase
+        bytesOut : int, optional
+            number of bytes written
+            by default 0
+        bytesIn : int, optional
+            number of bytes received
+            by default 0
+        """
+        self.busy += seconds
+        self.bytesOut += bytesOut
+        self.bytesIn += bytesIn
+        self._histogram(self._phases, phase).add(seconds)
+        self._histogram(self._addresses, (addr, phase)).add(seconds)
+        self._histogram(self._commands, (cls, phase)).add(seconds)
+        if self.tag is not None:
+            self._histogram(self._tags, (self.tag, phase)).add(seconds)
+
+    def recordTimeout(self, addr):
+        """Count a read which timed out
+
+        Parameters
+        ----------
+        addr : int|str|None
+            currently addressed device
+        """
+        self.timeouts += 1
+        self._timeoutsByAddress[addr] = self._timeoutsByAddress.get(addr, 0) + 1
+
+    def recordCall(self, tag: str, seconds: float):
+        """Record the duration of a tagged driver method call
+
+        Parameters
+        ----------
+        tag : str
+            driver method like `hp3478a.getStatus`
+        seconds : float
+            duration of the call
+        """
+        self._histogram(self._tags, (tag, self.PHASE_CALL)).add(seconds)
+
+    def utilization(self) -> float:
+        """Get the share of time the bus was busy since the last reset
+
+        Returns
+        -------
+        float
+            Busy time divided by elapsed time, between 0 and 1
+        """
+        elapsed = time.monotonic() - self.since
+        if elapsed <= 0:
+            return 0.0
+        return min(self.busy / elapsed, 1.0)
+
+    def snapshot(self) -> dict:
+        """Get all statistics
+
+        Returns
+        -------
+        dict
+            Plain values and histogram snapshots, see `latencyHistogram.snapshot`
+            Histograms are grouped by phase under `phases` and by address,
+            command class and tag first under `addresses`, `commands` and
+            `tags`
+        """
+        return {
+            "elapsed": time.monotonic() - self.since,
+            "busy": self.busy,
+            "utilization": self.utilization(),
+            "bytesOut": self.bytesOut,
+            "bytesIn": self.bytesIn,
+            "timeouts": self.timeouts,
+            "timeoutsByAddress": dict(self._timeoutsByAddress),
+            "phases": {phase: histogram.snapshot() for phase, histogram in self._phases.items()},
+            "addresses": self._group(self._addresses),
+            "commands": self._group(self._commands),
+            "tags": self._group(self._tags),
+        }
+
+    @staticmethod
+    def _histogram(table: dict, key) -> latencyHistogram:
+        """Get a histogram from a table, creating it if missing
+        """
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = latencyHistogram()
+        return histogram
+
+    @staticmethod
+    def _group(table: dict) -> dict:
+        """Convert a table indexed by (key, phase) to nested snapshots
+        """
+        out = {}
+        for (key, phase), histogram in table.items():
+            out.setdefault(key, {})[phase] = histogram.snapshot()
+        return out
+
+# Tags of coroutine driver methods, see `tagged`
+asyncTags = set()
+
+def tagged(method):
+    """Decorator attributing the bus time of a driver method to it
+
+    The method always runs as a single transaction on `self.gpib`, so
+    a write and the status read verifying it can not be interleaved by
+    other threads. If statistics are enabled its bus time is additionally
+    recorded under the tag `class.method`, see `prologix.tag`.
+
+    Coroutine methods are run with `async with`, see `aioprologix.tag`,
+    and their tags are collected in `asyncTags`.
+
+    Example
+    -------
+    @tagged
+    def getStatus(self):
+        ...
+    """
+    tag = method.__qualname__
+
+    if inspect.iscoroutinefunction(method):
+        asyncTags.add(tag)
+
+        @functools.wraps(method)
+        async def asyncWrapper(self, *args, **kwargs):
+            async with self.gpib.tag(tag):
+                return await method(self, *args, **kwargs)
+        return asyncWrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.gpib.tag(tag):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class readTimeouts(object):
+    """Adaptive read timeouts per address and command class
+
+    Timeouts are learned from a rolling window of observed response
+    latencies, see `observe`. Until enough responses were seen `default`
+    is used. Learned timeouts never drop below `floor`, so learning only
+    ever lengthens timeouts for devices responding close to or slower
+    than the configured timeout, it never shortens them.
+
+    After a timeout the address gets `default` again until it answers,
+    timeouts never grow by themselves. Addresses which timed out
+    ABSENT_AFTER times in a row are considered absent and only get
+    ABSENT_TIMEOUT, so missing devices do not stall the bus. Reads of
+    them still cost ABSENT_TIMEOUT plus `prologix.READ_MARGIN`, use
+    `deviceBreaker` to skip them entirely. Every
+    ABSENT_RETRY-th read of an absent address gets `default` to notice
+    the device coming back.
+
+    Settings of a device changing its response time, like the resolution
+    of a multimeter, have to be followed by `reset` for that address.
+
+    Attributes
+    ----------
+    default : float
+        Timeout in seconds for command classes without enough observations
+    floor : float
+        Lower limit of learned timeouts in seconds
+    """
+
+    WINDOW = 32
+    MIN_SAMPLES = 8
+    QUANTILE = 0.95
+    FACTOR = 2.0
+    MARGIN = 0.01
+    TIMEOUT_MIN = 0.01
+    TIMEOUT_MAX = 3.0
+    ABSENT_AFTER = 3
+    ABSENT_TIMEOUT = 0.02
+    ABSENT_RETRY = 8
+
+    default: float = 0.25
+    floor: float = 0.25
+
+    def __init__(self, default: float=0.25, floor: float=None):
+        """
+
+        Parameters
+        ----------
+        default : float, optional
+            Timeout in seconds for command classes without enough observations
+            by default 0.25
+        floor : float, optional
+            Lower limit of learned timeouts in seconds
+            by default None for `default`
+        """
+        self.default = default
+        self.floor = default if floor is None else floor
+        self._keys = {}         # (addr, cls) -> [latencies, learned timeout, observations]
+        self._addresses = {}    # addr -> [consecutive timeouts, reads while absent]
+
+    def get(self, addr, cls: str) -> float:
+        """Get the timeout for the next read
+
+        Parameters
+        ----------
+        addr : int|str|None
+            address of the device
+        cls : str
+            command class, see `busStats.commandClass`
+
+        Returns
+        -------
+        float
+            Timeout in seconds
+        """
+        device = self._addresses.get(addr)
+        if device is not None and device[0] > 0:
+            if self._absent(device):
+                device[1] += 1
+                if device[1] % self.ABSENT_RETRY != 0:
+                    return self.ABSENT_TIMEOUT
+            return self.default
+
+        entry = self._keys.get((addr, cls))
+        if entry is None or entry[1] is None:
+            return self.default
+        return entry[1]
+
+    def observe(self, addr, cls: str, seconds: float):
+        """Record the latency of a response
+
+        Parameters
+        ----------
+        addr : int|str|None
+            address of the device
+        cls : str
+            command class
+        seconds : float
+            time between requesting and receiving the response
+        """
+        entry = self._keys.get((addr, cls))
+        if entry is None:
+            entry = self._keys[(addr, cls)] = [deque(maxlen=self.WINDOW), None, 0]
+        latencies = entry[0]
+        latencies.append(seconds)
+        entry[2] += 1
+        # Sorting the window is cheap but not free, only do it every few
+        # observations unless the response came close to the deadline
+        if len(latencies) >= self.MIN_SAMPLES and (entry[2] % self.MIN_SAMPLES == 0 or entry[1] is None or seconds * self.FACTOR > entry[1]):
+            ordered = sorted(latencies)
+            quantile = ordered[int(self.QUANTILE * (len(ordered) - 1))]
+            entry[1] = min(max(quantile * self.FACTOR + self.MARGIN, self.floor, self.TIMEOUT_MIN), self.TIMEOUT_MAX)
+
+        device = self._addresses.get(addr)
+        if device is None:
+            device = self._addresses[addr] = [0, 0]
+        device[0] = 0
+        device[1] = 0
+
+    def timedOut(self, addr, cls: str, timeout: float):
+        """Record a read which timed out
+
+        Parameters
+        ----------
+        addr : int|str|None
+            address of the device
+        cls : str
+            command class
+        timeout : float
+            timeout used for the read as returned by `get`
+        """
+        device = self._addresses.get(addr)
+        if device is None:
+            device = self._addresses[addr] = [0, 0]
+        device[0] += 1
+
+    def reset(self, addr=None):
+        """Forget the learned timeouts of a device
+
+        Parameters
+        ----------
+        addr : int|str|None, optional
+            address of the device
+            by default None for all devices
+        """
+        if addr is None:
+            self._keys.clear()
+            return
+        for key in [key for key in self._keys if key[0] == addr]:
+            del self._keys[key]
+
+    def absent(self, addr) -> bool:
+        """Check whether a device is considered absent
+
+        Parameters
+        ----------
+        addr : int|str|None
+            address of the device
+
+        Returns
+        -------
+        bool
+            True if the last ABSENT_AFTER reads timed out
+        """
+        device = self._addresses.get(addr)
+        return device is not None and self._absent(device)
+
+    def _absent(self, device: list) -> bool:
+        """Check the state of an address for absence
+        """
+        return device[0] >= self.ABSENT_AFTER
+
+    def snapshot(self) -> dict:
+        """Get the current timeouts
+
+        Returns
+        -------
+        dict
+            Learned timeouts in seconds indexed by address and command
+            class, not accounting for devices which timed out
+        """
+        out = {}
+        for (addr, cls), entry in self._keys.items():
+            out.setdefault(addr, {})[cls] = entry[1] if entry[1] is not None else self.default
+        return out
+
+class deviceBreaker(object):
+    """Circuit breakers for the devices on a bus
+
+    After THRESHOLD consecutive timeouts of a device its breaker opens and
+    reads from it are skipped without touching the bus. With `readTimeouts`
+    only the first of these reads may use a learned timeout, the others
+    and all liveness checks use the configured `prologix.timeout`. Once
+    the backoff passed a liveness check is due, if it succeeds the device
+    is polled as usual again, otherwise the backoff doubles up to
+    BACKOFF_MAX.
+
+    States
+    ------
+    STATE_CLOSED  -> device is healthy
+    STATE_OPEN    -> device is skipped
+    STATE_DUE     -> backoff passed, liveness check needed
+    STATE_PROBING -> liveness check running
+
+    Attributes
+    ----------
+    opened : int
+        Number of times a breaker opened
+    skipped : int
+        Number of reads skipped because of open breakers
+    """
+
+    THRESHOLD = 3
+    BACKOFF_MIN = 1.0
+    BACKOFF_MAX = 60.0
+
+    STATE_CLOSED  = "closed"
+    STATE_OPEN    = "open"
+    STATE_DUE     = "due"
+    STATE_PROBING = "probing"
+
+    opened: int = 0
+    skipped: int = 0
+
+    def __init__(self):
+        self.opened = 0
+        self.skipped = 0
+        self._devices = {}      # addr -> [state, consecutive timeouts, backoff, retry time]
+
+    def allow(self, addr) -> str:
+        """Check whether a device may be read
+
+        Parameters
+        ----------
+        addr : str
+            address of the device
+
+        Returns
+        -------
+        str
+            STATE_CLOSED or STATE_PROBING if the device may be read,
+            STATE_OPEN if it should be skipped,
+            STATE_DUE if a liveness check is needed first. The state changes
+                to STATE_PROBING until `success` or `failure` is called
+        """
+        device = self._devices.get(addr)
+        if device is None or device[0] == self.STATE_CLOSED:
+            return self.STATE_CLOSED
+        if device[0] == self.STATE_OPEN:
+            if time.monotonic() < device[3]:
+                self.skipped += 1
+                return self.STATE_OPEN
+            device[0] = self.STATE_PROBING
+            return self.STATE_DUE
+        return device[0]
+
+    def success(self, addr):
+        """Record a response of a device, closing its breaker
+
+        Parameters
+        ----------
+        addr : str
+            address of the device
+        """
+        device = self._devices.get(addr)
+        if device is not None:
+            device[0] = self.STATE_CLOSED
+            device[1] = 0
+            device[2] = self.BACKOFF_MIN
+
+    def failure(self, addr):
+        """Record a timeout of a device
+
+        Parameters
+        ----------
+        addr : str
+            address of the device
+        """
+        device = self._devices.get(addr)
+        if device is None:
+            device = self._devices[addr] = [self.STATE_CLOSED, 0, self.BACKOFF_MIN, 0.0]
+        if device[0] == self.STATE_PROBING:
+            device[2] = min(device[2] * 2, self.BACKOFF_MAX)
+        elif device[0] == self.STATE_CLOSED:
+            device[1] += 1
+            if device[1] < self.THRESHOLD:
+                return
+            self.opened += 1
+        else:
+            return
+        device[0] = self.STATE_OPEN
+        device[3] = time.monotonic() + device[2]
+
+    def state(self, addr) -> str:
+        """Get the breaker state of a device
+
+        Parameters
+        ----------
+        addr : str
+            address of the device
+
+        Returns
+        -------
+        str
+            STATE_CLOSED, STATE_OPEN or STATE_PROBING
+        """
+        device = self._devices.get(addr)
+        if device is None:
+            return self.STATE_CLOSED
+        return device[0]
+
+    def reset(self, addr=None):
+        """Close breakers
+
+        Parameters
+        ----------
+        addr : str, optional
+            address of the device
+            by default None for all devices
+        """
+        if addr is None:
+            self._devices.clear()
+        else:
+            self._devices.pop(addr, None)
+
+    def snapshot(self) -> dict:
+        """Get the state of all devices
+
+        Returns
+        -------
+        dict
+            State, consecutive timeouts, backoff and seconds until the next
+            liveness check indexed by address
+        """
+        now = time.monotonic()
+        return {addr: {
+            "state": device[0],
+            "timeouts": device[1],
+            "backoff": device[2],
+            "retryIn": max(device[3] - now, 0.0) if device[0] == self.STATE_OPEN else 0.0,
+        } for addr, device in self._devices.items()}
 
 class prologix(object):
     """Class for handling prologix protocol based GPIB communication
 
-    Based on code by Daniel Stadelmann and Tobias Badertscher
+    Based on code by Daniel Stadelmann and Tobias Badertscher
+
+    Attributes
+    ----------
+    serial : object
+        Transport used to communicate with the prologix dongle. A PySerial
+        object or anything offering the same interface, see `transports`
+    debug : bool
+        Whether to print verbose status messages and all communication
+        Enables `tracer` printing every entry as it is recorded
+    version : str
+        Response of the adapter to `++ver`
+    tracer : traceBuffer
+        Ring buffer recording all communication and status messages
+        None if tracing is disabled, see `trace`
+    stats : busStats
+        Latency histograms, byte and timeout counters
+        None if statistics are disabled, see `stats`
+    deadlines : readTimeouts
+        Adaptive timeouts for reads from devices
+        None if `timeout` is used for all reads, see `adaptive`
+    health : deviceBreaker
+        Circuit breakers skipping unresponsive devices
+        None if disabled, see `breaker`
+    liveness : dict
+        Liveness checks indexed by address, see `registerLiveness`
+    timeout : float
+        Timeout for serial and GPIB operations. Also the lower limit of
+        the adaptive timeouts, assigning a different value overrides them
+    EOL : str
+        Characters to append to all commands sent to USB
+    ESCAPE_CHARS : bytes
+        Bytes of device commands which need an ESC prefix, see `escapeCmd`
+    ESCAPE_TABLE : tuple
+        Escaped form of each byte value, see `escapeCmd`
+    drainedBytes : int
+        Total number of stale bytes discarded from the input buffer
+        before sending commands. Non-zero values indicate replies
+        nobody waited for, usually a desync between commands and reads
+    terminator : bytes
+        Byte sequence ending a response frame, see `readLine`
+    exclusive : bool
+        Whether this instance is the only one controlling the adapter.
+        Only then commands setting an already active adapter state are
+        suppressed, see `busState`
+    busState : dict
+        Shadow of the adapter state as last written, indexed by command name
+        like `++addr`. See STATE_CMDS for the tracked commands
+    suppressed : dict
+        Number of suppressed commands indexed by command name
+    lock : busLock
+        Lock arbitrating the adapter between threads, see `transaction`.
+        Also holds the wait time statistics
+    srqHandlers : dict
+        Service request callbacks indexed by address, see `registerSRQ`
+    srqUnhandled : int
+        Number of times SRQ was asserted without a registered device
+        requesting service
+    batchDiscards : int
+        Number of `batch` blocks left by an exception whose queued
+        commands were dropped. Drivers caching device state compare it
+        to notice settings which were never sent
+
+    """
+
+    serial: object = None
+    debug: bool = False
+    version: str = None
+    tracer: traceBuffer = None
+    stats: busStats = None
+    deadlines: readTimeouts = None
+    health: deviceBreaker = None
+    liveness: dict = None
+    timeout: float = 2.5
+    EOL: str = "\n"
+    drainedBytes: int = 0
+    terminator: bytes = b"\n"
+
+    exclusive: bool = True
+    busState: dict = None
+    suppressed: dict = None
+
+    ESCAPE_CHARS = b"\n\r\x1b+"
+    ESCAPE_TABLE = tuple(bytes((27, c)) if c in b"\n\r\x1b+" else bytes((c,)) for c in range(256))
+
+    STATE_CMDS = ("++mode", "++addr", "++auto", "++eoi", "++eos", "++eot_enable", "++eot_char", "++read_tmo_ms")
+
+    CONFIG_WRITE = "write"
+    CONFIG_QUERY = "query"
+    CONFIG_SKIP  = "skip"
+
+    INIT_CONFIG = (
+        ("++mode", "1"),                                        # Change to controller mode
+        ("++auto", "0"),                                        # Do not automatically read device after each command
+        ("++eoi", "0"),                                         # Do not assert EOI after command
+        ("++eos", "0"),                                         # Append CR+LF to all commands
+        ("++eot_enable", "0"),                                  # Do not append EOT to USB output after EOI
+    )
+
+    TRACE_SIZE = 1024
+
+    READ_TMO_MIN = 1
+    READ_TMO_MAX = 3000
+    READ_MARGIN = 0.05
+
+    PROBE_TIMEOUT: float = 5.0
+    PROBE_ATTEMPT: float = 0.1
+
+    # Wait until written commands left the transport
+    FLUSH_WRITES: bool = True
+
+    lock: busLock = None
+    srqHandlers: dict = None
+    srqUnhandled: int = 0
+    batchDiscards: int = 0
+
+    STB_RQS = 0x40
+    EOT_CHAR = 4
+
+    _rxBuffer: bytearray = None
+    _rxConsumed: int = 0
+    _deadline: float = None
+    _batch: bytearray = None
+
+    def __init__(self, port: str=None, baud: int=115200, timeout: float=2.5, debug: bool=False, exclusive: bool=True, fastStart: bool=True, config: str=CONFIG_WRITE, transport: object=None, trace: int=0, stats: bool=False, record: str=None, adaptive: bool=True, breaker: bool=True):
+        """
+
+        Parameters
+        ----------
+        port : str, optional
+            path of the serial device to use. Example: `/dev/ttyACM0` or `COM3`
+            Network adapters are addressed as `tcp://host[:port]`,
+            see `transports.openTransport` for all supported formats
+            Either port or transport must be given
+            by default None
+        baud : int, optional
+            baudrate used for serial communication
+            921600 should work with most USB dongles
+            115200 or 9600 are common for devices using UART in between
+            by default 921600
+        timeout : float, optional
+            number of seconds to wait at maximum for serial data to arrive
+            Initial timeout for device reads if `adaptive`
+            by default 2.5 seconds
+        debug : bool, optional
+            Whether to print verbose status messages and all communication
+            by default False
+        exclusive : bool, optional
+            Whether this instance is the only one controlling the adapter
+            Set to False if other controllers may change the adapter state
+            by default True
+        fastStart : bool, optional
+            If True poll `++ver` until the adapter answers instead of waiting a
+                fixed 2.5 seconds for it to boot
+            by default True
+        config : str, optional
+            How to initialize the adapter configuration
+            CONFIG_WRITE -> Write the complete configuration
+            CONFIG_QUERY -> Query the configuration, only write differing values
+            CONFIG_SKIP  -> Assume the adapter already holds the configuration,
+                for example after `++savecfg`
+            by default CONFIG_WRITE
+        transport : object, optional
+            Already opened transport to use instead of opening port
+            by default None
+        trace : int, optional
+            Number of entries to keep in the `tracer` ring buffer
+            0 disables tracing unless `debug` is set
+            by default 0
+        stats : bool, optional
+            Whether to collect bus time statistics in `stats`
+            by default False
+        record : str, optional
+            Path of a session log to record all traffic into, see
+            `transports.recordingTransport`. Replay it by passing
+            `replay://path` as port
+            by default None
+        adaptive : bool, optional
+            Whether to learn read timeouts per address and command class,
+            see `readTimeouts`. Learned timeouts are never shorter than
+            `timeout`, but absent devices only get a few milliseconds
+            by default True
+        breaker : bool, optional
+            Whether to skip devices which stopped responding until a liveness
+            check succeeds, see `deviceBreaker`. A dead device holds the bus
+            for THRESHOLD timeouts before it is skipped
+            by default True
+
+        """
+        self._initState(timeout, debug, exclusive, trace, stats, adaptive, breaker)
+
+        #Establish connection
+        if transport is not None:
+            self.serial = transport
+            self.serial.timeout = self.timeout
+            if port is None:
+                port = str(transport)
+        else:
+            try:
+                self.serial = openTransport(port, baud=baud, timeout=self.timeout)
+            except (serial.SerialException, OSError):
+                print("!! Port " + port + " could not be opened")
+                self.serial = None
+                return None
+
+        if record is not None:
+            self.serial = recordingTransport(self.serial, record)
+
+        #Check for Prologix device
+        if fastStart:
+            check = self.probe()
+        else:
+            time.sleep(2.5)
+            check = self.cmdPoll("++ver", read=False)
+
+        if check is None or len(check)<=0:
+            print("!! No responding device on port " + port + " found")
+            self.serial = None
+            return None
+        elif not ("Prologix".casefold() in check.casefold() or "AR488".casefold() in check.casefold()):
+            print("!! Device on Port " + port + " does not seem to be Prologix compatible")
+            print(check)
+            self.serial = None
+            return None
+        else:
+            self.traceNote("Found Prologix compatible device on port %s", port)
+
+        self.version = check
+
+        #Initialize basic parameters
+        self.configure(config)
+
+    def _initState(self, timeout: float, debug: bool, exclusive: bool, trace: int=0, stats: bool=False, adaptive: bool=False, breaker: bool=False):
+        """Initialize per instance state before connecting
+
+        Parameters
+        ----------
+        timeout : float
+            number of seconds to wait at maximum for data to arrive
+            If None the class default is kept
+        debug : bool
+            Whether to print verbose status messages and all communication
+        exclusive : bool
+            Whether this instance is the only one controlling the adapter
+        trace : int, optional
+            Number of entries to keep in the trace buffer, 0 to disable tracing
+            by default 0
+        stats : bool, optional
+            Whether to collect bus time statistics
+            by default False
+        adaptive : bool, optional
+            Whether to learn read timeouts per address and command class
+            by default False
+        breaker : bool, optional
+            Whether to skip unresponsive devices
+            by default False
+        """
+        if timeout is not None:
+            self.timeout = timeout
+
+        self.debug = debug
+        self.tracer = None
+        if trace > 0 or debug:
+            self.tracer = traceBuffer(trace if trace > 0 else self.TRACE_SIZE, echo=debug)
+        self.stats = busStats() if stats else None
+        self.deadlines = readTimeouts(self.timeout) if adaptive else None
+        self.health = deviceBreaker() if breaker else None
+        self.liveness = {}
+        self.drainedBytes = 0
+        self._rxBuffer = bytearray()
+        self._rxConsumed = 0
+        self.exclusive = exclusive
+        self.busState = {}
+        self.suppressed = {}
+        self.lock = busLock()
+        self.srqHandlers = {}
+        self.srqUnhandled = 0
+        self.batchDiscards = 0
+
+    def probe(self, timeout: float=None, attempt: float=None) -> str:
+        """Poll `++ver` until the adapter answers
+
+        Parameters
+        ----------
+        timeout : float, optional
+            number of seconds to wait for the adapter at maximum
+            by default PROBE_TIMEOUT
+        attempt : float, optional
+            number of seconds to wait for a response before asking again
+            by default PROBE_ATTEMPT
+
+        Returns
+        -------
+        str|None
+            Response to `++ver`
+            None if the adapter did not answer in time
+        """
+        if timeout is None:
+            timeout = self.PROBE_TIMEOUT
+        if attempt is None:
+            attempt = self.PROBE_ATTEMPT
+
+        deadline = time.monotonic() + timeout
+        oldTimeout = self.timeout
+        self.timeout = attempt
+        self.serial.timeout = attempt
+        # Unanswered attempts are expected while the adapter boots
+        dumpOnError = self.tracer is not None and self.tracer.dumpOnError
+        if dumpOnError:
+            self.tracer.dumpOnError = False
+        try:
+            while True:
+                check = self.cmdPoll("++ver", read=False)
+                if check is not None and len(check) > 0:
+                    return check
+                if time.monotonic() >= deadline:
+                    return None
+        finally:
+            self.timeout = oldTimeout
+            self.serial.timeout = oldTimeout
+            if dumpOnError:
+                self.tracer.dumpOnError = True
+
+    def configure(self, config: str=CONFIG_WRITE):
+        """Initialize the adapter configuration
+
+        Parameters
+        ----------
+        config : str, optional
+            CONFIG_WRITE -> Write the complete configuration
+            CONFIG_QUERY -> Query the configuration, only write differing values
+            CONFIG_SKIP  -> Assume the adapter already holds the configuration
+            by default CONFIG_WRITE
+        """
+        settings = self.INIT_CONFIG + (("++read_tmo_ms", str(self.readTimeoutMs(self.timeout))),)   # Transmission timeout
+
+        for name, value in settings:
+            if config == self.CONFIG_SKIP:
+                self.busState[name] = value
+                continue
+            if config == self.CONFIG_QUERY:
+                current = self.cmdPoll(name, read=False)
+                if current == value:
+                    self.busState[name] = value
+                    continue
+            self.cmdWrite(name + " " + value)
+
+        if config != self.CONFIG_SKIP:
+            self.cmdWrite("++ifc")                              # Assert IFC to indicate we're taking control of the bus
+
+    def readTimeoutMs(self, timeout: float) -> int:
+        """Convert a timeout to a `++read_tmo_ms` value
+
+        Parameters
+        ----------
+        timeout : float
+            timeout in seconds
+
+        Returns
+        -------
+        int
+            timeout in milliseconds, limited to the range accepted by adapters
+        """
+        return min(max(int(round(timeout * 1000)), self.READ_TMO_MIN), self.READ_TMO_MAX)
+
+    def _readTimeout(self, cmd: str) -> float:
+        """Set the adapter read timeout for a response to a device command
+
+        `++read_tmo_ms` is only sent if the value changed, see `busState`.
+        A `timeout` assigned after connecting overrides the learned
+        timeouts until the original value is restored. Liveness checks of
+        the breaker always get `timeout`, see `deviceBreaker`.
+
+        Parameters
+        ----------
+        cmd : str
+            The command the response is requested for
+
+        Returns
+        -------
+        float
+            number of seconds to wait for the response
+        """
+        if self.deadlines is None:
+            return self.timeout
+        addr = self.busState.get("++addr")
+        if self.timeout != self.deadlines.default:
+            timeout = self.timeout
+        elif self.health is not None and self.health.state(addr) == self.health.STATE_PROBING:
+            # A device coming back must not fail its check on ABSENT_TIMEOUT
+            timeout = self.timeout
+        else:
+            timeout = self.deadlines.get(addr, busStats.commandClass(cmd))
+        self._deadline = timeout
+        self._write("++read_tmo_ms " + str(self.readTimeoutMs(timeout)))
+        return timeout + self.READ_MARGIN
+
+    def close(self):
+        """Close the transport, finishing a session log if recording
+        """
+        if self.serial is None:
+            return
+        self.serial.close()
+        self.serial = None
+
+    def cmdWrite(self, cmd: str, addr: int=None):
+        """Write a single, returnless command to a GPIB device
+
+        Adapter commands setting a state which is already active according to
+        `busState` are not sent if the bus is `exclusive`.
+
+        Parameters
+        ----------
+        cmd : str|bytes
+            The command string to be sent. bytes are sent unchanged, use
+                `escapeCmd` for binary payloads
+        addr : int, optional
+            address of the targeted device. If set an `++addr` will be issued first
+            by default None
+        """
+        with self.transaction():
+            self._write(cmd, addr)
+
+    def _write(self, cmd: str, addr: int=None):
+        """Write a command without taking the bus lock, see `cmdWrite`
+
+        Parameters
+        ----------
+        cmd : str|bytes
+            The command string to be sent
+        addr : int, optional
+            address of the targeted device
+            by default None
+        """
+        if addr is not None:
+            self._write("++addr " + str(addr))
+        if isinstance(cmd, str):
+            if self._shadowState(cmd):
+                return
+            data = str.encode(cmd+self.EOL)
+        else:
+            data = bytes(cmd) + str.encode(self.EOL)
+        tracer = self.tracer
+        stats = self.stats
+        if self._batch is not None:
+            self._batch += data
+            if tracer is not None:
+                now = time.monotonic()
+                tracer.record(tracer.TRACE_WRITE, self.busState.get("++addr"), data, now, now)
+            return
+        if tracer is None and stats is None:
+            self.drainInput()
+            self.serial.write(data)
+            if self.FLUSH_WRITES:
+                self.serial.flush()
+            return
+
+        drainStart = time.monotonic()
+        self.drainInput()
+        start = time.monotonic()
+        self.serial.write(data)
+        if self.FLUSH_WRITES:
+            self.serial.flush()
+        end = time.monotonic()
+
+        addr = self.busState.get("++addr")
+        if stats is not None:
+            cls = stats.commandClass(cmd)
+            stats.record(stats.PHASE_DRAIN, addr, cls, start - drainStart)
+            stats.record(stats.PHASE_WRITE, addr, cls, end - start, bytesOut=len(data))
+        if tracer is not None:
+            tracer.record(tracer.TRACE_WRITE, addr, data, start, end)
+
+    def cmdPoll(self, cmd: str, addr: int=None, binary: bool=False, read: bool=True, size: int=None, eot: bool=False):
+        """Write a single command to a GPIB device and fetch response
+
+        Parameters
+        ----------
+        cmd : str|bytes
+            The command string to be sent. bytes are sent unchanged, use
+                `escapeCmd` for binary payloads
+        addr : int, optional
+            address of the targeted device. If set an `++addr` will be issued first
+            by default None
+        binary : bool, optional
+            If False responses are decoded and returned as String
+            If True resonses are unchanged and returned as bytes
+            by default False
+        read : bool, optional
+            Whether to issue a `++read eoi` before waiting for data
+            While required for GPIB device commands internal prologix commands
+                or while operating with `++auto 1` might return data without polling
+                first
+            by default True
+        size : int, optional
+            If set read exactly this number of bytes instead of a line
+            Implies `binary`. Use this for binary responses which may contain
+                the terminator or do not end with one
+            by default None
+        eot : bool, optional
+            If True read until the device asserts EOI. The adapter is told to
+                append EOT_CHAR on EOI for this read, the response is returned
+                without it, see `readEOI`
+            by default False
+
+        Returns
+        -------
+        None|str|bytes
+            None for empty or incomplete responses
+            str or bytes depending on `binary` parameter, see `readLine`
+
+        Raises
+        ------
+        ValueError
+            With `eot` if the response contained EOT_CHAR, see `readEOI`
+        """
+        if size is not None:
+            binary = True
+
+        with self.transaction():
+            if read and not self._healthy(addr):
+                return None
+            if eot:
+                eotEnable = self.busState.get("++eot_enable", "0")
+                self._write("++eot_char " + str(self.EOT_CHAR))
+                self._write("++eot_enable 1")
+            try:
+                self._write(cmd, addr)
+                timeout = None
+                if read:
+                    timeout = self._readTimeout(cmd)
+                    self._write("++read eoi")
+                start = time.monotonic()
+                if size is not None:
+                    out = self.readBytes(size, timeout=timeout)
+                elif eot:
+                    out = self.readEOI(binary=binary, timeout=timeout)
+                else:
+                    out = self.readLine(binary=binary, timeout=timeout)
+                self._recordRead(start, out, cmd, learn=read)
+            finally:
+                if eot:
+                    self._write("++eot_enable " + eotEnable)
+        return self._response(out, binary)
+
+    def cmdPollMany(self, cmds: list, addr: int=None, depth: int=16, progress=None) -> list:
+        """Write several commands to a GPIB device and fetch all responses
+
+        Commands are pipelined: groups of `depth` commands, each followed
+        by `++read eoi`, are sent with a single write before reading the
+        responses of the group, see `batch`. Responses are read up to EOI,
+        so they may contain the terminator but not EOT_CHAR.
+
+        Parameters
+        ----------
+        cmds : list
+            Commands to send, str or bytes, see `cmdWrite`
+        addr : int, optional
+            address of the targeted device. If set an `++addr` will be issued first
+            by default None
+        depth : int, optional
+            number of commands sent at once. The adapter has to buffer
+                a whole group, reduce this for adapters with small input
+                buffers
+            by default 16
+        progress : callable, optional
+            Called as `progress(done)` with the number of responses
+                received after each group
+            by default None
+
+        Returns
+        -------
+        list
+            bytes response for each command. If a response is missing
+                the remaining commands are not sent and None is returned
+                for them
+
+        Raises
+        ------
+        ValueError
+            If a response contained EOT_CHAR, see `readEOI`
+        """
+        out = []
+        with self.transaction():
+            if not self._healthy(addr):
+                return [None] * len(cmds)
+            self._write("++read_tmo_ms " + str(self.readTimeoutMs(self.timeout)), addr)
+            self._write("++eot_char " + str(self.EOT_CHAR))
+            eotEnable = self.busState.get("++eot_enable", "0")
+            self._write("++eot_enable 1")
+            try:
+                for first in range(0, len(cmds), depth):
+                    group = cmds[first:first + depth]
+                    with self.batch():
+                        for cmd in group:
+                            self._write(cmd, addr)
+                            self._write("++read eoi")
+                    for i, cmd in enumerate(group):
+                        start = time.monotonic()
+                        # Only the last response of a group has to end the data
+                        frame = self.readEOI(binary=True, more=i < len(group) - 1)
+                        self._recordRead(start, frame, cmd)
+                        if frame is None:
+                            self.traceError("No response to command %d of %d", len(out) + 1, len(cmds))
+                            return out + [None] * (len(cmds) - len(out))
+                        out.append(bytes(frame))
+                    if progress is not None:
+                        progress(len(out))
+            finally:
+                self._write("++eot_enable " + eotEnable)
+        return out
+
+    def cmdPollBlock(self, cmd: str, addr: int=None):
+        """Write a single command to a GPIB device and fetch an IEEE 488.2 block
+
+        Parameters
+        ----------
+        cmd : str
+            The command string to be sent
+        addr : int, optional
+            address of the targeted device. If set an `++addr` will be issued first
+            by default None
+
+        Returns
+        -------
+        None|bytes
+            Block data without header, see `readBlock`
+            None for empty or incomplete responses
+        """
+        with self.transaction():
+            if not self._healthy(addr):
+                return None
+            self._write(cmd, addr)
+            timeout = self._readTimeout(cmd)
+            self._write("++read eoi")
+            start = time.monotonic()
+            out = self.readBlock(timeout=timeout)
+            self._recordRead(start, out, cmd, learn=True)
+            return None if out is None else bytes(out)
+
+    def _response(self, out, binary: bool):
+        """Convert a received frame to the format returned by `cmdPoll`
+
+        Parameters
+        ----------
+        out : None|bytes|memoryview
+            Frame as returned by `readLine`
+        binary : bool
+            Whether to keep the raw frame
+
+        Returns
+        -------
+        None|str|bytes
+            None for empty responses
+            str or bytes depending on `binary` parameter
+        """
+        if out is None:
+            return None
+        if binary:
+            # Views into the receive buffer stay internal
+            return bytes(out)
+        out = out.decode()
+        return out.strip()
+
+    def _recordRead(self, start: float, out, cmd: str, learn: bool=False):
+        """Record a received frame in the trace buffer, statistics and deadlines
+
+        Parameters
+        ----------
+        start : float
+            time.monotonic() when reading started
+        out : None|bytes|memoryview
+            Received frame, None on timeout
+        cmd : str
+            The command the frame responds to
+        learn : bool, optional
+            Whether the frame was read from a device and its latency should
+            be learned by `deadlines`
+            by default False
+        """
+        if self.tracer is None and self.stats is None and (not learn or (self.deadlines is None and self.health is None)):
+            return
+        end = time.monotonic()
+        addr = self.busState.get("++addr")
+
+        if learn and self.deadlines is not None:
+            if out is None:
+                self.deadlines.timedOut(addr, busStats.commandClass(cmd), self._deadline)
+            else:
+                self.deadlines.observe(addr, busStats.commandClass(cmd), end - start)
+        if learn and self.health is not None:
+            if out is None:
+                self.health.failure(addr)
+            else:
+                self.health.success(addr)
+
+        stats = self.stats
+        if stats is not None:
+            stats.record(stats.PHASE_READ, addr, stats.commandClass(cmd), end - start, bytesIn=0 if out is None else len(out))
+            if out is None:
+                stats.recordTimeout(addr)
+
+        tracer = self.tracer
+        if tracer is not None:
+            if out is None:
+                tracer.record(tracer.TRACE_ERROR, addr, None, start, end)
+            else:
+                tracer.record(tracer.TRACE_READ, addr, bytes(out), start, end)
+
+    def traceNote(self, msg: str, *args):
+        """Record a status message in the trace buffer
+
+        The message is only formatted when the trace is printed.
+        Does nothing if tracing is disabled.
+
+        Parameters
+        ----------
+        msg : str
+            Message, may contain % placeholders for args
+        args
+            Values for the placeholders
+        """
+        tracer = self.tracer
+        if tracer is not None:
+            tracer.record(tracer.TRACE_NOTE, self.busState.get("++addr"), msg, time.monotonic(), args=args)
+
+    def traceError(self, msg: str, *args):
+        """Record an error message in the trace buffer
+
+        See `traceNote`. Prints the recent trace if the buffer is set to
+        `dumpOnError`.
+
+        Parameters
+        ----------
+        msg : str
+            Message, may contain % placeholders for args
+        args
+            Values for the placeholders
+        """
+        tracer = self.tracer
+        if tracer is not None:
+            tracer.record(tracer.TRACE_ERROR, self.busState.get("++addr"), msg, time.monotonic(), args=args)
+
+    @contextmanager
+    def transaction(self):
+        """Hold the adapter for an atomic sequence of commands
+
+        Threads sharing this instance are served in the order they asked for
+        the bus. Single `cmdWrite`/`cmdPoll` calls are atomic on their own,
+        use this to keep sequences like a write followed by a status read
+        together. Transactions may be nested within a thread.
+
+        Example
+        -------
+        with gpib.transaction():
+            gpib.cmdWrite("F1", 23)
+            status = gpib.cmdPoll("B", 23, binary=True)
+
+        Yields
+        ------
+        prologix
+            This instance
+        """
+        self.lock.acquire()
+        try:
+            yield self
+        finally:
+            self.lock.release()
+
+    @contextmanager
+    def tag(self, name: str):
+        """Attribute bus time to a driver method
+
+        Holds the bus like `transaction` and records the statistics of all
+        commands sent meanwhile under `name` as well, see `busStats`.
+        Driver methods use the `tagged` decorator instead.
+
+        Parameters
+        ----------
+        name : str
+            Tag like `hp3478a.getStatus`
+
+        Yields
+        ------
+        prologix
+            This instance
+        """
+        with self.transaction():
+            stats = self.stats
+            if stats is None:
+                yield self
+                return
+            previous = stats.tag
+            stats.tag = name
+            start = time.monotonic()
+            try:
+                yield self
+            finally:
+                stats.tag = previous
+                stats.recordCall(name, time.monotonic() - start)
+
+    @contextmanager
+    def batch(self):
+        """Coalesce commands into a single write
+
+        Holds the bus like `transaction`. Commands written meanwhile are
+        queued and sent with a single write and flush when the block ends.
+        Reads are sync points, everything queued before is sent first.
+        Batches may be nested, only the outermost one sends.
+
+        If the block is left by an exception, commands still queued are
+        dropped instead of sent, the shadowed adapter state is forgotten
+        and `batchDiscards` is incremented.
+
+        Example
+        -------
+        with gpib.batch():
+            meter.setFunction(meter.FUNC_DCV, noUpdate=True)
+            meter.setRange("3", noUpdate=True)
+            meter.setDigits(4, noUpdate=True)
+        meter.getStatus()
+
+        Yields
+        ------
+        prologix
+            This instance
+        """
+        with self.transaction():
+            if self._batch is not None:
+                yield self
+                return
+            self._batch = bytearray()
+            try:
+                yield self
+            except BaseException:
+                self.discardBatch()
+                raise
+            else:
+                self.flushBatch()
+            finally:
+                self._batch = None
+
+    def batching(self) -> bool:
+        """Check whether commands are currently queued by `batch`
+
+        Returns
+        -------
+        bool
+            True inside a `batch` block
+        """
+        return self._batch is not None
+
+    def discardBatch(self) -> int:
+        """Drop all commands queued by `batch` without sending them
+
+        The queued commands might have changed the shadowed adapter state,
+        so it is forgotten as well.
+
+        Returns
+        -------
+        int
+            Number of bytes dropped
+        """
+        data = self._batch
+        if not data:
+            return 0
+        self._batch = bytearray()
+        self.traceError("Discarded %d queued bytes", len(data))
+        self.invalidateState()
+        self.batchDiscards += 1
+        return len(data)
+
+    def flushBatch(self) -> int:
+        """Send all commands queued by `batch` with a single write
 
-    Attributes
-    ----------
-    serial : object
-        PySerial object used to communicate with the prologix dongle
-    debug : bool
-        Whether to print verbose status messages and all communication
-    timeout : float
-        Timeout for serial and GPIB operations
-    EOL : str
-        Characters to append to all commands sent to USB
+        Returns
+        -------
+        int
+            Number of bytes sent
+        """
+        data = self._batch
+        if not data:
+            return 0
+        self._batch = bytearray()
 
-    """
+        stats = self.stats
+        if stats is None:
+            self.drainInput()
+            self.serial.write(data)
+            if self.FLUSH_WRITES:
+                self.serial.flush()
+            return len(data)
 
-    serial: object = None
-    debug: bool = False
-    timeout: float = 2.5
-    EOL: str = "\n"
+        drainStart = time.monotonic()
+        self.drainInput()
+        start = time.monotonic()
+        self.serial.write(data)
+        if self.FLUSH_WRITES:
+            self.serial.flush()
+        end = time.monotonic()
+
+        addr = self.busState.get("++addr")
+        stats.record(stats.PHASE_DRAIN, addr, stats.CLASS_BATCH, start - drainStart)
+        stats.record(stats.PHASE_WRITE, addr, stats.CLASS_BATCH, end - start, bytesOut=len(data))
+        return len(data)
+
+    def _healthy(self, addr: int=None) -> bool:
+        """Check the breaker of a device before reading from it
+
+        Runs the liveness check of the device if one is due, see
+        `deviceBreaker`.
+
+        Parameters
+        ----------
+        addr : int, optional
+            address of the device
+            by default None for the currently addressed one
 
-    def __init__(self, port: str, baud: int=115200, timeout: float=2.5, debug: bool=False):
+        Returns
+        -------
+        bool
+            False if the device should be skipped
         """
+        health = self.health
+        if health is None:
+            return True
+        key = self.busState.get("++addr") if addr is None else str(addr)
+        state = health.allow(key)
+        if state == health.STATE_CLOSED or state == health.STATE_PROBING:
+            return True
+        if state == health.STATE_OPEN:
+            return False
+
+        self.traceNote("Checking liveness of %s", key)
+        check = self.liveness.get(key)
+        if check is None:
+            if self.deadlines is not None:
+                self._write("++read_tmo_ms " + str(self.readTimeoutMs(self.timeout)))
+            alive = key is not None and self.cmdSpoll(int(key)) is not None
+        else:
+            alive = check() is not None
+        if alive:
+            health.success(key)
+        else:
+            health.failure(key)
+            self.traceError("Device %s still not responding", key)
+        return alive
+
+    def registerLiveness(self, addr: int, check):
+        """Register a cheap check whether a device responds
+
+        Used by the breaker before polling a device again which stopped
+        responding. Without a registered check `++spoll` is used.
 
         Parameters
         ----------
-        port : str
-            path of the serial device to use. Example: `/dev/ttyACM0` or `COM3`
-        baud : int, optional
-            baudrate used for serial communication
-            921600 should work with most USB dongles
-            115200 or 9600 are common for devices using UART in between
-            by default 921600
-        timeout : float, optional
-            number of seconds to wait at maximum for serial data to arrive
-            by default 2.5 seconds
-        debug : bool, optional
-            Whether to print verbose status messages and all communication
+        addr : int
+            address of the device
+        check : callable
+            Called without arguments, returns None if the device did not
+            respond
+        """
+        self.liveness[str(addr)] = check
+
+    def resetTimeouts(self, addr: int=None):
+        """Forget the read timeouts learned for a device
+
+        Drivers call this after changing settings which affect the response
+        time of the device, see `readTimeouts.reset`.
+
+        Parameters
+        ----------
+        addr : int, optional
+            address of the device
+            by default None for all devices
+        """
+        if self.deadlines is not None:
+            self.deadlines.reset(None if addr is None else str(addr))
+
+    def invalidateState(self, name: str=None):
+        """Forget the shadowed adapter state
+
+        Following commands setting this state will be sent again. Call this
+        if anything else might have changed the adapter configuration.
+
+        Parameters
+        ----------
+        name : str, optional
+            Command name like `++addr` to forget
+            If None the complete state is forgotten
+            by default None
+        """
+        if name is None:
+            self.busState.clear()
+        else:
+            self.busState.pop(name, None)
+
+    def _shadowState(self, cmd: str) -> bool:
+        """Track adapter state changes and check for redundant commands
+
+        Parameters
+        ----------
+        cmd : str
+            The command string to be sent
+
+        Returns
+        -------
+        bool
+            True if the command would not change the adapter state and
+            should be suppressed
+        """
+        if not cmd.startswith("++"):
+            return False
+
+        parts = cmd.split(None, 1)
+        name = parts[0]
+        if name not in self.STATE_CMDS:
+            if name == "++rst":
+                self.invalidateState()
+            return False
+        if len(parts) < 2:
+            # Query of the current value
+            return False
+
+        value = " ".join(parts[1].split())
+        if self.exclusive and self.busState.get(name) == value:
+            self.suppressed[name] = self.suppressed.get(name, 0) + 1
+            self.traceNote("Skipped %s", cmd)
+            return True
+        self.busState[name] = value
+        return False
+
+    def readLine(self, binary: bool=False, timeout: float=None):
+        """Read a single response frame ending with `terminator`
+
+        Everything the serial port has available is pulled in bulk into a
+        reusable receive buffer which is then split on `terminator`. Bytes
+        following the terminator are kept for the next call.
+
+        Parameters
+        ----------
+        binary : bool, optional
+            If False the frame is copied out of the receive buffer as bytes
+            If True a zero-copy memoryview into the receive buffer is returned.
+                The view stays valid, the receive buffer is replaced instead of
+                being overwritten while views are still referenced. Replacing
+                costs a copy of all buffered bytes, so drop views or copy them
+                with bytes() before reading the next frame. The `cmd*`
+                methods return bytes for this reason
             by default False
+        timeout : float, optional
+            number of seconds to wait at maximum
+            by default None for `timeout`
 
+        Returns
+        -------
+        None|bytes|memoryview
+            None if nothing arrived before the timeout
+            Frame including the terminator. If the timeout hits before the
+                terminator arrived everything received so far is returned
         """
-        if timeout is not None:
-            self.timeout = timeout
+        if self._batch:
+            self.flushBatch()
+        self._rxCompact()
+        buf = self._rxBuffer
+        term = self.terminator
+        end = buf.find(term)
+        deadline = None
 
-        self.debug = debug
+        while end < 0:
+            if deadline is None:
+                deadline = time.monotonic() + self._transportTimeout(timeout)
+            elif time.monotonic() >= deadline:
+                break
+            # Block for the first byte only, then fetch everything available
+            waiting = self.serial.in_waiting
+            chunk = self.serial.read(waiting if waiting > 0 else 1)
+            if len(chunk) == 0:
+                break
+            start = max(0, len(buf) - len(term) + 1)
+            buf += chunk
+            end = buf.find(term, start)
 
-        #Establish connection
+        return self._rxTake(end, binary)
+
+    def readBytes(self, size: int, timeout: float=None):
+        """Read an exact number of bytes
+
+        Missing bytes are requested from the serial port in a single call
+        which returns as soon as all of them arrived.
+
+        Parameters
+        ----------
+        size : int
+            number of bytes to read
+        timeout : float, optional
+            number of seconds to wait at maximum
+            by default None for `timeout`
+
+        Returns
+        -------
+        None|memoryview
+            Zero-copy view into the receive buffer, see `readLine`
+            None if not all bytes arrived before the timeout. Bytes received
+                so far stay buffered and are discarded by the next command
+        """
+        if self._batch:
+            self.flushBatch()
+        self._rxCompact()
+        buf = self._rxBuffer
+        deadline = None
+
+        while len(buf) < size:
+            if deadline is None:
+                deadline = time.monotonic() + self._transportTimeout(timeout)
+            elif time.monotonic() >= deadline:
+                break
+            waiting = self.serial.in_waiting
+            chunk = self.serial.read(max(waiting, size - len(buf)))
+            if len(chunk) == 0:
+                break
+            buf += chunk
+
+        if len(buf) < size:
+            self.traceError("Expected %d bytes, got %d", size, len(buf))
+            return None
+
+        self._rxConsumed = size
+        return memoryview(buf)[:size]
+
+    def readEOI(self, binary: bool=False, timeout: float=None, more: bool=False):
+        """Read a response terminated by EOI
+
+        Requires the adapter to append EOT_CHAR on EOI (`++eot_enable 1`),
+        which `cmdPoll` does when called with `eot=True`.
+
+        The adapter sends EOT_CHAR unescaped, so a payload containing it
+        ends the frame early. This is detected by data following the
+        frame, which is an error unless `more` responses were requested.
+
+        Parameters
+        ----------
+        binary : bool, optional
+            Whether to return a zero-copy memoryview, see `readLine`
+            by default False
+        timeout : float, optional
+            number of seconds to wait at maximum
+            by default None for `timeout`
+        more : bool, optional
+            Whether further responses may follow this one
+            by default False
+
+        Returns
+        -------
+        None|bytes|memoryview
+            Response without EOT_CHAR
+            None if nothing arrived before the timeout or the response
+                is incomplete as EOT_CHAR did not arrive
+
+        Raises
+        ------
+        ValueError
+            If data followed EOT_CHAR, the response contained EOT_CHAR.
+            Read such responses with `size` or `readBlock` instead
+        """
+        terminator = self.terminator
+        self.terminator = bytes((self.EOT_CHAR,))
         try:
-            self.serial = serial.Serial(port, baudrate=baud, timeout=self.timeout)
-        except serial.SerialException:
-            print("!! Port " + port + " could not be opened")
-            self.serial = None
+            out = self.readLine(binary=binary, timeout=timeout)
+        finally:
+            self.terminator = terminator
+
+        if out is None:
             return None
+        if len(out) == 0 or out[-1] != self.EOT_CHAR:
+            self.traceError("Incomplete response, got %d bytes without EOI", len(out))
+            return None
+        if not more:
+            pending = len(self._rxBuffer) - self._rxConsumed + self.serial.in_waiting
+            if pending > 0:
+                self.traceError("Response contains EOT, %d bytes follow", pending)
+                raise ValueError("Response contains EOT_CHAR, " + str(pending) + " bytes followed the frame")
+        return out[:-1]
 
-        #Check for Prologix device
-        time.sleep(2.5)
-        check = self.cmdPoll("++ver", read=False)
-        if len(check)<=0:
-            print("!! No responding device on port " + port + " found")
-            self.serial = None
+    def readBlock(self, timeout: float=None):
+        """Read an IEEE 488.2 block
+
+        Definite length blocks (`#<digits><length><data>`) are read with an
+        exact byte count, indefinite length blocks (`#0<data>`) up to the
+        terminator.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            number of seconds to wait at maximum for each part of the block
+            by default None for `timeout`
+
+        Returns
+        -------
+        None|memoryview
+            Zero-copy view of the block data without header, see `readLine`
+            None for missing, invalid or incomplete blocks
+        """
+        head = self.readBytes(2, timeout=timeout)
+        if head is None or head[0] != ord("#") or not chr(head[1]).isdigit():
+            self.traceError("Invalid block header")
             return None
-        elif not ("Prologix".casefold() in check.casefold() or "AR488".casefold() in check.casefold()):
-            print("!! Device on Port " + port + " does not seem to be Prologix compatible")
-            print(check)
-            self.serial = None
+        digits = head[1] - ord("0")
+        del head
+
+        if digits == 0:
+            return self.readLine(binary=True, timeout=timeout)
+
+        length = self.readBytes(digits, timeout=timeout)
+        if length is None:
             return None
-        elif debug:
-            print(".. Found Prologix compatible device on port " + port)
+        length = int(bytes(length))
 
-        #Initialize basic parameters
-        self.cmdWrite("++mode 1")                               # Change to controller mode
-        self.cmdWrite("++auto 0")                               # Do not automatically read device after each command
-        self.cmdWrite("++eoi 0")                                # Do not assert EOI after commandI
-        self.cmdWrite("++eos 0")                                # Append CR+LF to all commands
-        self.cmdWrite("++eot_enable 0")                         # Do not append EOT to USB output after EOI
-        self.cmdWrite("++read_tmo_ms " + str(self.timeout))     # Transmission timeout
-        self.cmdWrite("++ifc")                                  # Assert IFC to indicate we're taking control of the bus
+        return self.readBytes(length, timeout=timeout)
 
-    def cmdWrite(self, cmd: str, addr: int=None):
-        """Write a single, returnless command to a GPIB device
+    def _transportTimeout(self, timeout: float=None) -> float:
+        """Apply a read timeout to the transport
+
+        The transport is only reconfigured if the timeout changed.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            number of seconds to wait at maximum
+            by default None for `timeout`
+
+        Returns
+        -------
+        float
+            The applied timeout
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if self.serial.timeout != timeout:
+            self.serial.timeout = timeout
+        return timeout
+
+    def _rxTake(self, end: int, binary: bool):
+        """Remove a frame from the receive buffer
+
+        Parameters
+        ----------
+        end : int
+            Position of the terminator, negative to take everything
+        binary : bool
+            Whether to return a memoryview instead of a copy
+
+        Returns
+        -------
+        None|bytes|memoryview
+            Frame including the terminator, None if the buffer is empty
+        """
+        buf = self._rxBuffer
+        if end < 0:
+            size = len(buf)
+        else:
+            size = end + len(self.terminator)
+        if size == 0:
+            return None
+
+        if binary:
+            self._rxConsumed = size
+            return memoryview(buf)[:size]
+
+        out = bytes(buf[:size])
+        del buf[:size]
+        return out
+
+    def _rxCompact(self):
+        """Remove already returned frames from the receive buffer
+
+        If memoryviews of the buffer are still referenced it can not be
+        resized, so the remaining bytes are moved to a new buffer instead.
+        """
+        if self._rxConsumed == 0:
+            return
+        try:
+            del self._rxBuffer[:self._rxConsumed]
+        except BufferError:
+            self._rxBuffer = bytearray(self._rxBuffer[self._rxConsumed:])
+        self._rxConsumed = 0
+
+    def drainInput(self) -> int:
+        """Discard stale bytes waiting in the serial input buffer
+
+        Only reads what is already buffered as reported by `in_waiting`,
+        so this never blocks on an empty buffer. Unread bytes left over
+        in the receive buffer of `readLine` are discarded as well.
+
+        Returns
+        -------
+        int
+            Number of discarded bytes
+        """
+        self._rxCompact()
+        count = len(self._rxBuffer)
+        if count > 0:
+            self._rxConsumed = count
+            self._rxCompact()
+
+        waiting = self.serial.in_waiting
+        while waiting > 0:
+            count += len(self.serial.read(waiting))
+            waiting = self.serial.in_waiting
+
+        if count > 0:
+            self.drainedBytes += count
+            self.traceNote("Discarded %d stale bytes", count)
+        return count
+
+    def cmdClr(self, addr: int=None):
+        """Send `SDC` (selected device clear) to device
 
         Parameters
         ----------
-        cmd : str
-            The command string to be sent
         addr : int, optional
             address of the targeted device. If set an `++addr` will be issued first
             by default None
         """
-        if addr is not None:
-            """
-            @TODO we probably could skip addr if this is equal to the last addr call and 
-            we're sure noone else is using the bus to reduce bus load.
-            """
-            self.cmdWrite("++addr " + str(addr), addr=None)
-        self.serial.read()
-        self.serial.write(str.encode(cmd+self.EOL))
-        if self.debug:
-            print(">> " + cmd)
-        self.serial.flush()
-
-    def cmdPoll(self, cmd: str, addr: int=None, binary: bool=False, read: bool=True):
-        """Write a single command to a GPIB device and fetch response
+        self.cmdWrite("++clr", addr)
+
+    def cmdRead(self, addr: int=None, binary: bool=False):
+        """Fetch a response from a GPIB device without sending a command first
 
         Parameters
         ----------
-        cmd : str
-            The command string to be sent
         addr : int, optional
             address of the targeted device. If set an `++addr` will be issued first
             by default None
         binary : bool, optional
             If False responses are decoded and returned as String
-            If True resonses are unchanged and returned as byte array
+            If True resonses are unchanged and returned as bytes
             by default False
-        read : bool, optional
-            Whether to issue a `++read eoi` before waiting for data
-            While required for GPIB device commands internal prologix commands
-                or while operating with `++auto 1` might return data without polling
-                first
-            by default True
 
         Returns
         -------
-        None|str|bytearray
+        None|str|bytes
             None for empty responses
-            str or bytearray depending on `binary` parameter
-        """
-        self.serial.reset_input_buffer()
-        self.cmdWrite(cmd, addr)
-        if self.debug and binary:
-            for c in cmd:
-                print("  -> 0b" + format(ord(c), '08b'))
-        if read:
-            self.cmdWrite("++read eoi", None)
-        out = self.serial.readline()
-        if len(out) == 0:
+            str or bytes depending on `binary` parameter
+        """
+        with self.transaction():
+            if not self._healthy(addr):
+                return None
+            if addr is not None:
+                self._write("++addr " + str(addr))
+            timeout = self._readTimeout("++read")
+            self._write("++read eoi")
+            start = time.monotonic()
+            out = self.readLine(binary=binary, timeout=timeout)
+            self._recordRead(start, out, "++read", learn=True)
+        return self._response(out, binary)
+
+    def cmdTrigger(self, addrs: list=None):
+        """Send `GET` (group execute trigger) to one or more devices
+
+        Parameters
+        ----------
+        addrs : list, optional
+            addresses of the targeted devices. Adapters accept up to 15
+                addresses per command, longer lists are split up
+            If None or empty the currently addressed device is triggered
+            by default None
+        """
+        if addrs is None or len(addrs) == 0:
+            self.cmdWrite("++trg")
+            return
+
+        with self.transaction():
+            for i in range(0, len(addrs), 15):
+                self._write("++trg " + " ".join(str(addr) for addr in addrs[i:i+15]))
+
+    def syncMeasure(self, devices: list, arm: bool=True) -> tuple:
+        """Trigger several devices at once and collect their readings
+
+        All devices are triggered by a single `GET` so readings are taken at
+        the same time, then read back one after another.
+
+        Devices must provide `addr`, `armTrigger()` putting the device into a
+        mode waiting for `GET` and `parseMeasure(str)` converting a response.
+        hp3478a and pm2534 implement these.
+
+        Example
+        -------
+        gpib.syncMeasure([meter1, meter2])
+        while True:
+            timestamp, (v1, v2) = gpib.syncMeasure([meter1, meter2], arm=False)
+
+        Parameters
+        ----------
+        devices : list
+            Driver instances to trigger, all using this adapter
+        arm : bool, optional
+            Whether to call `armTrigger()` on all devices first. Only needed
+                once unless something else changes the trigger mode
+            by default True
+
+        Returns
+        -------
+        tuple
+            Timestamp of the trigger as returned by time.time() and a list of
+            readings in the same order as `devices`. Readings are None if the
+            device did not respond
+        """
+        with self.transaction():
+            if arm:
+                for device in devices:
+                    device.armTrigger()
+
+            timestamp = time.time()
+            self.cmdTrigger([device.addr for device in devices])
+
+            readings = []
+            for device in devices:
+                out = self.cmdRead(device.addr)
+                if out is None:
+                    readings.append(None)
+                else:
+                    readings.append(device.parseMeasure(out))
+
+        return timestamp, readings
+
+    def cmdSpoll(self, addr: int) -> int:
+        """Serial poll a device
+
+        Parameters
+        ----------
+        addr : int
+            address of the targeted device
+
+        Returns
+        -------
+        int|None
+            Status byte, None if the device did not respond
+        """
+        status = self.cmdPoll("++spoll " + str(addr), read=False)
+        if status is None or not status.isdigit():
             return None
-        if not binary:
-            out = out.decode()
-            out = out.strip()
-            if self.debug and len(out) > 0:
-                print("<< " + out)
-        elif self.debug and len(out) > 0:
-            for b in out:
-                print("<< 0b" + format(b, '08b'))
-        return out
+        return int(status)
 
-    def cmdClr(self, addr: int=None):
-        """Send `SDC` (selected device clear) to device
+    def cmdSRQ(self) -> bool:
+        """Check whether any device asserts the SRQ line
+
+        Returns
+        -------
+        bool
+            True if SRQ is asserted
+        """
+        return self.cmdPoll("++srq", read=False) == "1"
+
+    def registerSRQ(self, addr: int, callback):
+        """Register a callback for service requests of a device
 
         Parameters
         ----------
-        addr : int, optional
-            address of the targeted device. If set an `++addr` will be issued first
+        addr : int
+            address of the device
+        callback : callable
+            Called as `callback(addr, status)` with the serial poll status
+            byte whenever the device requests service, see `serviceSRQ`
+        """
+        self.srqHandlers[addr] = callback
+
+    def unregisterSRQ(self, addr: int):
+        """Remove the service request callback of a device
+
+        Parameters
+        ----------
+        addr : int
+            address of the device
+        """
+        self.srqHandlers.pop(addr, None)
+
+    def serviceSRQ(self) -> int:
+        """Dispatch pending service requests to the registered callbacks
+
+        Checks the SRQ line once. If asserted all devices with a registered
+        callback are serial polled and the callbacks of those requesting
+        service are called. Callbacks run without holding the bus, other
+        threads may use it in between.
+
+        Returns
+        -------
+        int
+            Number of devices serviced
+        """
+        if len(self.srqHandlers) == 0:
+            return 0
+
+        pending = []
+        with self.transaction():
+            if not self.cmdSRQ():
+                return 0
+            for addr in list(self.srqHandlers):
+                status = self.cmdSpoll(addr)
+                if status is not None and status & self.STB_RQS:
+                    pending.append((addr, status))
+
+        if len(pending) == 0:
+            self.srqUnhandled += 1
+            self.traceError("SRQ asserted by an unknown device")
+
+        for addr, status in pending:
+            callback = self.srqHandlers.get(addr)
+            if callback is not None:
+                callback(addr, status)
+        return len(pending)
+
+    def waitSRQ(self, timeout: float=None, interval: float=0.01) -> int:
+        """Wait for service requests and dispatch them
+
+        Parameters
+        ----------
+        timeout : float, optional
+            number of seconds to wait at maximum
+            If None wait until a request was serviced
             by default None
+        interval : float, optional
+            number of seconds to sleep between checking the SRQ line
+            by default 0.01
+
+        Returns
+        -------
+        int
+            Number of devices serviced, 0 on timeout
         """
-        self.cmdWrite("++clr", addr)
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        while True:
+            serviced = self.serviceSRQ()
+            if serviced > 0:
+                return serviced
+            if deadline is not None and time.monotonic() >= deadline:
+                return 0
+            time.sleep(interval)
 
-    def escapeCmd(self, cmd : str) -> str:
+    def escapeCmd(self, cmd) -> bytes:
         """Escape device command so they traverse the Prologix protocol
 
+        CR, LF, ESC and '+' are prefixed with ESC, all other bytes are passed
+        unchanged. Pass the result to `cmdWrite` or `cmdPoll`.
+
         Parameters
         ----------
-        cmd : str
-            command to send
+        cmd : str|bytes
+            command to send, str is encoded as latin-1 so characters up to
+            255 map to a single byte
 
         Returns
         -------
-        str
+        bytes
             escaped command to send
         """
-        out = ""
+        if isinstance(cmd, str):
+            cmd = cmd.encode("latin-1")
+        if len(cmd.translate(None, self.ESCAPE_CHARS)) == len(cmd):
+            return bytes(cmd)
+
+        table = self.ESCAPE_TABLE
+        out = bytearray()
         for c in cmd:
-            if c == chr(10) or c == chr(13) or chr(27) or chr(43):
-                c = chr(27)+c
-            out = out + c
-        return out
\ No newline at end of file
+            out += table[c]
+        return bytes(out)
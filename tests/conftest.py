@@ -0,0 +1,50 @@
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emulator import prologixEmulator, virtualHp3478a, virtualPm2534
+
+@pytest.fixture
+def emulator():
+    """Emulated adapter with an HP3478A at 23 and a PM2534 at 24, both answering instantly"""
+    return prologixEmulator([virtualHp3478a(23, speed=0, seed=1), virtualPm2534(24, speed=0, seed=2)])
+
+@pytest.fixture
+def tcpAdapter(emulator):
+    """Serve the emulator like a network adapter on a local port
+
+    Yields
+    ------
+    str
+        Port to pass to prologix, like `tcp://127.0.0.1:50000`
+    """
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+
+    def serve():
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            return
+        with conn:
+            while True:
+                try:
+                    data = conn.recv(4096)
+                except OSError:
+                    return
+                if not data:
+                    return
+                out = emulator.handle(data)
+                if out:
+                    conn.sendall(out)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield "tcp://127.0.0.1:" + str(port)
+    server.close()
+    thread.join(timeout=2)
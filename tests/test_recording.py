@@ -0,0 +1,55 @@
+from hp3478a import hp3478a
+from prologix import prologix
+from transports import loopbackTransport, readRecording
+
+def booting(handler, attempts: int):
+    """Wrap an emulator handler ignoring the first `attempts` writes like a booting adapter"""
+    ignored = [0]
+
+    def handle(data):
+        if ignored[0] < attempts:
+            ignored[0] += 1
+            return b""
+        return handler(data)
+    return handle
+
+def record(emulator, path, attempts: int=0) -> list:
+    """Record a session taking a few readings, return the readings"""
+    gpib = prologix(port="emulator", transport=loopbackTransport(booting(emulator.handle, attempts), record=False), timeout=0.25, record=str(path))
+    meter = hp3478a(23, prologixGpib=gpib)
+    readings = [meter.getMeasure(), meter.configure({"function": meter.VAC}), meter.getMeasure()]
+    gpib.close()
+    return readings
+
+def replay(path) -> tuple:
+    """Replay a session recorded by `record`, return the readings and the replay mismatches"""
+    gpib = prologix(port="replay://" + str(path), timeout=0.25)
+    assert gpib.serial is not None
+    meter = hp3478a(23, prologixGpib=gpib)
+    readings = [meter.getMeasure(), meter.configure({"function": meter.VAC}), meter.getMeasure()]
+    mismatches = gpib.serial.mismatches
+    gpib.close()
+    return readings, mismatches
+
+def test_replay(emulator, tmp_path):
+    path = tmp_path / "session.plx"
+    recorded = record(emulator, path)
+    assert recorded == [1.0, True, 0.5]
+
+    # Replaying twice in one process must replay the probe both times
+    for i in range(2):
+        readings, mismatches = replay(path)
+        assert readings == recorded
+        assert mismatches == 0
+
+def test_replay_booting_adapter(emulator, tmp_path):
+    path = tmp_path / "session.plx"
+    recorded = record(emulator, path, attempts=2)
+
+    _, records = readRecording(str(path))
+    probes = [data for kind, stamp, data in records if b"++ver" in data]
+    assert len(probes) == 3
+
+    readings, mismatches = replay(path)
+    assert readings == recorded
+    assert mismatches == 0
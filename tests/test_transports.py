@@ -0,0 +1,59 @@
+import asyncio
+
+from aioprologix import aioprologix
+from hp3478a import hp3478a
+from pm2534 import pm2534
+from prologix import prologix
+from transports import loopbackTransport, tcpTransport
+
+def checkDrivers(gpib):
+    """Run both drivers against the emulator behind `gpib`"""
+    assert "Prologix" in gpib.version
+
+    meter = hp3478a(23, prologixGpib=gpib)
+    assert meter.getMeasure() == 1.0
+    assert meter.configure({"function": meter.VAC, "digits": 4.5})
+    assert meter.status.function == meter.VAC
+    assert meter.getMeasure() == 0.5
+
+    other = pm2534(24, prologixGpib=gpib)
+    assert other.getMeasure() is not None
+
+    frames = gpib.cmdPollMany(["S", "B", " "], 23)
+    assert frames[0].strip() == b"1"
+    assert len(frames[1].strip()) == 5
+
+    timestamp, readings = gpib.syncMeasure([meter, other])
+    assert None not in readings
+
+def test_loopback(emulator):
+    gpib = prologix(transport=loopbackTransport(emulator.handle), timeout=0.25)
+    assert gpib.serial is not None
+    checkDrivers(gpib)
+
+def test_tcp(tcpAdapter):
+    gpib = prologix(tcpAdapter, timeout=0.25)
+    assert isinstance(gpib.serial, tcpTransport)
+    try:
+        checkDrivers(gpib)
+    finally:
+        gpib.close()
+
+def test_tcp_async(tcpAdapter):
+    async def run():
+        gpib = await aioprologix.open(tcpAdapter, timeout=0.25)
+        assert gpib is not None
+        try:
+            meter = hp3478a(23, prologixGpib=gpib)
+            other = pm2534(24, prologixGpib=gpib)
+            assert await meter.getMeasureAsync() == 1.0
+            assert await meter.configureAsync({"function": meter.VAC})
+            assert await meter.getMeasureAsync() == 0.5
+            frames = await gpib.cmdPollMany(["S", " "], 23)
+            assert frames[0].strip() == b"1"
+            timestamp, readings = await gpib.syncMeasure([meter, other])
+            assert None not in readings
+        finally:
+            gpib.close()
+
+    asyncio.run(run())
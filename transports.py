@@ -0,0 +1,672 @@
+import serial
+import socket
+import select
+import struct
+import threading
+import time
+
+class tcpTransport(object):
+    """Raw TCP connection to a network adapter like Prologix GPIB-ETHERNET or AR488-WiFi
+
+    Offers the subset of the PySerial interface used by prologix, so it can be
+    used in place of a serial port. Incoming data is received in bulk into an
+    internal buffer.
+
+    Attributes
+    ----------
+    host : str
+        Hostname or IP of the adapter
+    port : int
+        TCP port of the adapter
+    timeout : float
+        number of seconds `read` waits for data at maximum
+        0 for non-blocking reads, None to wait forever
+    """
+
+    host: str = None
+    port: int = 1234
+    timeout: float = None
+
+    def __init__(self, host: str, port: int=1234, timeout: float=2.5):
+        """
+
+        Parameters
+        ----------
+        host : str
+            Hostname or IP of the adapter
+        port : int, optional
+            TCP port of the adapter
+            by default 1234 as used by Prologix adapters
+        timeout : float, optional
+            number of seconds to wait at maximum for data to arrive
+            by default 2.5 seconds
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._rx = bytearray()
+
+        connectTimeout = timeout
+        if not connectTimeout:
+            connectTimeout = None
+        self._socket = socket.create_connection((host, port), timeout=connectTimeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.setblocking(False)
+
+    def _receive(self, wait: float=0) -> int:
+        """Move received data into the internal buffer
+
+        Parameters
+        ----------
+        wait : float, optional
+            number of seconds to wait for data if nothing is pending
+            None to wait forever
+            by default 0
+
+        Returns
+        -------
+        int
+            number of bytes received
+        """
+        if wait is None or wait > 0:
+            readable, _, _ = select.select([self._socket], [], [], wait)
+            if len(readable) == 0:
+                return 0
+
+        count = 0
+        while True:
+            try:
+                chunk = self._socket.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            if len(chunk) == 0:
+                if count == 0:
+                    raise serial.SerialException("Connection to " + self.host + " closed")
+                break
+            self._rx += chunk
+            count += len(chunk)
+        return count
+
+    @property
+    def in_waiting(self) -> int:
+        """Number of bytes available without waiting"""
+        self._receive()
+        return len(self._rx)
+
+    def read(self, size: int=1) -> bytes:
+        """Read up to size bytes, waiting at most `timeout` for them to arrive
+
+        Parameters
+        ----------
+        size : int, optional
+            number of bytes to read
+            by default 1
+
+        Returns
+        -------
+        bytes
+            received data, shorter than size on timeout
+        """
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.monotonic() + self.timeout
+
+        self._receive()
+        while len(self._rx) < size:
+            if deadline is None:
+                wait = None
+            else:
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    break
+            self._receive(wait)
+
+        out = bytes(self._rx[:size])
+        del self._rx[:size]
+        return out
+
+    def write(self, data: bytes) -> int:
+        """Send data
+
+        Parameters
+        ----------
+        data : bytes
+            data to send
+
+        Returns
+        -------
+        int
+            number of bytes sent
+        """
+        view = memoryview(data)
+        while len(view) > 0:
+            try:
+                sent = self._socket.send(view)
+            except (BlockingIOError, InterruptedError):
+                select.select([], [self._socket], [])
+                continue
+            view = view[sent:]
+        return len(data)
+
+    def flush(self):
+        """Nothing to do, data is sent immediately with TCP_NODELAY"""
+        pass
+
+    def reset_input_buffer(self):
+        """Discard all pending input"""
+        self._receive()
+        self._rx.clear()
+
+    def fileno(self) -> int:
+        """File descriptor of the socket, for use with event loops"""
+        return self._socket.fileno()
+
+    def close(self):
+        """Close the connection"""
+        self._socket.close()
+
+
+class loopbackTransport(object):
+    """In-memory transport for tests
+
+    Written data is passed to a handler whose return value is received as
+    response. Without a handler all data is echoed back. Data may also be
+    injected from other threads using `feed`.
+
+    Attributes
+    ----------
+    handler : callable
+        Called as `handler(data)` for every write, returns bytes to receive
+        or None
+    timeout : float
+        number of seconds `read` waits for data at maximum
+        0 for non-blocking reads, None to wait forever
+    written : bytearray
+        Everything written so far, unless `record` was False
+    """
+
+    handler = None
+    timeout: float = None
+    written: bytearray = None
+
+    def __init__(self, handler=None, timeout: float=2.5, record: bool=True):
+        """
+
+        Parameters
+        ----------
+        handler : callable, optional
+            Called as `handler(data)` for every write, returns bytes to receive
+            If None written data is echoed back
+            by default None
+        timeout : float, optional
+            number of seconds to wait at maximum for data to arrive
+            by default 2.5 seconds
+        record : bool, optional
+            Whether to keep all written data in `written`
+            by default True
+        """
+        self.handler = handler
+        self.timeout = timeout
+        self.written = bytearray() if record else None
+        self._rx = bytearray()
+        self._cond = threading.Condition()
+
+    def feed(self, data: bytes):
+        """Add data to be received
+
+        Parameters
+        ----------
+        data : bytes
+            data to receive
+        """
+        with self._cond:
+            self._rx += data
+            self._cond.notify_all()
+
+    @property
+    def in_waiting(self) -> int:
+        """Number of bytes available without waiting"""
+        return len(self._rx)
+
+    def read(self, size: int=1) -> bytes:
+        """Read up to size bytes, waiting at most `timeout` for them to arrive
+
+        Parameters
+        ----------
+        size : int, optional
+            number of bytes to read
+            by default 1
+
+        Returns
+        -------
+        bytes
+            received data, shorter than size on timeout
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._rx) >= size, self.timeout)
+            out = bytes(self._rx[:size])
+            del self._rx[:size]
+            return out
+
+    def write(self, data: bytes) -> int:
+        """Pass data to the handler
+
+        Parameters
+        ----------
+        data : bytes
+            data to send
+
+        Returns
+        -------
+        int
+            number of bytes sent
+        """
+        if self.written is not None:
+            self.written += data
+        if self.handler is None:
+            response = data
+        else:
+            response = self.handler(bytes(data))
+        if response:
+            self.feed(response)
+        return len(data)
+
+    def flush(self):
+        """Nothing to do"""
+        pass
+
+    def reset_input_buffer(self):
+        """Discard all pending input"""
+        with self._cond:
+            self._rx.clear()
+
+    def close(self):
+        """Nothing to do"""
+        pass
+
+
+class recordingTransport(object):
+    """Transport wrapper writing all traffic into a binary session log
+
+    The log starts with RECORD_MAGIC followed by the wall clock start time
+    as little endian double. Each record consists of a header of kind
+    (RECORD_OUT or RECORD_IN), microseconds since the previous record and
+    payload length, packed as `<BIH`, followed by the payload. Replay logs
+    with `replayTransport`, read them with `readRecording`.
+
+    Attributes
+    ----------
+    transport : object
+        Wrapped transport
+    filename : str
+        Path of the log
+    """
+
+    RECORD_MAGIC = b"PLXREC1\n"
+    RECORD_OUT = 0
+    RECORD_IN = 1
+    RECORD_HEADER = struct.Struct("<BIH")
+
+    transport: object = None
+    filename: str = None
+
+    def __init__(self, transport, filename: str):
+        """
+
+        Parameters
+        ----------
+        transport : object
+            Opened transport to record
+        filename : str
+            Path of the log, overwritten if it exists
+        """
+        self.transport = transport
+        self.filename = filename
+        self._file = open(filename, "wb")
+        self._file.write(self.RECORD_MAGIC + struct.pack("<d", time.time()))
+        self._last = time.monotonic()
+
+    def _record(self, kind: int, data: bytes):
+        """Append a record, splitting payloads too long for a single one
+
+        Parameters
+        ----------
+        kind : int
+            RECORD_OUT or RECORD_IN
+        data : bytes
+            transferred bytes
+        """
+        now = time.monotonic()
+        delta = min(int((now - self._last) * 1e6), 0xFFFFFFFF)
+        self._last = now
+        for i in range(0, len(data), 0xFFFF):
+            chunk = data[i:i+0xFFFF]
+            self._file.write(self.RECORD_HEADER.pack(kind, delta, len(chunk)))
+            self._file.write(chunk)
+            delta = 0
+        # Keep the log usable if the process dies without close
+        self._file.flush()
+
+    @property
+    def timeout(self) -> float:
+        """Timeout of the wrapped transport"""
+        return self.transport.timeout
+
+    @timeout.setter
+    def timeout(self, value: float):
+        self.transport.timeout = value
+
+    @property
+    def in_waiting(self) -> int:
+        """Number of bytes available without waiting"""
+        return self.transport.in_waiting
+
+    def read(self, size: int=1) -> bytes:
+        """Read from the wrapped transport and record the received bytes
+
+        Parameters
+        ----------
+        size : int, optional
+            number of bytes to read
+            by default 1
+
+        Returns
+        -------
+        bytes
+            received data, shorter than size on timeout
+        """
+        data = self.transport.read(size)
+        if len(data) > 0:
+            self._record(self.RECORD_IN, data)
+        return data
+
+    def write(self, data: bytes) -> int:
+        """Record and send data
+
+        Parameters
+        ----------
+        data : bytes
+            data to send
+
+        Returns
+        -------
+        int
+            number of bytes sent
+        """
+        self._record(self.RECORD_OUT, data)
+        return self.transport.write(data)
+
+    def flush(self):
+        """Flush the wrapped transport
+
+        The log itself is flushed after each record.
+        """
+        self.transport.flush()
+
+    def reset_input_buffer(self):
+        """Discard all pending input of the wrapped transport, unrecorded"""
+        self.transport.reset_input_buffer()
+
+    def fileno(self) -> int:
+        """File descriptor of the wrapped transport"""
+        return self.transport.fileno()
+
+    def close(self):
+        """Close the log and the wrapped transport"""
+        self._file.close()
+        self.transport.close()
+
+
+def readRecording(filename: str):
+    """Read a session log written by `recordingTransport`
+
+    Parameters
+    ----------
+    filename : str
+        Path of the log
+
+    Returns
+    -------
+    tuple
+        Wall clock start time and a list of records as tuples of kind
+        (RECORD_OUT or RECORD_IN), seconds since start and payload
+
+    Raises
+    ------
+    ValueError
+        If the file is no session log
+    """
+    with open(filename, "rb") as fp:
+        data = fp.read()
+
+    magic = recordingTransport.RECORD_MAGIC
+    if not data.startswith(magic):
+        raise ValueError(filename + " is no session log")
+    started, = struct.unpack_from("<d", data, len(magic))
+
+    header = recordingTransport.RECORD_HEADER
+    records = []
+    offset = 0
+    pos = len(magic) + 8
+    while pos + header.size <= len(data):
+        kind, delta, size = header.unpack_from(data, pos)
+        pos += header.size
+        offset += delta
+        records.append((kind, offset / 1e6, data[pos:pos+size]))
+        pos += size
+    return started, records
+
+
+class replayTransport(object):
+    """Transport replaying a session log written by `recordingTransport`
+
+    Written data is matched against the recorded output, each write
+    releases the responses recorded after it. Responses become readable
+    either immediately or with the recorded delays.
+
+    Attributes
+    ----------
+    filename : str
+        Path of the log
+    realtime : bool
+        Whether responses arrive with the recorded delays. Otherwise reads
+        return as soon as everything released is consumed, including reads
+        which timed out during recording
+    timeout : float
+        number of seconds `read` waits for data at maximum in realtime mode
+    mismatches : int
+        Number of written bytes differing from the recorded ones
+    """
+
+    filename: str = None
+    realtime: bool = False
+    timeout: float = None
+    mismatches: int = 0
+
+    def __init__(self, filename: str, realtime: bool=False, timeout: float=2.5):
+        """
+
+        Parameters
+        ----------
+        filename : str
+            Path of the log
+        realtime : bool, optional
+            Whether to replay with the recorded delays
+            by default False for replaying as fast as possible
+        timeout : float, optional
+            number of seconds to wait at maximum for data to arrive
+            by default 2.5 seconds
+        """
+        self.filename = filename
+        self.realtime = realtime
+        self.timeout = timeout
+        self.mismatches = 0
+        _, self._records = readRecording(filename)
+        self._next = 0
+        self._outPos = 0
+        self._pending = []
+        self._rx = bytearray()
+        self._release(time.monotonic(), 0.0)
+
+    def _release(self, now: float, anchor: float):
+        """Queue the responses following the current position
+
+        Parameters
+        ----------
+        now : float
+            time.monotonic() of the write releasing them
+        anchor : float
+            recorded offset of that write
+        """
+        records = self._records
+        while self._next < len(records) and records[self._next][0] == recordingTransport.RECORD_IN:
+            _, offset, data = records[self._next]
+            self._pending.append((now + offset - anchor, data))
+            self._next += 1
+
+    def _collect(self) -> bool:
+        """Move due responses into the receive buffer
+
+        Returns
+        -------
+        bool
+            True if responses are still pending
+        """
+        now = time.monotonic()
+        while len(self._pending) > 0 and (not self.realtime or self._pending[0][0] <= now):
+            self._rx += self._pending.pop(0)[1]
+        return len(self._pending) > 0
+
+    @property
+    def in_waiting(self) -> int:
+        """Number of bytes available without waiting"""
+        self._collect()
+        return len(self._rx)
+
+    def read(self, size: int=1) -> bytes:
+        """Read up to size bytes
+
+        Parameters
+        ----------
+        size : int, optional
+            number of bytes to read
+            by default 1
+
+        Returns
+        -------
+        bytes
+            received data, shorter than size if the recording holds no more
+            data before the next write or on timeout
+        """
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.monotonic() + self.timeout
+
+        while self._collect() and len(self._rx) < size:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            wait = self._pending[0][0] - now
+            if deadline is not None:
+                wait = min(wait, deadline - now)
+            if wait > 0:
+                time.sleep(wait)
+
+        if self.realtime and len(self._rx) < size and len(self._pending) == 0 and deadline is not None:
+            # Nothing more was recorded, time out like the recorded session
+            time.sleep(max(0.0, deadline - time.monotonic()))
+
+        out = bytes(self._rx[:size])
+        del self._rx[:size]
+        return out
+
+    def write(self, data: bytes) -> int:
+        """Match written data against the recording and release responses
+
+        Parameters
+        ----------
+        data : bytes
+            data to send
+
+        Returns
+        -------
+        int
+            number of bytes sent
+        """
+        records = self._records
+        pos = 0
+        while pos < len(data) and self._next < len(records):
+            kind, offset, recorded = records[self._next]
+            if kind != recordingTransport.RECORD_OUT:
+                break
+            size = min(len(data) - pos, len(recorded) - self._outPos)
+            if data[pos:pos+size] != recorded[self._outPos:self._outPos+size]:
+                self.mismatches += size
+            pos += size
+            self._outPos += size
+            if self._outPos == len(recorded):
+                self._next += 1
+                self._outPos = 0
+                self._release(time.monotonic(), offset)
+        self.mismatches += len(data) - pos
+        return len(data)
+
+    def flush(self):
+        """Nothing to do"""
+        pass
+
+    def reset_input_buffer(self):
+        """Discard all pending input"""
+        self._collect()
+        self._rx.clear()
+
+    def close(self):
+        """Nothing to do"""
+        pass
+
+
+def openTransport(port: str, baud: int=115200, timeout: float=2.5):
+    """Open a transport for the given port
+
+    Parameters
+    ----------
+    port : str
+        Serial device like `/dev/ttyACM0` or `COM3`
+        `tcp://host[:port]` for network adapters, port defaults to 1234
+        `loopback://` for an in-memory echo transport
+        `replay://path` to replay a session log as fast as possible,
+            `replay://path?realtime` to replay it with the recorded delays
+        Other URLs like `socket://` or `rfc2217://` are handled by PySerial
+    baud : int, optional
+        baudrate used for serial communication
+        by default 115200
+    timeout : float, optional
+        number of seconds to wait at maximum for data to arrive
+        by default 2.5 seconds
+
+    Returns
+    -------
+    object
+        Transport offering `in_waiting`, `read`, `write`, `flush`, `timeout`
+        and `close` like PySerial objects
+
+    Raises
+    ------
+    serial.SerialException
+        If a serial port could not be opened
+    OSError
+        If a network connection could not be established
+    """
+    if port.startswith("tcp://"):
+        host, _, tcpPort = port[len("tcp://"):].rstrip("/").partition(":")
+        if tcpPort == "":
+            return tcpTransport(host, timeout=timeout)
+        return tcpTransport(host, int(tcpPort), timeout=timeout)
+    if port.startswith("loopback://"):
+        return loopbackTransport(timeout=timeout)
+    if port.startswith("replay://"):
+        path, _, options = port[len("replay://"):].partition("?")
+        return replayTransport(path, realtime=(options == "realtime"), timeout=timeout)
+    if "://" in port:
+        return serial.serial_for_url(port, baudrate=baud, timeout=timeout)
+    return serial.Serial(port, baudrate=baud, timeout=timeout)